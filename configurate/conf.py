@@ -14,6 +14,19 @@ openai_api_key= os.getenv("OPENAI_API_KEY")
 #Variables globales
 #Conexion
 alpaca_data_feed = DataFeed.IEX     #replace to 'SIP' if you have PRO subscription or IEX if is not
+#Recibir por el stream las barras diarias de todos los simbolos del filtro 1. El plan Basic (IEX) limita el stream a 30
+#simbolos, por lo que solo se debe activar con un plan sin ese limite; sin el stream el volumen de hoy se actualiza con
+#los snapshots de cada vuelta de filter_2
+alpaca_daily_bars_stream = os.getenv("ALPACA_DAILY_BARS_STREAM", "0") == "1"
+#Cache en disco de barras historicas, vacio para desactivarla
+alpaca_bar_cache_directory = os.getenv("ALPACA_BAR_CACHE_DIRECTORY", "cache/bars")
+#Modo de ejecucion del trading: "processes" (un proceso por tarea) o "asyncio" (un solo proceso con un bucle de eventos)
+trading_run_mode = os.getenv("TRADING_RUN_MODE", "processes")
+#Ritmo de filter_2: se ejecuta en cada limite de barra (segundos) mas un desfase para que la barra ya este publicada
+filter_2_period_seconds = float(os.getenv("FILTER_2_PERIOD_SECONDS", "60"))
+filter_2_offset_seconds = float(os.getenv("FILTER_2_OFFSET_SECONDS", "5"))
+#Mostrar en cada vuelta de filter_2 cuantos simbolos paso cada regla y su tiempo
+filter_2_report = os.getenv("FILTER_2_REPORT", "0") == "1"
 #Consultar simbolos
 alpaca_symbol_status = AssetStatus.ACTIVE
 alpaca_asset_class = AssetClass.US_EQUITY   
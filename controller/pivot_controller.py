@@ -2,7 +2,7 @@
 import os                 # Para interactuar con el sistema operativo
 import sys                # Para manipular la configuración del intérprete de Python
 import requests           # Para enviar solicitudes HTTP
-from typing import Dict, List, Tuple  # Para definir tipos de datos
+from typing import Callable, Dict, List, Optional, Set, Tuple  # Para definir tipos de datos
 from bs4 import BeautifulSoup  # Para analizar y extraer datos HTML
 from datetime import datetime, timedelta  # Para manejar fechas y tiempos
 import pytz               # Para manejar zonas horarias
@@ -14,7 +14,9 @@ import numpy as np        # Para realizar operaciones numéricas eficientes
 
 
 import multiprocessing    # Para trabajo en paralelo
-from multiprocessing import Queue
+import threading          # Para recibir los cambios de suscripción mientras corre el stream
+from concurrent.futures import ThreadPoolExecutor  # Para reenviar las ordenes sin bloquear el hilo del OrderTracker
+import asyncio            # Para el modo de un solo proceso con un bucle de eventos
 
 
 # Obtiene la ruta absoluta del directorio actual
@@ -27,8 +29,14 @@ sys.path.append(sys.path.append("D:\Daniel\Documents\SimonsTraderV"))
 from configurate import conf  # Importa el módulo conf desde el paquete configurate
 from model.alpha_trader_pro.api import AlphaTraderProApi # Importa la clase AlphaTraderPro 
 from model.alpha_trader_pro.models import Order # Importa la clase Order con la cual se haran ordenes a AlphaTraderPro
+from model.alpha_trader_pro.order_tracker import OrderTracker # Sigue el estado de las ordenes enviadas a AlphaTraderPro
 from model.alpha_trader_pro.enums import Exchange, Type, Side, Status # Importa los Enums que se usaran en AlphaTraderPro
-from model.alpaca.find_pivots import PivotsAlpaca  # Importa la clase PivotsAlpaca desde el módulo pivots del paquete model.alpaca
+from model.trade_transport import TradeChannel, MessageChannel, SharedSymbols, LatestValuesChannel  # Transporte de trades entre procesos
+from model.screening import Rule, Screener  # Reglas vectorizadas de filter_2
+from model.rolling_volume import RollingVolume  # Volumen de los ultimos 20 dias de cada activo
+from model.cadence import CadenceScheduler  # Ritmo de las ejecuciones de filter_2
+from model.alpaca.bar_cache import BAR_DTYPE  # Formato de las barras en columnas
+from model.alpaca.find_pivots import PivotsAlpaca, find_pivots_batch, DAY_NS  # Importa la clase PivotsAlpaca desde el módulo pivots del paquete model.alpaca
 from model.alpaca.api import AlpacaApi  # Importa la clase ApiAlpaca desde el módulo api del paquete model.alpaca
 from alpaca.data.timeframe import TimeFrame  # Importa la clase TimeFrame desde el módulo timeframe del paquete alpaca.data
 from alpaca.data.models import Bar  # Importa la clase Bar desde el módulo models del paquete alpaca.data
@@ -41,6 +49,36 @@ from alpaca.data.enums import DataFeed  # Para especificar el feed de datos que
 
 #endregion
 
+# Tabla de características de filter_2, una fila por símbolo
+FEATURE_DTYPE = np.dtype([
+    ('symbol', '<U32'),
+    ('day_volume', float),
+    ('mean_20_days_volume', float),
+    ('price', float),
+    ('atr', float),
+    # Último pivote fuerte cercano al precio (ver PIVOT_ATR_FACTOR), NaN si no hay
+    ('peak', float),
+    ('valley', float),
+    # Close promedio de los 5 minutos anteriores y volumen promedio de 10 minutos, NaN si no se consultaron
+    ('avg_close_5', float),
+    ('avg_volume_10', float),
+])
+
+# Distancia máxima, en ATR, entre el precio y un pivote cercano
+PIVOT_ATR_FACTOR = 0.30
+
+# Reglas de filter_2 sobre la tabla de características, en su orden inicial (ver Screener)
+FILTER_2_DAY_RULES = [
+    Rule('volumen_dia', 'day_volume > 50000'),
+    Rule('precio', '(price >= 20) & (price <= 500)'),
+    Rule('volumen_promedio_20_dias', 'mean_20_days_volume > 30000'),
+    Rule('pivote_cercano', '(peak > price) | (valley < price)'),
+]
+# Reglas sobre las barras de 10 minutos, solo para los símbolos que pasaron las reglas anteriores
+FILTER_2_MINUTE_RULES = [
+    Rule('volumen_10_minutos', 'avg_volume_10 > 1000'),
+    Rule('close_promedio_5_minutos', '((peak > price) & (price > avg_close_5)) | ((valley < price) & (price < avg_close_5))'),
+]
 
 #region Filtros
 
@@ -53,13 +91,24 @@ class PivotFilter:
         Inicializador de la clase PivotFilter. Se encarga de filtrar las listas de activos.
         """
         # Creamos una instancia de la clase clsApiAlpaca utilizando las claves de API de la configuración.
-        self._api_alpaca = AlpacaApi(conf.alpaca_api_key_id, conf.alpaca_api_secret_key, conf.alpaca_data_feed)
+        self._api_alpaca = AlpacaApi(conf.alpaca_api_key_id, conf.alpaca_api_secret_key, conf.alpaca_data_feed, conf.alpaca_bar_cache_directory)
         # Creamos un diccionario que contendrá los pivotes de cada activo.
         self.dict_asset_pivots: Dict[str, PivotsAlpaca]= {}
         # Creamos una lista de strings que contendrá los activos que pasen por el filtro 1.
         self.list_filter_1: List[str] = []
-        # Variable que almacenara el volumen de los ultimos 19 dias de los activos del filto 1
-        self._volume_19_days = {}
+        # Volumen de los ultimos 20 dias (hoy incluido) de los activos del filtro 1, ver _seed_rolling_volume
+        self.rolling_volume: RollingVolume = None
+        # Tabla de características, su índice y las filas que pasaron las reglas del día, calculados por
+        # refresh_snapshots y que filter_2 aun no uso
+        self._day_screen: Tuple[np.ndarray, Dict[str, int], np.ndarray] = None
+        # Símbolo, timestamp del ultimo trade y de la ultima barra de 1 minuto de las filas que pasaron las reglas del
+        # día, para saber si las entradas de filter_2 cambiaron (ver refresh_snapshots)
+        self.snapshot_fingerprint: Tuple[Tuple[str, int, int], ...] = ()
+        # Pivotes fuertes de todos los activos en arreglos planos, ver _build_pivot_arrays
+        self._pivot_symbols: List[str] = None
+        # Reglas de filter_2, conservan sus estadisticas para ordenarse
+        self._day_screener = Screener(FILTER_2_DAY_RULES)
+        self._minute_screener = Screener(FILTER_2_MINUTE_RULES)
         # Variable que almacenara el volumen de los ultimos 10 minutoes de los activos del filto 2
         self._volume_10_minutes = {}
         print("filtro 1")
@@ -90,6 +139,8 @@ class PivotFilter:
             array_opening_bars = np.array([[symbol, bar_list[-1].close] for symbol, bar_list in opening_bars.data.items()], dtype=object)
                         
             list_unfound_assets = filtered_list_assets
+            # Fecha final del historial, cada año se consulta solo el segmento anterior al ya revisado
+            current_date = datetime.now().astimezone(pytz.utc)
 
             for year in range(1, 5):
                 if not list_unfound_assets:
@@ -102,18 +153,25 @@ class PivotFilter:
                 print('')
                 print('Consultando los símbolos (', year, ' años)')
 
-                # Obtener datos históricos de los activos no encontrados
-                dict_asset_bars_day = self._api_alpaca.get_historical_assets_bars_with(TimeFrame.Day, 365*year, list_unfound_assets)              
+                # Obtener los datos históricos del año que falta revisar de los activos no encontrados
+                dict_asset_bars_day = self._api_alpaca.get_historical_assets_columns_between(
+                    TimeFrame.Day,
+                    current_date - timedelta(days=365*year),
+                    current_date - timedelta(days=365*(year - 1)),
+                    list_unfound_assets
+                )
 
                 # Realizar el bucle de pivotes
-                list_unfound_assets = self._find_pivots(dict_asset_bars_day, array_opening_bars, year, 5)
+                list_unfound_assets = self._find_pivots(list_unfound_assets, dict_asset_bars_day, array_opening_bars, year, 5)
 
-    def _find_pivots(self, par_dict_asset_bars_days, par_opening_bars: np.ndarray, par_year, par_number_pivots) -> List[str]:
+    def _find_pivots(self, par_list_assets: List[str], par_dict_asset_bars_days, par_opening_bars: np.ndarray, par_year, par_number_pivots) -> List[str]:
         """
-        Realiza un bucle de pivotes para cada activo en el diccionario de barras de activos.
+        Realiza un bucle de pivotes para cada activo consultado. Desde el segundo año las barras solo contienen
+        el segmento anterior a la ventana ya revisada de cada activo.
 
         Args:
-            par_dict_asset_bars_days (Dict[str, List[Bar]]): Diccionario que contiene las barras de activos por símbolo.
+            par_list_assets (List[str]): Lista de activos consultados.
+            par_dict_asset_bars_days (Dict[str, np.ndarray]): Diccionario que contiene las barras (BAR_DTYPE) de activos por símbolo.
             par_opening_bars (Dict[str, List[Bar]]): Diccionario que contiene las barras de apertura por símbolo.
             par_year (int): El año actual en el bucle de pivotes.
             par_number_pivots (int): El número de pivotes a buscar.
@@ -123,27 +181,39 @@ class PivotFilter:
 
         """
         list_unfound_assets: List[str] = []
-        for asset, bars in par_dict_asset_bars_days.data.items():
-            print(asset)
-            # Buscar las filas donde la primera columna (asset) coincide con el valor deseado
-            matching_rows = np.where(par_opening_bars[:, 0] == asset)[0]
-            # En caso de encontrar obtiene el precio de apertura de esta, en caso contrario continua con el siguiente activo
-            if matching_rows.size > 0:
-                last_opening_bar_close = par_opening_bars[matching_rows[-1], 1]
-            else:
+        # Precio de apertura por activo, en caso de repetirse se toma la ultima barra
+        dict_opening_prices = dict(zip(par_opening_bars[:, 0], par_opening_bars[:, 1]))
+        
+        list_assets: List[str] = []
+        list_pivots: List[PivotsAlpaca] = []
+        list_bars: List[np.ndarray] = []
+        list_prices: List[float] = []
+        for asset in par_list_assets:
+            # En caso de no encontrar barras ni pivots previos o el precio de apertura continua con el siguiente activo
+            bars = par_dict_asset_bars_days.get(asset, np.empty(0, dtype=BAR_DTYPE))
+            if (len(bars) == 0 and asset not in self.dict_asset_pivots) or asset not in dict_opening_prices:
                 continue
                     
             if par_year == 1:
                 asset_pivot = PivotsAlpaca(asset, par_number_pivots)
             else:
                 asset_pivot = self.dict_asset_pivots[asset]
-
-            asset_pivot.get_pivots(
-                par_bars= bars,
-                par_current_price= last_opening_bar_close,
-                par_find_weak_pivots= (par_year == 4)
-            )
-
+            
+            list_assets.append(asset)
+            list_pivots.append(asset_pivot)
+            list_bars.append(bars)
+            list_prices.append(dict_opening_prices[asset])
+        
+        # Se buscan los pivots de todos los activos en una sola pasada
+        find_pivots_batch(
+            par_list_pivots= list_pivots,
+            par_list_bars= list_bars,
+            par_list_current_prices= list_prices,
+            par_find_weak_pivots= (par_year == 4)
+        )
+        
+        for asset, asset_pivot in zip(list_assets, list_pivots):
+            print(asset)
             self.dict_asset_pivots[asset] = asset_pivot
             
             pivot_peaks_strong = asset_pivot.list_array_strong_peaks
@@ -157,117 +227,180 @@ class PivotFilter:
                 
         return list_unfound_assets
     
-    def _find_volume_19_days(self):
-        # Obtener los datos históricos de barras para los activos filtrados en un marco de tiempo diario 
-        bars_day = self._api_alpaca.get_historical_assets_bars_with(TimeFrame.Day, 30, self.list_filter_1)
-        # Variable que almacenara el volumen de los ultimos 19 dias
-        volume_days = {}
-        current_day = (datetime.now().astimezone(pytz.utc)).day
-  
-        volume_days = {
-            asset: (
-                volumes_bar[:-1] if (bars[-1].timestamp).day == current_day else volumes_bar[1:]
-            )
-            for asset, bars in bars_day.data.items()
-            for volumes_bar in [np.array([(bar.timestamp, bar.volume) for bar in bars[-20:]])]
-        }
-            
-        self._volume_19_days = volume_days
-    
+    def _seed_rolling_volume(self):
+        # Llena el volumen de los ultimos 20 dias una sola vez con las barras diarias, despues el volumen de hoy
+        # llega de los snapshots (ver refresh_snapshots) y, si conf lo activa, del stream (ver update_day_volume)
+        bars_day = self._api_alpaca.get_historical_assets_columns_with(TimeFrame.Day, 30, self.list_filter_1)
+        current_day = int(datetime.now().astimezone(pytz.utc).timestamp() * 1e9) // DAY_NS
+        self.rolling_volume = RollingVolume(self.list_filter_1)
+        self.rolling_volume.seed(bars_day, current_day)
+
+    def update_day_volume(self, par_symbol: str, par_timestamp: int, par_volume: float):
+        """
+        Actualiza el volumen de hoy de un activo con su barra diaria del stream.
+
+        Args:
+            par_symbol (str): Símbolo del activo.
+            par_timestamp (int): Timestamp de la barra diaria en nanosegundos epoch.
+            par_volume (float): Volumen acumulado del día.
+        """
+        if self.rolling_volume is not None:
+            self.rolling_volume.set_today(par_symbol, par_timestamp, par_volume)
+
+    def _update_day_volume_from_snapshots(self, par_snapshots: np.ndarray):
+        # El volumen de la barra diaria del snapshot es mas reciente que la ultima barra diaria del stream
+        for symbol, timestamp, volume in par_snapshots[['symbol', 'day_timestamp', 'day_volume']].tolist():
+            if timestamp > 0 and volume == volume:
+                self.update_day_volume(symbol, timestamp, volume)
+
+    def _build_feature_table(self, par_snapshots: np.ndarray) -> Tuple[np.ndarray, Dict[str, int]]:
+        """
+        Construye la tabla de características de filter_2, con una fila por activo del filtro 1, y el índice
+        símbolo → fila.
+
+        Cada fuente (volumen de hoy y promedio de 20 días, último trade del snapshot y pivotes) se une a la
+        tabla con el índice, sin buscar cada símbolo con una máscara sobre toda la tabla. Los símbolos a los
+        que les falta algún dato quedan con NaN y no pasan los filtros.
+
+        Args:
+            par_snapshots (np.ndarray): Snapshot de cada símbolo en formato SNAPSHOT_DTYPE.
+
+        Returns:
+            Tuple[np.ndarray, Dict[str, int]]: La tabla en formato FEATURE_DTYPE y el índice de sus filas.
+        """
+        symbols = self.list_filter_1
+        index = {symbol: row for row, symbol in enumerate(symbols)}
+        table = np.empty(len(symbols), dtype=FEATURE_DTYPE)
+        table['symbol'] = symbols
+        table['day_volume'] = self.rolling_volume.today(symbols)
+        table['mean_20_days_volume'] = self.rolling_volume.mean(symbols)
+
+        # Último precio, unido por el índice
+        table['price'] = np.nan
+        rows = np.fromiter((index.get(symbol, -1) for symbol in par_snapshots['symbol'].tolist()), dtype=np.int64, count=len(par_snapshots))
+        table['price'][rows[rows >= 0]] = par_snapshots['price'][rows >= 0]
+
+        self._join_pivots(table, index)
+        table['avg_close_5'] = np.nan
+        table['avg_volume_10'] = np.nan
+        return table, index
+
+    def _build_pivot_arrays(self):
+        # Une los pivotes fuertes de todos los activos en arreglos planos (activo, precio, si es pico), en el
+        # mismo orden que en cada activo
+        self._pivot_symbols = list(self.dict_asset_pivots.keys())
+        self._pivot_atr = np.array([self.dict_asset_pivots[symbol].atr for symbol in self._pivot_symbols], dtype=float)
+        ids, prices, is_peak = [], [], []
+        for position, symbol in enumerate(self._pivot_symbols):
+            pivots = self.dict_asset_pivots[symbol]
+            for array_pivots, peak in ((pivots.list_array_strong_peaks, True), (pivots.list_array_strong_valleys, False)):
+                ids.append(np.full(len(array_pivots), position, dtype=np.int64))
+                prices.append(np.asarray(array_pivots['price'], dtype=float))
+                is_peak.append(np.full(len(array_pivots), peak))
+        self._pivot_ids = np.concatenate(ids) if ids else np.empty(0, dtype=np.int64)
+        self._pivot_prices = np.concatenate(prices) if prices else np.empty(0)
+        self._pivot_is_peak = np.concatenate(is_peak) if is_peak else np.empty(0, dtype=bool)
+
+    def _join_pivots(self, par_table: np.ndarray, par_index: Dict[str, int]):
+        """
+        Agrega a la tabla el ATR de cada símbolo y su último pico y valle fuerte cercano al precio, como
+        _check_price_near_pivot pero para todos los símbolos a la vez.
+        """
+        par_table['atr'] = np.nan
+        par_table['peak'] = np.nan
+        par_table['valley'] = np.nan
+        if self._pivot_symbols is None:
+            self._build_pivot_arrays()
+        symbol_rows = np.fromiter((par_index.get(symbol, -1) for symbol in self._pivot_symbols), dtype=np.int64, count=len(self._pivot_symbols))
+        par_table['atr'][symbol_rows[symbol_rows >= 0]] = self._pivot_atr[symbol_rows >= 0]
+
+        # Fila de la tabla de cada pivote
+        rows = symbol_rows[self._pivot_ids]
+        positions = np.flatnonzero(rows >= 0)
+        rows = rows[positions]
+        near = np.abs(self._pivot_prices[positions] - par_table['price'][rows]) < par_table['atr'][rows] * PIVOT_ATR_FACTOR
+        for peak, column in ((True, 'peak'), (False, 'valley')):
+            selected = near & (self._pivot_is_peak[positions] == peak)
+            # El último pivote cercano de cada fila es el de mayor posición
+            last = np.full(len(par_table), -1, dtype=np.int64)
+            np.maximum.at(last, rows[selected], positions[selected])
+            has_pivot = last >= 0
+            par_table[column][has_pivot] = self._pivot_prices[last[has_pivot]]
+
+    def _join_minute_features(self, par_table: np.ndarray, par_index: Dict[str, int], par_symbols: List[str]):
+        # Agrega a la tabla el close promedio de 5 minutos (si hay 5 barras) y el volumen promedio de 10 minutos
+        bars_10_minutes = self._api_alpaca.get_last_10_minute_bars(par_symbols)
+        window_size = 5  # Tamaño de la ventana para el promedio de cierres
+        for symbol, bars in bars_10_minutes.data.items():
+            row = par_index.get(symbol)
+            if row is None or len(bars) == 0:
+                continue
+            if len(bars) >= window_size:
+                par_table['avg_close_5'][row] = sum([bar.close for bar in bars[-window_size:]]) / window_size
+            par_table['avg_volume_10'][row] = sum([bar.volume for bar in bars]) / len(bars)
+
+    def refresh_snapshots(self) -> None:
+        """
+        Consulta los snapshots (último trade, barra de 1 minuto y barra diaria) de los activos del filtro 1, actualiza
+        el volumen de hoy y aplica las reglas del día para la siguiente ejecución de filter_2. Se llama antes de
+        decidir si filter_2 se ejecuta: esta consulta es la que indica si sus entradas cambiaron, por lo que se hace
+        en todas las vueltas, tambien en las que se omiten.
+
+        El resultado de filter_2 solo depende de las filas que pasan las reglas del día, de su precio y de sus barras
+        de 1 minuto, por lo que snapshot_fingerprint solo incluye esas filas. Los cambios de volumen o de precio del
+        resto de los activos no ejecutan filter_2 mientras no cambien las filas que pasan. Durante la sesión las
+        filas que pasan reciben trades casi cada minuto, por lo que las vueltas se omiten sobre todo cuando ninguna
+        fila pasa las reglas del día o fuera de la sesión.
+        """
+        # Llena el volumen de los ultimos 20 días la primera vez, despues se actualiza con update_day_volume
+        if self.rolling_volume is None:
+            print("filtro 2")
+            self._seed_rolling_volume()
+        
+        snapshots = self._api_alpaca.get_snapshots_columns(self.list_filter_1)
+        self._update_day_volume_from_snapshots(snapshots)
+        table, index = self._build_feature_table(snapshots)
+        rows = self._day_screener.apply(table)
+        passed = np.isin(snapshots['symbol'], table['symbol'][rows])
+        self.snapshot_fingerprint = tuple(sorted(snapshots[passed][['symbol', 'trade_timestamp', 'minute_timestamp']].tolist()))
+        self._day_screen = (table, index, rows)
+
     def filter_2(self) -> Dict:
         """
         Filtra y selecciona activos basados en criterios específicos.
 
         Realiza una serie de pasos de filtrado y selección de activos basados en volumen, precio y condiciones de pivot.
+        Los criterios estan declarados como reglas (FILTER_2_DAY_RULES y FILTER_2_MINUTE_RULES) que se aplican
+        sobre la tabla de características (ver _build_feature_table). El precio y el volumen de hoy de todos los
+        activos llegan en una sola consulta de snapshots y las reglas del día se aplican al consultarlos (ver
+        refresh_snapshots, se consultan aqui si no se consultaron antes); las barras de 10 minutos solo se consultan para los
+        símbolos que pasaron las reglas del día. Con conf.filter_2_report se muestra cuantos símbolos paso cada
+        regla y su tiempo.
 
         Returns:
             Dict: Un diccionario que contiene los activos que cumplen con los criterios.
         """        
-        # Encuentra el volumen de los días anteriores si self._volume_days está vacío
-        if not self._volume_19_days:
-            print("filtro 2")
-            self._find_volume_19_days()
-               
-        # Obtén la última barra de día para los activos en list_filter_1
-        last_bar_day = self._api_alpaca.get_historical_assets_bars_with(TimeFrame.Day, 1, self.list_filter_1)
-        array_volume_day = np.array([(bars[-1].symbol, bars[-1].timestamp, bars[-1].volume) for _, bars in last_bar_day.data.items()])
-        # Filtra las barras con volumen mayor a 50,000
-        filtered_bar_day = array_volume_day[array_volume_day[:, 2] > 50000]
-        
-        # Obtén el precio más reciente para los activos en list_filter_1
-        last_trades = self._api_alpaca.get_lastet_trade_with(self.list_filter_1)
-        trade_arrays = np.array([(trade.symbol, trade.price) for _, trade in last_trades.items()], dtype=[('symbol', '<U32'), ('price', float)])
-        # Filtra los trades con precio entre 20 y 500
-        filtered_trades = trade_arrays[(trade_arrays['price'] >= 20) & (trade_arrays['price'] <= 500)]
-
-        # Encuentra los símbolos que pasaron los filtros anteriores
-        common_symbols = np.intersect1d(filtered_bar_day[:, 0], filtered_trades['symbol'])
-        
-        # Filtra los símbolos con volumen promedio de 20 días superior a 30,000
-        list_20_days_volume_filter = [
-            symbol
-            for symbol in common_symbols
-            if self._volume_19_days[symbol][-1, 0] != filtered_bar_day[filtered_bar_day[:, 0] == symbol][-1, 1]
-            and np.mean(np.append(self._volume_19_days[symbol][:, 1], filtered_bar_day[filtered_bar_day[:, 0] == symbol][-1, 2])) > 30000
-        ]
-        
-        list_near_pivot = []
-
-        for symbol in list_20_days_volume_filter:
-            # Verifica si el precio está cerca de un punto de pivote
-            pivot_peak = self._check_price_near_pivot(self.dict_asset_pivots[symbol].list_array_strong_peaks, trade_arrays[(trade_arrays['symbol'] == symbol)]['price'][0], self.dict_asset_pivots[symbol].atr * 0.30)
-            pivot_valley = self._check_price_near_pivot(self.dict_asset_pivots[symbol].list_array_strong_valleys, trade_arrays[(trade_arrays['symbol'] == symbol)]['price'][0], self.dict_asset_pivots[symbol].atr * 0.30)
-            
-            # Agrega símbolos que cumplen las condiciones a la lista
-            if pivot_peak is not None and pivot_peak > trade_arrays[(trade_arrays['symbol'] == symbol)]['price'][0]:
-                list_near_pivot.append((symbol, pivot_peak, "buy"))
-            if pivot_valley is not None and pivot_valley < trade_arrays[(trade_arrays['symbol'] == symbol)]['price'][0]:
-                list_near_pivot.append((symbol, pivot_valley, "sell"))
-        
-        # Extrae los símbolos de la lista cerca de puntos de pivote
-        symbol_list = [symbol for symbol, _, _ in list_near_pivot]
-        
-        # Obtiene los últimos datos de barras de 10 minutos para los símbolos
-        bars_10_minutes = self._api_alpaca.get_last_10_minute_bars(symbol_list)
-        
-        # Calcula el close promedio de 5 minutos anteriores y filtra resultados mayores a 0
-        window_size = 5  # Tamaño de la ventana para el promedio de cierres
-        avg_close_last_5 = np.array([
-            (symbol, np.mean([bar.close for bar in bars[-window_size:]]))
-            for symbol, bars in bars_10_minutes.data.items()
-            if len(bars) >= window_size
-        ], dtype=[('symbol', 'U10'), ('avg_close', float)])
-        # Crea una nueva lista para almacenar los elementos válidos
-        new_list_near_pivot = []
-        
-        new_list_near_pivot = [
-            (symbol, pivot, action)
-            for symbol, pivot, action in list_near_pivot
-            if (
-                (action == "buy" and trade_arrays[trade_arrays['symbol'] == symbol]['price'][0] >
-                avg_close_last_5[avg_close_last_5['symbol'] == symbol]['avg_close'])
-                or
-                (action == "sell" and trade_arrays[trade_arrays['symbol'] == symbol]['price'][0] <
-                avg_close_last_5[avg_close_last_5['symbol'] == symbol]['avg_close'])
-            )
-        ]
-        # Actualiza la lista original con los elementos válidos
-        list_near_pivot = new_list_near_pivot
-                
-        # Calcula el volumen promedio de 10 minutos y filtra aquellos mayores a 1000
-        avg_volume_minutes = [
-            (symbol, avg)
-            for symbol, bars in bars_10_minutes.data.items()
-            if (avg := np.mean([bar.volume for bar in bars])) > 1000
-        ]
-        
-        # Crea un diccionario con los símbolos cerca de pivotes y su información
-        near_pivot = {
-            symbol: {'action': action, 'pivot': pivot, 'avg': avg}
-            for symbol_avg, avg in avg_volume_minutes
-            for symbol, pivot, action in list_near_pivot
-            if symbol_avg == symbol
-        }
+        # Obtén el último trade y la barra diaria de hoy de los activos en list_filter_1, cada consulta se usa una vez
+        if self._day_screen is None:
+            self.refresh_snapshots()
+        (table, index, rows), self._day_screen = self._day_screen, None
+
+        if conf.filter_2_report:
+            print(self._day_screener.format_report())
+
+        near_pivot = {}
+        if len(rows) > 0:
+            self._join_minute_features(table, index, table['symbol'][rows].tolist())
+            rows = rows[self._minute_screener.apply(table[rows])]
+            if conf.filter_2_report:
+                print(self._minute_screener.format_report())
+
+            # La venta tiene prioridad si el precio esta cerca de un pico y de un valle
+            for symbol, price, peak, valley, avg_close, avg in table[rows][['symbol', 'price', 'peak', 'valley', 'avg_close_5', 'avg_volume_10']].tolist():
+                if valley < price and price < avg_close:
+                    near_pivot[symbol] = {'action': "sell", 'pivot': valley, 'avg': avg}
+                else:
+                    near_pivot[symbol] = {'action': "buy", 'pivot': peak, 'avg': avg}
 
         print(len(near_pivot))
         print(near_pivot.keys())
@@ -300,7 +433,7 @@ class PivotFilter:
         Revisa si hay un pivote cercano al precio actual del activo dentro de un rango dado.
 
         Args:
-            list_pivots (np.ndarray): Lista de arrays que contiene los pivotes.
+            list_pivots (np.ndarray): Array de pivots con formato PIVOT_DTYPE (timestamp, price).
             current_price (float): El precio actual del activo.
             par_slip (float): El rango mínimo de precio entre el precio actual y los pivotes.
 
@@ -308,14 +441,12 @@ class PivotFilter:
             float-None: float si encuentra un pivote cercano al precio actual dentro del rango de par_slip dólares, en caso contrario None.
         """
         # Se revisa si la lista esta vacia
-        if np.any(list_pivots):
-            # Aumetamos
+        if len(list_pivots) > 0:
             # Busca los pivots que se encuentren cerca al precio
-            check_near_strong_pivot = np.where((np.abs(list_pivots[:,1] - current_price) < par_slip))
-            check_near_strong_pivot = list_pivots[check_near_strong_pivot]
-            # En caso de encontrar retorna True
-            if np.any(check_near_strong_pivot) :
-                return check_near_strong_pivot[-1][1]
+            check_near_strong_pivot = list_pivots[np.abs(list_pivots['price'] - current_price) < par_slip]
+            # En caso de encontrar retorna el precio del pivot
+            if len(check_near_strong_pivot) > 0:
+                return check_near_strong_pivot[-1]['price']
             else:
                 return None
         else:
@@ -333,7 +464,7 @@ class PivotFilter:
         symbol_list = self.list_filter_1
         
         # Obtener datos históricos de los activos
-        assets_bars = self._api_alpaca.get_historical_assets_bars_with(TimeFrame.Day, 365*year, symbol_list)
+        assets_bars = self._api_alpaca.get_historical_assets_columns_with(TimeFrame.Day, 365*year, symbol_list)
 
         # Estructuras de datos para almacenar los pivotes
         data = {}
@@ -341,27 +472,31 @@ class PivotFilter:
         pivot_weak_data = {}
 
         # Generar los datos para cada activo
-        for asset, bars in assets_bars.data.items():
+        for asset, bars in assets_bars.items():
+            # Fechas en utc a partir de los timestamps en nanosegundos
+            dates = bars['timestamp'].astype('datetime64[ns]').astype('datetime64[D]').tolist()
             new_list_bars = [{
                 'time': {
-                    'year': bar.timestamp.year,
-                    'month': bar.timestamp.month,
-                    'day': bar.timestamp.day
+                    'year': date.year,
+                    'month': date.month,
+                    'day': date.day
                 },
-                'open': bar.open,
-                'high': bar.high,
-                'low': bar.low,
-                'close': bar.close,
-                'volume': bar.volume
-            } for bar in bars]
+                'open': open_price,
+                'high': high,
+                'low': low,
+                'close': close,
+                'volume': volume
+            } for date, open_price, high, low, close, volume in zip(
+                dates, bars['open'].tolist(), bars['high'].tolist(), bars['low'].tolist(), bars['close'].tolist(), bars['volume'].tolist()
+            )]
             data[asset] = new_list_bars
                         
             pivots = self.dict_asset_pivots[asset]
 
-            list_strong_peaks = [peak[1] for peak in pivots.list_array_strong_peaks]
-            list_strong_valleys = [valley[1] for valley in pivots.list_array_strong_valleys]
-            list_weak_peaks = [peak[1] for peak in pivots.list_array_weak_peaks]
-            list_weak_valleys = [valley[1] for valley in pivots.list_array_weak_valleys]
+            list_strong_peaks = pivots.list_array_strong_peaks['price'].tolist()
+            list_strong_valleys = pivots.list_array_strong_valleys['price'].tolist()
+            list_weak_peaks = pivots.list_array_weak_peaks['price'].tolist()
+            list_weak_valleys = pivots.list_array_weak_valleys['price'].tolist()
 
             pivot_strong_data[asset] = [list_strong_peaks, list_strong_valleys]
             pivot_weak_data[asset] = [list_weak_peaks, list_weak_valleys]
@@ -493,9 +628,27 @@ class FinvizApi:
 
 #region Controladores
 class RealTimeController:
-    def __init__(self, queue: Queue, list_symbols: List[str]) -> None:
-        self._queue = queue
-        self.list_symbols = list_symbols
+    def __init__(self, on_trade: Callable[[str, float, float, int], None], list_symbols: List[str],
+                 on_daily_bar: Callable[[str, int, float], None] = None, list_daily_bar_symbols: List[str] = ()) -> None:
+        """
+        Mantiene un solo stream de trades durante toda la sesión. Cuando cambian los símbolos solo se envían al
+        stream las suscripciones de los símbolos nuevos y las desuscripciones de los eliminados, sin cerrar la
+        conexión (ver update_subscriptions).
+
+        El stream solo se inicia cuando tiene alguna suscripción (símbolos o barras diarias): sin suscripciones
+        StockDataStream espera la primera girando sin pausa en el bucle de eventos (ver start y start_task).
+
+        Args:
+            on_trade (Callable[[str, float, float, int], None]): Recibe cada trade (símbolo, precio, tamaño y
+                timestamp en nanosegundos epoch), por ejemplo TradeChannel.put.
+            list_symbols (List[str]): Símbolos a los que se suscribe al iniciar.
+            on_daily_bar (Callable[[str, int, float], None], opcional): Recibe cada actualización de la barra
+                diaria (símbolo, timestamp en nanosegundos epoch y volumen acumulado del día).
+            list_daily_bar_symbols (List[str], opcional): Símbolos de los que se reciben las barras diarias
+                durante toda la sesión.
+        """
+        self._on_trade = on_trade
+        self._on_daily_bar = on_daily_bar
         self._stream = StockDataStream(
             api_key=conf.alpaca_api_key_id,
             secret_key=conf.alpaca_api_secret_key,
@@ -503,103 +656,330 @@ class RealTimeController:
             feed=conf.alpaca_data_feed,
             websocket_params=None,
             url_override=None)
+        # Símbolos suscritos al stream
+        self._subscribed: Set[str] = set()
+        self._daily_bars = on_daily_bar is not None and len(list_daily_bar_symbols) > 0
+        # Tarea de run_async, se crea con la primera suscripción (ver start_task)
+        self._task: Optional[asyncio.Task] = None
+        self.update_subscriptions(list_symbols)
+        if self._daily_bars:
+            self._stream.subscribe_daily_bars(self._daily_bar_callback, *list_daily_bar_symbols)
         
     async def _trade_callback(self, trade):
-        trade_data = trade_data = {
-            'symbol': trade.symbol,
-            'price': trade.price,
-            'size': trade.size,
-            'timestamp': trade.timestamp
-        }
-        self._queue.put(trade_data)
+        # El timestamp se entrega en nanosegundos epoch
+        self._on_trade(trade.symbol, trade.price, trade.size, int(trade.timestamp.timestamp() * 1_000_000_000))
+
+    async def _daily_bar_callback(self, bar):
+        self._on_daily_bar(bar.symbol, int(bar.timestamp.timestamp() * 1_000_000_000), bar.volume)
         
-    def start(self):
-        self._stream.subscribe_trades(self._trade_callback, *self.list_symbols)
+    @property
+    def list_symbols(self) -> List[str]:
+        return list(self._subscribed)
+
+    @property
+    def has_subscriptions(self) -> bool:
+        """bool: Si el stream tiene símbolos o barras diarias suscritas."""
+        return self._daily_bars or len(self._subscribed) > 0
+
+    def update_subscriptions(self, list_symbols: List[str]):
+        """
+        Suscribe el stream a los símbolos nuevos y lo desuscribe de los que ya no estan en list_symbols.
+
+        Mientras el stream esta conectado StockDataStream espera a que su bucle de eventos envíe cada mensaje,
+        por lo que este método se debe llamar desde otro hilo (ver start y update_subscriptions_async).
+
+        Args:
+            list_symbols (List[str]): Símbolos a los que debe quedar suscrito el stream.
+        """
+        symbols = set(list_symbols)
+        removed = self._subscribed - symbols
+        added = symbols - self._subscribed
+        if removed:
+            self._stream.unsubscribe_trades(*removed)
+        if added:
+            self._stream.subscribe_trades(self._trade_callback, *added)
+        self._subscribed = symbols
+
+    async def update_subscriptions_async(self, list_symbols: List[str]):
+        """Variante de update_subscriptions para el mismo bucle de eventos de run_async, inicia el stream con la primera suscripción."""
+        await asyncio.to_thread(self.update_subscriptions, list_symbols)
+        self.start_task()
+
+    def _follow_subscriptions(self, control: MessageChannel):
+        # Aplica cada lista de símbolos que llega por el canal de control
+        while True:
+            list_symbols = control.get()
+            try:
+                self.update_subscriptions(list_symbols)
+            except Exception as error:
+                print("Error al actualizar las suscripciones: ", error)
+
+    def start(self, control: MessageChannel = None):
+        """
+        Corre el stream, bloquea el hilo que lo llama. Mientras no tenga suscripciones solo espera la siguiente
+        lista de símbolos de control, sin iniciar el stream; sin control ni suscripciones retorna.
+
+        Args:
+            control (MessageChannel, opcional): Canal por el que llegan las nuevas listas de símbolos, se aplican
+                con update_subscriptions desde un hilo.
+        """
+        while not self.has_subscriptions:
+            if control is None:
+                return
+            self.update_subscriptions(control.get())
+        if control is not None:
+            threading.Thread(target=self._follow_subscriptions, args=(control,), daemon=True).start()
         self._stream.run()
-    
+
+    def start_task(self) -> Optional[asyncio.Task]:
+        """
+        Crea en el bucle de eventos actual la tarea de run_async si el stream tiene suscripciones y aun no se creo.
+
+        Returns:
+            Optional[asyncio.Task]: La tarea, None si aun no hay suscripciones.
+        """
+        if self._task is None and self.has_subscriptions:
+            self._task = asyncio.get_running_loop().create_task(self.run_async())
+        return self._task
+
+    async def stop_async(self):
+        """Cancela la tarea de run_async, si se creo, y espera a que cierre la conexión."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def run_async(self):
+        """
+        Variante de start para un bucle de eventos que ya esta corriendo, termina al cancelar la tarea. Se debe
+        llamar con alguna suscripción (ver start_task), RuntimeError si no hay ninguna.
+
+        StockDataStream no tiene una corrutina publica para correr el stream: run ejecuta _run_forever con
+        asyncio.run, lo que crea otro bucle de eventos. Correr run en un hilo no sirve aqui porque los callbacks
+        (y las tareas que crean, ver PivotController._on_trade) deben correr en este mismo bucle, por lo
+        que se espera _run_forever a traves de _run_stream_forever.
+        """
+        if not self.has_subscriptions:
+            raise RuntimeError("El stream no tiene suscripciones, StockDataStream esperaria la primera sin pausa")
+        try:
+            await _run_stream_forever(self._stream)
+        finally:
+            await self._stream.close()
+
+
+async def _run_stream_forever(par_stream: StockDataStream) -> None:
+    """
+    Unico punto que usa la API privada de StockDataStream: espera su corrutina _run_forever en el bucle de eventos
+    actual.
+
+    Comportamiento del que depende, igual en alpaca-py 0.10.0 (requierements.txt) y 0.44.0: _run_forever guarda
+    el bucle actual, espera girando sin pausa (asyncio.sleep(0)) hasta que el stream tenga algun handler, despues
+    conecta y consume los mensajes hasta stop_ws o hasta que se cancela. subscribe_trades y unsubscribe_trades
+    envian los mensajes a ese bucle desde otros hilos. Por la espera sin pausa no se debe llamar sin suscripciones.
+    Al actualizar alpaca-py se debe revisar este comportamiento.
+
+    Args:
+        par_stream (StockDataStream): Stream con alguna suscripción.
+    """
+    run_forever = getattr(par_stream, '_run_forever', None)
+    if run_forever is None or not asyncio.iscoroutinefunction(run_forever):
+        raise RuntimeError("StockDataStream no tiene la corrutina _run_forever, revisar la version de alpaca-py (ver requierements.txt)")
+    await run_forever()
+
 
 class AlphaController:
-    def __init__(self, subscribed_symbols, traded_assets) -> None:
+    def __init__(self, subscribed_symbols: SharedSymbols = None, traded_channel: MessageChannel = None) -> None:
         """
         Inicializa la clase AlphaController.
 
         Crea una instancia de AlphaTraderPro para interactuar con la plataforma de trading.
         Inicializa una lista para rastrear los activos que han sido objeto de operaciones.
 
+        Args:
+            subscribed_symbols (SharedSymbols, opcional): Símbolos suscritos con acciones, pivotes y promedios,
+                publicados por PivotController.start. No se usa en PivotController.start_async.
+            traded_channel (MessageChannel, opcional): Canal por el que se avisa a PivotController.start de cada
+                activo negociado. No se usa en PivotController.start_async.
+
         Attributes:
             client (AlphaTraderPro): Instancia de AlphaTraderPro para interactuar con la plataforma de trading.
             traded_assets (List[str]): Lista de activos que han sido objeto de operaciones.
         """
         self._client = AlphaTraderProApi()
+        # Sigue el estado de las ordenes enviadas con un solo hilo de consulta
+        self._order_tracker = OrderTracker(self._client)
+        # Activos con una orden de entrada en curso
+        self._pending_symbols = set()
         self.subscribed_symbols = subscribed_symbols
-        self.traded_assets = traded_assets
+        self.traded_assets: List[str] = []
+        # Protege _pending_symbols y traded_assets, los modifican el hilo de los trades y el hilo del OrderTracker
+        self._entry_lock = threading.Lock()
+        # Hilos que reenvian las ordenes no completadas, el hilo del OrderTracker no debe bloquearse con un envio
+        self._retry_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='entry-retry')
+        self._traded_channel = traded_channel
+        # Nanosegundos entre la llegada de un trade y el envio de la orden, en PivotController.start_async
+        self.tick_to_order_latencies: List[int] = []
+
+    def __getstate__(self) -> dict:
+        # El lock y los hilos de reintento no se copian a los procesos de PivotController.start (spawn)
+        state = self.__dict__.copy()
+        del state['_entry_lock']
+        del state['_retry_executor']
+        return state
+
+    def __setstate__(self, par_state: dict) -> None:
+        self.__dict__.update(par_state)
+        self._entry_lock = threading.Lock()
+        self._retry_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='entry-retry')
+
+    def _reserve(self, symbol) -> bool:
+        # Marca el activo con una orden de entrada en curso, False si ya fue negociado o ya tiene una orden
+        with self._entry_lock:
+            if symbol in self.traded_assets or symbol in self._pending_symbols:
+                return False
+            self._pending_symbols.add(symbol)
+            return True
+
+    def _release(self, symbol, traded: bool) -> None:
+        # Termina la orden de entrada en curso del activo
+        with self._entry_lock:
+            if traded:
+                self.traded_assets.append(symbol)
+            self._pending_symbols.discard(symbol)
+        if traded and self._traded_channel is not None:
+            self._traded_channel.send(symbol)
 
     def _buy(self, symbol):
         """
         Realiza una operación de compra.
 
-        Realiza un intento de compra del activo utilizando AlphaTraderPro.
-        Si la orden se completa exitosamente, agrega el activo a la lista de activos negociados.
+        Envía la orden de compra del activo utilizando AlphaTraderPro sin esperar su confirmación, ver _enter.
 
         Args:
             symbol (str): Símbolo del activo a comprar.
-
-        Returns:
-            bool: True si la operación se completó, False si no.
         """
-        if symbol not in self.traded_assets:
+        if self._reserve(symbol):
             print("Compra: ", symbol)
-            for i in range(1, 3):
-                print("Intento numero: ", i)
-                order = self._client.send_order(Order(symbol, 0, 100, Exchange.BATS, Type.MARKET, Side.BUY))
-                time.sleep(1)
-                if order == 'filled':
-                    self.traded_assets.append(symbol)
-                    print("Orden completada")
-                    return True
-            print("Orden no completada")
-            return False
-
-    def _sell(self, symbol) -> bool:
+            self._enter(symbol, Side.BUY, 1)
+
+    def _sell(self, symbol):
         """
         Realiza una operación de venta.
 
-        Realiza un intento de venta del activo utilizando AlphaTraderPro.
-        Si la orden se completa exitosamente, agrega el activo a la lista de activos negociados.
+        Envía la orden de venta del activo utilizando AlphaTraderPro sin esperar su confirmación, ver _enter.
 
         Args:
             symbol (str): Símbolo del activo a vender.
-
-        Returns:
-            bool: True si la operación se completó, False si no.
         """
-        if symbol not in self.traded_assets:
+        if self._reserve(symbol):
             print("Venta: ", symbol)
-            for i in range(1, 3):
-                print("Intento numero: ", i)
-                order = self._client.send_order(Order(symbol, 0, 100, Exchange.BATS, Type.MARKET, Side.SELL))
-                time.sleep(1)
-                if order == 'filled':
-                    self.traded_assets.append(symbol)
-                    print("Orden completada")
-                    return True
-            print("Orden no completada")
-            return False
-
-    def check_trade(self, queue: Queue):
+            self._enter(symbol, Side.SELL, 1)
+
+    def _enter(self, symbol, side, attempt):
+        """
+        Envía una orden de entrada y sigue su estado con el OrderTracker. Cuando la orden se completa el activo
+        se agrega a la lista de activos negociados; si no se completa se reintenta hasta dos veces. La
+        confirmación llega en el hilo del tracker, por lo que la cola de trades nunca se bloquea, y el reintento
+        se envía desde _retry_executor para no detener la confirmación de las demás órdenes. El activo debe
+        estar reservado con _reserve.
+
+        Args:
+            symbol (str): Símbolo del activo.
+            side (Side): Lado de la orden.
+            attempt (int): Número de intento.
+        """
+        print("Intento numero: ", attempt)
+        future = self._order_tracker.submit(Order(symbol, 0, 100, Exchange.BATS, Type.MARKET, side))
+        future.add_done_callback(lambda done: self._on_entry_done(symbol, side, attempt, done))
+
+    def _on_entry_done(self, symbol, side, attempt, future):
+        # Se ejecuta en el hilo del OrderTracker (o en el que envio la orden si se resolvio al enviarla)
+        status = None if future.exception() is not None else future.result()
+        if status == Status.FILLED:
+            self._release(symbol, True)
+            print("Orden completada: ", symbol)
+        elif attempt < 2:
+            self._retry_executor.submit(self._enter, symbol, side, attempt + 1)
+        else:
+            self._release(symbol, False)
+            print("Orden no completada: ", symbol)
+
+    def check_trade(self, channel: TradeChannel):
+        # Los cambios de suscripción se aplican en otro hilo apenas se publican, aunque no lleguen trades,
+        # para que la tuberia no se llene y bloquee al proceso principal. La consulta del símbolo es local
+        self.subscribed_symbols.listen()
         while True:
-            trade = queue.get()  
-            symbol = trade['symbol']
-            price = trade['price']
-            volume = trade['volume']
-            pivot = self.subscribed_symbols[symbol]['pivot']
-            avg = self.subscribed_symbols[symbol]['avg']
-            action = self.subscribed_symbols[symbol]['action']
-            
-            if action == "buy" and pivot < price and volume > avg * 5:
-                self._buy(symbol)
-            if action == "sell" and pivot > price and volume > avg * 5:
-                self._sell(symbol)    
+            trade = channel.get()
+            side = self._trade_side(trade, self.subscribed_symbols.get(trade['symbol']))
+            if side == Side.BUY:
+                self._buy(trade['symbol'])
+            elif side == Side.SELL:
+                self._sell(trade['symbol'])
+
+    def _trade_side(self, trade, data) -> Optional[Side]:
+        """
+        Decide si un trade cuyo volumen supero el umbral da una señal de entrada.
+
+        Args:
+            trade (dict): Trade con las llaves symbol, price y volume.
+            data (dict): Acción, pivote y promedio del símbolo, None si el símbolo ya no esta suscrito (pudo
+                dejar de estarlo mientras el trade estaba en camino).
+
+        Returns:
+            Optional[Side]: Lado de la orden de entrada, None si no hay señal.
+        """
+        if data is None:
+            return None
+        price = trade['price']
+        volume = trade['volume']
+        pivot = data['pivot']
+        avg = data['avg']
+        action = data['action']
+        
+        if action == "buy" and pivot < price and volume > avg * 5:
+            return Side.BUY
+        if action == "sell" and pivot > price and volume > avg * 5:
+            return Side.SELL
+        return None
+
+    def enter_async(self, symbol, side, received_at: int) -> Optional[asyncio.Task]:
+        """
+        Variante de _buy y _sell para PivotController.start_async: la orden de entrada se envía y se confirma en
+        una tarea del bucle de eventos, por lo que el stream nunca se bloquea.
+
+        Args:
+            symbol (str): Símbolo del activo.
+            side (Side): Lado de la orden.
+            received_at (int): Momento (time.perf_counter_ns) en que llego el trade que dio la señal.
+
+        Returns:
+            Optional[asyncio.Task]: La tarea de la orden, None si el activo ya fue negociado o tiene una orden en curso.
+        """
+        if not self._reserve(symbol):
+            return None
+        print("Compra: " if side == Side.BUY else "Venta: ", symbol)
+        return asyncio.create_task(self._enter_async(symbol, side, received_at))
+
+    async def _enter_async(self, symbol, side, received_at: int):
+        traded = False
+        try:
+            for attempt in (1, 2):
+                print("Intento numero: ", attempt)
+                try:
+                    # El envio se hace en un hilo, la confirmación la resuelve el hilo del OrderTracker
+                    future = await asyncio.to_thread(self._order_tracker.submit, Order(symbol, 0, 100, Exchange.BATS, Type.MARKET, side))
+                    if attempt == 1:
+                        self.tick_to_order_latencies.append(time.perf_counter_ns() - received_at)
+                    status = await asyncio.wrap_future(future)
+                except Exception as error:
+                    print("Error al enviar la orden: ", error)
+                    status = None
+                if status == Status.FILLED:
+                    traded = True
+                    print("Orden completada: ", symbol)
+                    return
+            print("Orden no completada: ", symbol)
+        finally:
+            self._release(symbol, traded)
     
     def check_positions(self):
         """
@@ -612,12 +992,31 @@ class AlphaController:
         while True:
             time.sleep(1)
             positions_list = self._client.get_all_positions()
-            for position in positions_list:
-                if float(position['Unrealized']) <= -3 or float(position['Unrealized']) >= 5:
-                    if int(position['Qty']) > 0:
-                        self._client.send_order(Order(position['Symbol'], 0, 100, Exchange.BATS, Type.MARKET, Side.SELL))
-                    else:
-                        self._client.send_order(Order(position['Symbol'], 0, 100, Exchange.BATS, Type.MARKET, Side.BUY))
+            for order in self._exit_orders(positions_list):
+                self._client.send_order(order)
+
+    async def check_positions_async(self):
+        """Variante de check_positions para PivotController.start_async, las consultas y órdenes se esperan sin bloquear el bucle."""
+        while True:
+            await asyncio.sleep(1)
+            try:
+                positions_list = await self._client.get_all_positions_async()
+                orders = self._exit_orders(positions_list)
+                if orders:
+                    await self._client.send_orders_async(orders)
+            except Exception as error:
+                print("Error al administrar las posiciones: ", error)
+
+    def _exit_orders(self, positions_list) -> List[Order]:
+        # Ordenes que cierran las posiciones con pérdidas o ganancias considerables
+        orders = []
+        for position in positions_list:
+            if float(position['Unrealized']) <= -3 or float(position['Unrealized']) >= 5:
+                if int(position['Qty']) > 0:
+                    orders.append(Order(position['Symbol'], 0, 100, Exchange.BATS, Type.MARKET, Side.SELL))
+                else:
+                    orders.append(Order(position['Symbol'], 0, 100, Exchange.BATS, Type.MARKET, Side.BUY))
+        return orders
           
 class PivotController:
     def __init__(self) -> None:
@@ -638,21 +1037,42 @@ class PivotController:
         self.pivot_filter = PivotFilter()
         self._last_minute = None
         self.trades = {}
-    
-    def _start_real_time(self, list_symbols: List[str], queue_real_time: Queue):
-        controller = RealTimeController(queue_real_time, list_symbols)
-        controller.start()
+
+    def _daily_bar_symbols(self) -> List[str]:
+        # Las barras diarias del stream solo se piden si conf las activa, el plan Basic no admite todo el filtro 1
+        return self.pivot_filter.list_filter_1 if conf.alpaca_daily_bars_stream else []
+
+    def _start_real_time(self, list_symbols: List[str], channel_real_time: TradeChannel, channel_subscriptions: MessageChannel,
+                         list_daily_bar_symbols: List[str] = (), channel_day_volume: LatestValuesChannel = None):
+        # Solo se guarda el ultimo volumen de cada símbolo, el callback del stream no escribe en la tuberia
+        on_daily_bar = None if channel_day_volume is None else lambda symbol, timestamp, volume: channel_day_volume.put(symbol, (timestamp, volume))
+        controller = RealTimeController(channel_real_time.put, list_symbols, on_daily_bar, list_daily_bar_symbols)
+        controller.start(channel_subscriptions)
         
-    def _receive_trade(self, queue_real_time: Queue, queue_alpha_trader: Queue):
+    def _receive_trade(self, channel_real_time: TradeChannel, channel_alpha_trader: TradeChannel):
         while True:
-            trade = queue_real_time.get()
-            current_time = datetime.now().astimezone(pytz.utc)
-            # Si cambió el minuto, reiniciamos los datos de operaciones
-            if self._last_minute != current_time.minute:
-                self._reset_trades(current_time.minute)
-            # Actualizamos los datos de operaciones y verificamos condiciones
-            self._update_trade_data(trade)
-            self._check_trade_condition(trade, queue_alpha_trader)
+            trade = channel_real_time.get()
+            if self._aggregate_trade(trade):
+                # Enviar trade a alphatrader para comprobar si es comprable
+                channel_alpha_trader.put_trade(trade)
+
+    def _aggregate_trade(self, trade) -> bool:
+        """
+        Acumula el volumen del minuto del trade y verifica si supera el umbral.
+
+        Args:
+            trade: Trade recibido en tiempo real.
+
+        Returns:
+            bool: True si el volumen del minuto supera el umbral, en ese caso se agrega al trade en la llave volume.
+        """
+        current_time = datetime.now().astimezone(pytz.utc)
+        # Si cambió el minuto, reiniciamos los datos de operaciones
+        if self._last_minute != current_time.minute:
+            self._reset_trades(current_time.minute)
+        # Actualizamos los datos de operaciones y verificamos condiciones
+        self._update_trade_data(trade)
+        return self._check_trade_condition(trade)
 
     def _reset_trades(self, new_minute):
         """
@@ -675,18 +1095,18 @@ class PivotController:
         if trade['symbol'] not in self.trades:
             self.trades[trade['symbol']] = 0
 
-        # Acumula el tamaño de la operación si el minuto actual coincide
-        if self._last_minute == trade['timestamp'].minute:
+        # Acumula el tamaño de la operación si el minuto actual coincide (timestamp en nanosegundos epoch, utc)
+        if self._last_minute == trade['timestamp'] // 60_000_000_000 % 60:
             self.trades[trade['symbol']] += trade['size']
             
-    def _check_trade_condition(self, trade, queue_alpha_trader: Queue):
-        # Verifica si el tamaño de operación supera el umbral y toma acción si es así
+    def _check_trade_condition(self, trade) -> bool:
+        # Verifica si el tamaño de operación supera el umbral
         current_volume = self.trades.get(trade['symbol'], 0)
         if current_volume > 4000:
             # Se guarda el volumen actual del activo
             trade['volume'] = current_volume
-            # Enviar trade a alphatrader para comprobar si es comprable
-            queue_alpha_trader.put(trade)
+            return True
+        return False
 
     def start(self):
         """
@@ -696,6 +1116,9 @@ class PivotController:
         y administración de posiciones. Se encarga de gestionar las suscripciones a activos en tiempo real
         basándose en ciertos filtros y condiciones.
 
+        filter_2 se ejecuta en cada limite de barra mas un desfase (conf.filter_2_period_seconds y
+        conf.filter_2_offset_seconds) y solo si sus entradas cambiaron, ver CadenceScheduler.
+
         El proceso de trading continuará hasta que se acerque la hora de cierre del mercado, momento en el cual
         se terminarán los procesos en curso y se cerrarán todas las posiciones abiertas.
 
@@ -705,19 +1128,30 @@ class PivotController:
         """
         real_time_process = None
         list_symbols_to_subscribed: List[str] = []
-        manager = multiprocessing.Manager()
-        real_time_queue = manager.Queue()
-        subscribed_symbols = manager.dict({})
-        traded_assets = manager.list([])
+        # Los trades viajan por tuberias con registros de tamaño fijo, sin pasar por un multiprocessing.Manager
+        real_time_channel = TradeChannel()
+        # Los símbolos suscritos se publican a check_trade, que los consulta de forma local
+        subscribed_symbols = SharedSymbols()
+        # check_trade avisa de los activos negociados por este canal
+        traded_channel = MessageChannel()
+        traded_assets: List[str] = []
+        # El proceso del stream se crea una sola vez, los cambios de símbolos le llegan por este canal
+        subscriptions_channel = MessageChannel()
+        # El ultimo volumen de hoy de cada activo del filtro 1 llega del stream por este canal, unido en el proceso
+        # del stream, porque aqui solo se lee una vez por vuelta
+        day_volume_channel = LatestValuesChannel()
+        if self.pivot_filter.list_filter_1:
+            real_time_process = multiprocessing.Process(target=self._start_real_time, args=([], real_time_channel, subscriptions_channel, self._daily_bar_symbols(), day_volume_channel,))
+            real_time_process.start()
         
         # Proceso que estara encargado de procesar los trades cuyo volumen supere el umbral y tradearlos
-        alpha_trader = AlphaController(subscribed_symbols, traded_assets)
-        alpha_trader_queue = manager.Queue()
-        check_trades_process = multiprocessing.Process(target=alpha_trader.check_trade, args=(alpha_trader_queue,))
+        alpha_trader = AlphaController(subscribed_symbols, traded_channel)
+        alpha_trader_channel = TradeChannel()
+        check_trades_process = multiprocessing.Process(target=alpha_trader.check_trade, args=(alpha_trader_channel,))
         check_trades_process.start()
         
         # Proceso que estara encargado de recibir los trades que lleguen de real_time_process y procesarlos
-        receive_trades_process = multiprocessing.Process(target=self._receive_trade, args=(real_time_queue, alpha_trader_queue,))
+        receive_trades_process = multiprocessing.Process(target=self._receive_trade, args=(real_time_channel, alpha_trader_channel,))
         receive_trades_process.start()
         
         # Proceso que estara encargado de consultar las posiciones para administrar ganancias o perdidas
@@ -727,12 +1161,15 @@ class PivotController:
         # Tiempo de cierre establecido  5  minutos antes del mercado
         time_to_close = self.next_close - timedelta(minutes=5)
         
+        # filter_2 corre una vez por barra de 1 minuto y solo si sus entradas cambiaron
+        scheduler = CadenceScheduler(conf.filter_2_period_seconds, conf.filter_2_offset_seconds)
+        
         while True:
+            scheduler.wait()
             # Obtén la fecha y hora actuales
             current_time = datetime.now().astimezone(pytz.utc)
             print("")
             print(current_time)
-            assets_filter_2 = self.pivot_filter.filter_2()
             
             if current_time > time_to_close:
                 print("5 minutos para cerrar el mercado, cerrando el programa...")
@@ -742,33 +1179,139 @@ class PivotController:
                 if real_time_process is not None:
                         real_time_process.terminate()
                 alpha_trader._client.close_all_positions()
+                print(scheduler.format_metrics())
                 break
+            
+            # Ultimo volumen de hoy de las barras diarias recibidas desde la ultima vuelta
+            for symbol, (timestamp, volume) in day_volume_channel.drain().items():
+                self.pivot_filter.update_day_volume(symbol, timestamp, volume)
+            # Activos negociados desde la ultima vuelta
+            traded_assets.extend(traded_channel.drain())
+            # Precios, barras de 1 minuto y volumen de hoy de los snapshots
+            self.pivot_filter.refresh_snapshots()
+            
+            if not scheduler.should_run(self._filter_2_inputs(traded_assets)):
+                print("Sin cambios desde la ultima ejecucion de filter_2")
+                continue
+            scheduler.start_run()
+            assets_filter_2 = self.pivot_filter.filter_2()
                 
             if len(assets_filter_2) > 0:
                 # Filtrar el diccionario para quitar aquellos symbolos que ya han sido tradeados
                 filtered_assets = {symbol: data for symbol, data in assets_filter_2.items() if symbol not in traded_assets}
                 list_symbols_to_subscribed = list(filtered_assets.keys())
                 # Obtiene las listas y las convierte en set para comparar si son iguales
-                set_suscribed_symbols = set(subscribed_symbols.keys())
+                set_suscribed_symbols = set(subscribed_symbols.published_keys())
                 set_symbols_to_subscribed = set(list_symbols_to_subscribed)
                 
                 if set_suscribed_symbols != set_symbols_to_subscribed:
-                    if real_time_process is not None:
-                        real_time_process = real_time_process.terminate()
-                    
-                    # Se actualiza la variable con memoria compartida de usbscribed_symbols
-                    # Elimina las claves no presentes en filtered_assets
-                    for symbol in subscribed_symbols.keys():
-                        if symbol not in filtered_assets:
-                            del subscribed_symbols[symbol]
-                    # Actualiza los valores de las claves existentes y agrega las nuevas
-                    subscribed_symbols.update(filtered_assets)
-                    
-                    real_time_process = multiprocessing.Process(target=self._start_real_time, args=(list_symbols_to_subscribed, real_time_queue,))
-                    real_time_process.start()
-            else:
-                if real_time_process is not None:
-                    real_time_process = real_time_process.terminate()
+                    # Publica a check_trade solo los símbolos eliminados, nuevos o modificados
+                    subscribed_symbols.publish(filtered_assets)
+                    self._update_real_time(real_time_process, list_symbols_to_subscribed, subscriptions_channel)
+            elif len(subscribed_symbols.published_keys()) > 0:
+                subscribed_symbols.publish({})
+                self._update_real_time(real_time_process, [], subscriptions_channel)
+            
+            scheduler.finish_run(self._filter_2_inputs(traded_assets))
+            print(scheduler.format_metrics())
+
+    def _filter_2_inputs(self, traded_assets: List[str]) -> Tuple[Tuple[Tuple[str, int, int], ...], int]:
+        # Entradas de cada vuelta: ultimo trade y ultima barra de 1 minuto de las filas que pasaron las reglas del día
+        # (ver PivotFilter.refresh_snapshots) y activos negociados
+        return self.pivot_filter.snapshot_fingerprint, len(traded_assets)
+
+    def _update_real_time(self, real_time_process, list_symbols: List[str], channel_subscriptions: MessageChannel):
+        # El stream sigue conectado, solo se le envian los nuevos símbolos para que aplique las diferencias
+        if real_time_process is not None:
+            channel_subscriptions.send(list_symbols)
+
+    def start_async(self):
+        """
+        Variante de start que corre en un solo proceso con un bucle de eventos.
+
+        El stream de trades, la acumulación de volumen (_aggregate_trade), la verificación de señales
+        (AlphaController._trade_side) y la administración de posiciones son corrutinas del mismo bucle, sin
+        procesos ni comunicación entre procesos. Las órdenes se esperan sin bloquear el bucle y filter_2 corre
+        en un hilo. Al cerrar se muestra la latencia desde la llegada de cada trade hasta el envio de su orden.
+        """
+        asyncio.run(self._run_async())
+
+    def _on_trade(self, symbol: str, price: float, size: float, timestamp: int):
+        # Recibe cada trade del stream en el bucle de eventos de start_async
+        received_at = time.perf_counter_ns()
+        trade = {'symbol': symbol, 'price': price, 'size': size, 'timestamp': timestamp}
+        if self._aggregate_trade(trade):
+            side = self._alpha_trader._trade_side(trade, self._subscribed_symbols.get(symbol))
+            if side is not None:
+                self._alpha_trader.enter_async(symbol, side, received_at)
+
+    async def _run_async(self):
+        # El stream se crea una sola vez, recibe las barras diarias de los activos del filtro 1 (si conf las activa)
+        # y solo se le envian las diferencias de los símbolos de los trades
+        real_time: Optional[RealTimeController] = None
+        # Símbolos suscritos con acciones, pivotes y promedios, se consultan desde _on_trade
+        self._subscribed_symbols: Dict[str, Dict] = {}
+        self._alpha_trader = AlphaController()
+        check_positions_task = asyncio.create_task(self._alpha_trader.check_positions_async())
+        # Barras diarias recibidas del stream, se aplican entre ejecuciones de filter_2 (que corre en un hilo)
+        day_volumes: List[Tuple[str, int, float]] = []
+        if self.pivot_filter.list_filter_1:
+            real_time = RealTimeController(self._on_trade, [], lambda symbol, timestamp, volume: day_volumes.append((symbol, timestamp, volume)), self._daily_bar_symbols())
+            # Con las barras diarias el stream inicia ya, si no con la primera lista de símbolos de filter_2
+            real_time.start_task()
+        
+        # Tiempo de cierre establecido  5  minutos antes del mercado
+        time_to_close = self.next_close - timedelta(minutes=5)
+        
+        # filter_2 corre una vez por barra de 1 minuto y solo si sus entradas cambiaron
+        scheduler = CadenceScheduler(conf.filter_2_period_seconds, conf.filter_2_offset_seconds)
+        
+        while True:
+            await scheduler.wait_async()
+            current_time = datetime.now().astimezone(pytz.utc)
+            print("")
+            print(current_time)
+            
+            if current_time > time_to_close:
+                print("5 minutos para cerrar el mercado, cerrando el programa...")
+                check_positions_task.cancel()
+                if real_time is not None:
+                    await real_time.stop_async()
+                await self._alpha_trader._client.close_all_positions_async()
+                latencies = sorted(self._alpha_trader.tick_to_order_latencies)
+                if latencies:
+                    print("Latencia trade-orden (ms): mediana", latencies[len(latencies) // 2] / 1e6, "maxima", latencies[-1] / 1e6)
+                print(scheduler.format_metrics())
+                break
+            
+            # Volumen de hoy de las barras diarias recibidas desde la ultima vuelta
+            for symbol, timestamp, volume in day_volumes:
+                self.pivot_filter.update_day_volume(symbol, timestamp, volume)
+            day_volumes.clear()
+            # Precios, barras de 1 minuto y volumen de hoy de los snapshots
+            await asyncio.to_thread(self.pivot_filter.refresh_snapshots)
+            
+            if not scheduler.should_run(self._filter_2_inputs(self._alpha_trader.traded_assets)):
+                print("Sin cambios desde la ultima ejecucion de filter_2")
+                continue
+            scheduler.start_run()
+            assets_filter_2 = await asyncio.to_thread(self.pivot_filter.filter_2)
+                
+            if len(assets_filter_2) > 0:
+                # Filtrar el diccionario para quitar aquellos symbolos que ya han sido tradeados
+                filtered_assets = {symbol: data for symbol, data in assets_filter_2.items() if symbol not in self._alpha_trader.traded_assets}
+                
+                if set(self._subscribed_symbols.keys()) != set(filtered_assets.keys()):
+                    self._subscribed_symbols = filtered_assets
+                    if real_time is not None:
+                        await real_time.update_subscriptions_async(list(filtered_assets.keys()))
+            elif self._subscribed_symbols:
+                self._subscribed_symbols = {}
+                if real_time is not None:
+                    await real_time.update_subscriptions_async([])
+            
+            scheduler.finish_run(self._filter_2_inputs(self._alpha_trader.traded_assets))
+            print(scheduler.format_metrics())
      
 
 #endregion
@@ -1,6 +1,10 @@
 from controller.pivot_controller import PivotController
+from configurate import conf
 
 if __name__ == "__main__":
     controller = PivotController()
     #controller.pivot_filter.plot_pivots()
-    controller.start()
\ No newline at end of file
+    if conf.trading_run_mode == "asyncio":
+        controller.start_async()
+    else:
+        controller.start()
\ No newline at end of file
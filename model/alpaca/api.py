@@ -3,9 +3,7 @@
 from alpaca.common.rest import RESTClient  # Para hacer solicitudes HTTP a la API de Alpaca
 from alpaca.trading.client import TradingClient  # Para enviar órdenes y obtener información de cuenta
 from alpaca.data.historical.stock import StockHistoricalDataClient  # Para obtener datos históricos de mercado
-from alpaca.data.live.stock import StockDataStream  # Para obtener flujos de datos de mercado en tiempo real
 from alpaca.trading.requests import GetAssetsRequest  # Para obtener información sobre los activos disponibles en Alpaca
-from alpaca.data.requests import StockBarsRequest  # Para obtener barras de precios de un símbolo durante un período de tiempo
 from alpaca.data.requests import StockLatestBarRequest # Para obtener la ultima barra de precios de un símbolo
 from alpaca.data.requests import StockLatestTradeRequest # Para obtener el ultimo trade de un símbolo
 from alpaca.common.enums import BaseURL  # La URL base para las solicitudes a la API de Alpaca
@@ -15,34 +13,385 @@ from datetime import datetime, timedelta  # Para manejar fechas y tiempos
 import pytz  # Para manejar zonas horarias
 
 # Importaciones para definir tipos de datos
-from typing import Union, Dict, Any, List
+from typing import Union, Dict, Any, List, Tuple
 
 # Importaciones relacionadas con los modelos de datos de Alpaca
 from alpaca.trading.models import UUID  # Modelo de UUID de Alpaca
 from alpaca.trading.models import Position  # Modelo de posición de Alpaca
 from alpaca.trading.models import ClosePositionResponse  # Modelo de respuesta al cerrar posición de Alpaca
 from alpaca.data.models import Bar  # Modelo de conjunto de barras de precios
+from alpaca.data.models import BarSet  # Modelo de conjunto de barras de varios simbolos
 from alpaca.trading.models import Order  # Modelo de orden de Alpaca
 from alpaca.data.models import Trade # Modelo de trade de Alpaca
-from alpaca.trading.models import Asset  # Modelo de activo de Alpaca
-from alpaca.trading.models import Clock # Modelo para manejar el tiempo
 
 import holidays # Para saber si es dia festivo
 
 # Importaciones relacionadas con las solicitudes y filtrado de datos
 from alpaca.trading.requests import ClosePositionRequest  # Para solicitar el cierre de una posición en Alpaca
-from alpaca.trading.requests import OrderRequest  # Para enviar una orden en Alpaca
 from alpaca.data.enums import Adjustment  # Para especificar ajustes de stock split o dividendos
 from alpaca.data.enums import DataFeed  # Para especificar el feed de datos que se quiere utilizar (IEX, SIP)
 from alpaca.trading.enums import AssetStatus  # Para filtrar los activos disponibles en Alpaca por su estado
 from alpaca.trading.enums import AssetClass  # Para filtrar los activos disponibles en Alpaca por su clase
 from alpaca.data.timeframe import TimeFrame  # Para definir el marco de tiempo de los datos solicitados
+from alpaca.data.timeframe import TimeFrameUnit  # Para conocer la duracion de las barras
+
+# Importaciones para las solicitudes concurrentes de barras
+import asyncio  # Para ejecutar las solicitudes de forma concurrente
+import time  # Para limitar la frecuencia de las solicitudes
+import threading  # Para proteger el pool de sesiones
+import os  # Para detectar si el pool se usa desde otro proceso
+import requests  # Para enviar solicitudes HTTP
+
+# Importaciones de la cache de barras
+import numpy as np
+from model.alpaca.bar_cache import BarCache, BAR_DTYPE
 
 #endregion
 
+# Fecha de inicio del tiempo epoch, para convertir fechas a nanosegundos
+EPOCH = datetime(1970, 1, 1, tzinfo=pytz.utc)
+
+# Duracion de una unidad de cada temporalidad, los meses se toman como el mes mas largo
+TIME_FRAME_UNIT_DURATION = {
+    TimeFrameUnit.Minute: timedelta(minutes=1),
+    TimeFrameUnit.Hour: timedelta(hours=1),
+    TimeFrameUnit.Day: timedelta(days=1),
+    TimeFrameUnit.Week: timedelta(weeks=1),
+    TimeFrameUnit.Month: timedelta(days=31),
+}
+
+# Snapshot de un símbolo en columnas: último trade, barra de 1 minuto, barra diaria de hoy y la del día anterior.
+# Los timestamps estan en nanosegundos epoch, los datos que no vienen en el snapshot quedan en 0 (timestamps) o NaN
+SNAPSHOT_DTYPE = np.dtype([
+    ('symbol', '<U32'),
+    ('trade_timestamp', np.int64),
+    ('price', float),
+    ('minute_timestamp', np.int64),
+    ('minute_close', float),
+    ('minute_volume', float),
+    ('day_timestamp', np.int64),
+    ('day_close', float),
+    ('day_volume', float),
+    ('previous_day_close', float),
+    ('previous_day_volume', float),
+])
+
+# Campos de cada parte del snapshot de alpaca: (llave, columna del timestamp, [(campo, columna)])
+SNAPSHOT_SOURCES = [
+    ('latestTrade', 'trade_timestamp', [('p', 'price')]),
+    ('minuteBar', 'minute_timestamp', [('c', 'minute_close'), ('v', 'minute_volume')]),
+    ('dailyBar', 'day_timestamp', [('c', 'day_close'), ('v', 'day_volume')]),
+    ('prevDailyBar', None, [('c', 'previous_day_close'), ('v', 'previous_day_volume')]),
+]
+
+def _datetime_to_ns(par_date: datetime) -> int:
+    # Convierte una fecha con zona horaria a nanosegundos epoch
+    return (par_date - EPOCH) // timedelta(microseconds=1) * 1000
+
+def _ns_to_datetime(par_ns: int) -> datetime:
+    # Convierte nanosegundos epoch a una fecha en utc
+    return EPOCH + timedelta(microseconds=par_ns // 1000)
+
+def _raw_bars_to_records(par_raw_bars: List[Dict[str, Any]]) -> np.ndarray:
+    # Convierte las barras en formato de alpaca (json) en registros BAR_DTYPE sin construir objetos Bar
+    records = np.empty(len(par_raw_bars), dtype=BAR_DTYPE)
+    if len(par_raw_bars) == 0:
+        return records
+    records['timestamp'] = _iso_to_ns([bar['t'] for bar in par_raw_bars])
+    # Los valores que faltan (None) quedan como NaN
+    values = np.array([
+        (bar['o'], bar['h'], bar['l'], bar['c'], bar['v'], bar.get('n'), bar.get('vw'))
+        for bar in par_raw_bars
+    ], dtype=np.float64)
+    for index, field in enumerate(BAR_DTYPE.names[1:]):
+        records[field] = values[:, index]
+    return records
+
+def _iso_to_ns(par_dates: List[str]) -> np.ndarray:
+    # Las fechas llegan en formato ISO en utc ('2023-01-03T05:00:00Z'), se quita la zona para que numpy las lea
+    return np.char.rstrip(np.array(par_dates, dtype=str), 'Z').astype('datetime64[ns]').view(np.int64)
+
+def _raw_snapshots_to_records(par_raw_snapshots: Dict[str, Dict[str, Any]]) -> np.ndarray:
+    """
+    Convierte los snapshots en formato de alpaca (json, {simbolo: snapshot}) en registros SNAPSHOT_DTYPE, uno por
+    símbolo en el orden de la respuesta, sin construir objetos Snapshot.
+    """
+    symbols = list(par_raw_snapshots.keys())
+    records = np.zeros(len(symbols), dtype=SNAPSHOT_DTYPE)
+    records['symbol'] = symbols
+    snapshots = [par_raw_snapshots[symbol] or {} for symbol in symbols]
+    for source, timestamp_field, fields in SNAPSHOT_SOURCES:
+        for _, field in fields:
+            records[field] = np.nan
+        # Solo las filas que traen esta parte del snapshot
+        rows = [row for row, snapshot in enumerate(snapshots) if snapshot.get(source)]
+        if len(rows) == 0:
+            continue
+        parts = [snapshots[row][source] for row in rows]
+        if timestamp_field is not None:
+            records[timestamp_field][rows] = _iso_to_ns([part['t'] for part in parts])
+        for key, field in fields:
+            records[field][rows] = np.array([part.get(key) for part in parts], dtype=np.float64)
+    return records
+
+def _start_of_days(par_days: int, par_current_date: datetime) -> datetime:
+    # Calcula la fecha de inicio para consultar par_days dias, si es un dia se busca el ultimo dia habil anterior
+    if par_days == 1:
+        start = par_current_date - timedelta(days=2)
+        us_holidays = holidays.country_holidays('US')  
+        while start.weekday() >= 4 or start in us_holidays:
+            start -= timedelta(days=1)
+    else:
+        start = par_current_date - timedelta(days=par_days)
+    return start
+
+def _records_to_raw_bars(par_records: np.ndarray) -> List[Dict[str, Any]]:
+    # Convierte registros BAR_DTYPE al formato de barras que envia alpaca, para construir un BarSet
+    return [
+        {
+            't': _ns_to_datetime(timestamp), 'o': open_price, 'h': high, 'l': low, 'c': close, 'v': volume,
+            'n': None if trade_count != trade_count else trade_count,
+            'vw': None if vwap != vwap else vwap,
+        }
+        for timestamp, open_price, high, low, close, volume, trade_count, vwap in par_records.tolist()
+    ]
+
+class AlpacaBarsFetcher:
+    """
+    Cliente asincrono para consultar barras historicas de muchos simbolos. Las solicitudes se dividen en lotes
+    de simbolos y rangos de fechas, se ejecutan de forma concurrente respetando un limite de solicitudes por
+    minuto y se vuelven a unir en el mismo formato de barras que envia alpaca ({simbolo: [barras]}).
+    """
+    def __init__(self, api_key_id:str, api_secret_key:str, data_feed:DataFeed, base_url:str = BaseURL.DATA.value, requests_per_minute:int = 200, max_concurrent_requests:int = 8, symbols_per_request:int = 100, days_per_request:int = 365, symbols_per_snapshot_request:int = 1000):
+        """
+        Args:
+            api_key_id (str): La clave de la API de Alpaca.
+            api_secret_key (str): La clave secreta de la API de Alpaca.
+            data_feed (DataFeed): La alimentación de datos de Alpaca a utilizar.
+            base_url (str, optional): URL base de la API de datos, se puede cambiar para apuntar a un servidor local.
+            requests_per_minute (int, optional): Numero maximo de solicitudes por minuto.
+            max_concurrent_requests (int, optional): Numero maximo de solicitudes en curso al mismo tiempo.
+            symbols_per_request (int, optional): Numero maximo de simbolos por solicitud.
+            days_per_request (int, optional): Numero maximo de dias por solicitud.
+            symbols_per_snapshot_request (int, optional): Numero maximo de simbolos por solicitud de snapshots.
+        """
+        self.base_url = base_url.rstrip('/')
+        self.data_feed = data_feed
+        self.requests_per_minute = requests_per_minute
+        self.max_concurrent_requests = max_concurrent_requests
+        self.symbols_per_request = symbols_per_request
+        self.days_per_request = days_per_request
+        self.symbols_per_snapshot_request = symbols_per_snapshot_request
+        # Numero de intentos maximos por solicitud
+        self.maximum_request = 5
+        self._headers = {
+            'APCA-API-KEY-ID': api_key_id,
+            'APCA-API-SECRET-KEY': api_secret_key,
+        }
+        # Sesiones inactivas con conexiones reutilizables. requests.Session no es segura entre hilos, por lo que cada
+        # solicitud toma una sesion libre y la devuelve al terminar; el pool se conserva entre llamadas a get_bars
+        self._sessions: List[requests.Session] = []
+        self._sessions_lock = threading.Lock()
+        # Proceso dueño del pool, un proceso hijo no debe usar los sockets heredados del padre
+        self._sessions_pid = os.getpid()
+
+    def __getstate__(self) -> dict:
+        # Las sesiones y el lock no se copian a otros procesos (spawn), cada proceso abre las suyas
+        state = self.__dict__.copy()
+        del state['_sessions']
+        del state['_sessions_lock']
+        return state
+
+    def __setstate__(self, par_state: dict) -> None:
+        self.__dict__.update(par_state)
+        self._sessions = []
+        self._sessions_lock = threading.Lock()
+        self._sessions_pid = os.getpid()
+        
+    def get_bars(self, par_time_frame:TimeFrame, par_start:datetime, par_end:datetime, par_symbols_assets:List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Consulta las barras de forma sincrona, ejecutando get_bars_async en un nuevo bucle de eventos.
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: Barras en formato de alpaca por simbolo.
+        """
+        return asyncio.run(self.get_bars_async(par_time_frame, par_start, par_end, par_symbols_assets))
+        
+    async def get_bars_async(self, par_time_frame:TimeFrame, par_start:datetime, par_end:datetime, par_symbols_assets:List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Consulta las barras de los simbolos entre dos fechas dividiendo la consulta en lotes concurrentes.
+
+        Args:
+            par_time_frame (TimeFrame): La temporalidad de las barras.
+            par_start (datetime): Fecha de inicio de los datos, en utc.
+            par_end (datetime): Fecha de fin de los datos, en utc.
+            par_symbols_assets (List[str]): Símbolos de los activos.
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: Barras en formato de alpaca por simbolo, ordenadas por fecha.
+        """
+        if isinstance(par_symbols_assets, str):
+            par_symbols_assets = [par_symbols_assets]
+        
+        # Lotes de simbolos y rangos de fechas
+        symbol_batches = [par_symbols_assets[i:i + self.symbols_per_request] for i in range(0, len(par_symbols_assets), self.symbols_per_request)]
+        # El fin de cada solicitud es inclusivo, por lo que los rangos que no son el ultimo terminan un segundo antes
+        # del inicio del siguiente para que una barra en el limite no llegue en los dos lotes
+        date_ranges = []
+        range_start = par_start
+        while range_start < par_end:
+            range_end = min(range_start + timedelta(days=self.days_per_request), par_end)
+            date_ranges.append((range_start, range_end if range_end == par_end else range_end - timedelta(seconds=1)))
+            range_start = range_end
+        
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        rate_limit = _RateLimit(self.requests_per_minute)
+        chunks = [(symbols, start, end) for start, end in date_ranges for symbols in symbol_batches]
+        results = await asyncio.gather(*[
+            self._get_chunk(par_time_frame, start, end, symbols, semaphore, rate_limit)
+            for symbols, start, end in chunks
+        ])
+        
+        # Se unen los lotes en orden de fecha
+        raw_bars: Dict[str, List[Dict[str, Any]]] = {}
+        for chunk_bars in results:
+            for symbol, bars in chunk_bars.items():
+                raw_bars.setdefault(symbol, []).extend(bars)
+        return raw_bars
+    
+    async def _get_chunk(self, par_time_frame:TimeFrame, par_start:datetime, par_end:datetime, par_symbols:List[str], par_semaphore:asyncio.Semaphore, par_rate_limit:'_RateLimit') -> Dict[str, List[Dict[str, Any]]]:
+        # Consulta todas las paginas de un lote
+        params = {
+            'symbols': ','.join(par_symbols),
+            'timeframe': par_time_frame.value,
+            'start': par_start.astimezone(pytz.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'end': par_end.astimezone(pytz.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'limit': 10000,
+            'adjustment': Adjustment.SPLIT.value,
+            'feed': self.data_feed.value,
+        }
+        chunk_bars: Dict[str, List[Dict[str, Any]]] = {}
+        while True:
+            async with par_semaphore:
+                response = await self._get_page('/v2/stocks/bars', params, par_rate_limit)
+            for symbol, bars in (response.get('bars') or {}).items():
+                chunk_bars.setdefault(symbol, []).extend(bars)
+            page_token = response.get('next_page_token')
+            if not page_token:
+                return chunk_bars
+            params = dict(params, page_token=page_token)
+    
+    def get_snapshots(self, par_symbols_assets:List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Consulta los snapshots de forma sincrona, ejecutando get_snapshots_async en un nuevo bucle de eventos.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Snapshot en formato de alpaca por simbolo.
+        """
+        return asyncio.run(self.get_snapshots_async(par_symbols_assets))
+
+    async def get_snapshots_async(self, par_symbols_assets:List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Consulta el snapshot (ultimo trade, ultima quote, barra de 1 minuto, barra diaria y barra diaria anterior)
+        de cada simbolo, dividiendo la consulta en lotes concurrentes.
+
+        Args:
+            par_symbols_assets (List[str]): Símbolos de los activos.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Snapshot en formato de alpaca por simbolo, None si no tiene datos.
+        """
+        if isinstance(par_symbols_assets, str):
+            par_symbols_assets = [par_symbols_assets]
+
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        rate_limit = _RateLimit(self.requests_per_minute)
+        symbol_batches = [par_symbols_assets[i:i + self.symbols_per_snapshot_request] for i in range(0, len(par_symbols_assets), self.symbols_per_snapshot_request)]
+        results = await asyncio.gather(*[self._get_snapshot_chunk(symbols, semaphore, rate_limit) for symbols in symbol_batches])
+
+        raw_snapshots: Dict[str, Dict[str, Any]] = {}
+        for chunk_snapshots in results:
+            raw_snapshots.update(chunk_snapshots)
+        return raw_snapshots
+
+    async def _get_snapshot_chunk(self, par_symbols:List[str], par_semaphore:asyncio.Semaphore, par_rate_limit:'_RateLimit') -> Dict[str, Dict[str, Any]]:
+        # Los snapshots no tienen paginas, una solicitud por lote
+        params = {
+            'symbols': ','.join(par_symbols),
+            'feed': self.data_feed.value,
+        }
+        async with par_semaphore:
+            response = await self._get_page('/v2/stocks/snapshots', params, par_rate_limit)
+        # Algunas versiones de la api agrupan los snapshots en la llave 'snapshots'
+        return response.get('snapshots', response)
+
+    def _acquire_session(self) -> requests.Session:
+        # Toma una sesion inactiva del pool o crea una nueva
+        with self._sessions_lock:
+            if self._sessions_pid != os.getpid():
+                self._sessions = []
+                self._sessions_pid = os.getpid()
+            if self._sessions:
+                return self._sessions.pop()
+        session = requests.Session()
+        session.headers.update(self._headers)
+        return session
+
+    def _release_session(self, par_session: requests.Session) -> None:
+        # Devuelve la sesion al pool, si ya hay una por cada solicitud concurrente se cierra
+        with self._sessions_lock:
+            if len(self._sessions) < self.max_concurrent_requests:
+                self._sessions.append(par_session)
+                return
+        par_session.close()
+    
+    def _get(self, par_url:str, par_params:Dict[str, Any]) -> requests.Response:
+        # Se ejecuta en un hilo de asyncio.to_thread
+        session = self._acquire_session()
+        try:
+            return session.get(par_url, params=par_params, timeout=30)
+        finally:
+            self._release_session(session)
+    
+    async def _get_page(self, par_path:str, par_params:Dict[str, Any], par_rate_limit:'_RateLimit') -> Dict[str, Any]:
+        # Solicita una pagina, reintentando si el servidor limita las solicitudes o falla
+        for i in range(0, self.maximum_request):
+            await par_rate_limit.wait()
+            try:
+                response = await asyncio.to_thread(self._get, self.base_url + par_path, par_params)
+            except requests.RequestException:
+                if i == self.maximum_request - 1:
+                    raise
+                # Se espera antes de reintentar, igual que con las respuestas de error
+                await asyncio.sleep(2 ** i)
+                continue
+            if response.status_code == 429 or response.status_code >= 500:
+                if i == self.maximum_request - 1:
+                    response.raise_for_status()
+                # Se espera antes de reintentar, mas tiempo en cada intento
+                await asyncio.sleep(2 ** i)
+                continue
+            response.raise_for_status()
+            return response.json()
+
+class _RateLimit:
+    # Separa el inicio de las solicitudes para no superar el numero de solicitudes por minuto
+    def __init__(self, par_requests_per_minute: int) -> None:
+        self._interval = 60 / par_requests_per_minute
+        self._next_time = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def wait(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            if self._next_time > now:
+                await asyncio.sleep(self._next_time - now)
+                now = self._next_time
+            self._next_time = now + self._interval
+
 class AlpacaApi:
     # region initial
-    def __init__(self, api_key_id:str, api_secret_key:str, data_feed:DataFeed):
+    def __init__(self, api_key_id:str, api_secret_key:str, data_feed:DataFeed, bar_cache_directory:str = None):
         """
         Inicializa la clase ApiAlpaca con las claves de la API de Alpaca y la alimentación de datos.
 
@@ -50,7 +399,11 @@ class AlpacaApi:
             api_key_id (str): La clave de la API de Alpaca.
             api_secret_key (str): La clave secreta de la API de Alpaca.
             data_feed (DataFeed):La alimentación de datos de Alpaca a utilizar.
+            bar_cache_directory (str, optional): Directorio de la cache en disco de barras historicas. Si es None no se usa cache.
         """
+        # Inicializa la cache de barras historicas
+        self._bar_cache: BarCache = BarCache(bar_cache_directory) if bar_cache_directory else None
+        
         # Inicializa el numero de intentos maximos para hacer solicitudes al servidor de alpaca
         self.maximum_request = 5
         
@@ -84,6 +437,9 @@ class AlpacaApi:
             api_key = api_key_id,
             secret_key = api_secret_key
         )
+        
+        # Crea un cliente para consultar barras de muchos simbolos con solicitudes concurrentes
+        self._bars_fetcher = AlpacaBarsFetcher(api_key_id, api_secret_key, data_feed)
        
         
     #endregion
@@ -157,30 +513,132 @@ class AlpacaApi:
         [(BarSet | RawData)(...), (BarSet | RawData)(...), ...]
         """
         current_date = datetime.now().astimezone(pytz.utc)
+        start = _start_of_days(par_days, current_date)
+        return self.get_historical_assets_bars_between(par_time_frame, start, current_date, par_symbols_assets)
+
+    def get_historical_assets_bars_between(self, par_time_frame:TimeFrame, par_start:datetime, par_end:datetime, par_symbols_assets:List[str]) -> Dict[str, List[Bar]]:
+        """
+        Este método recupera los datos históricos de uno o mas símbolos en específico entre dos fechas.
         
-        if par_days == 1:
-            start =  current_date - timedelta(days=2)
-            us_holidays = holidays.country_holidays('US')  
-            while start.weekday() >= 4 or start in us_holidays:
-                start -= timedelta(days=1)
-        else:
-            start = current_date - timedelta(days=par_days)
-        
-        stock_bars= StockBarsRequest(
-            symbol_or_symbols=par_symbols_assets,
-            start= start,                                       # Fecha con parDays antes de la fecha actual y conversión a utc
-            end= current_date,                                  # Fecha actual y conversión a utc
-            limit=None,                                                                # Sin límite para el número de barras
-            timeframe= par_time_frame,                                                   # Temporalidad de las barras
-            adjustment=Adjustment.SPLIT,                                               # Data ajustada por splits
-            feed= self.data_feed                                                        # Alimentación de datos definida en la instanciación de la clase
-        )
+        Si la clase tiene cache de barras solo se consultan los rangos que no estan en disco, las barras que
+        aun no terminan se consultan siempre y no se guardan.
 
-        # Solicita las barras de stock a la API de Alpaca utilizando el cliente de datos históricos
-        bars_day = self._stock_historical_data_client.get_stock_bars(stock_bars)
+        Args:
+            par_time_frame (TimeFrame): La temporalidad de las barras. Ejemplo: TimeFrame.Day, TimeFrame.Minute
+            par_start (datetime): Fecha de inicio de los datos, en utc.
+            par_end (datetime): Fecha de fin de los datos (inclusiva), en utc.
+            par_symbols_assets (str): El/los símbolos del activo para el cual recuperar los datos. Ejemplo: ["NVDA", "AMD"], "NVDA"
+            
+        Returns:
+            StockBars: Un objeto BarSet que contiene los datos históricos del símbolo dado.
+            
+        Nota 1:
+            Los datos se ajustan para splits.
+        """
+        if self._bar_cache is None:
+            return self._request_stock_bars(par_time_frame, par_start, par_end, par_symbols_assets)
+        
+        dict_records = self.get_historical_assets_columns_between(par_time_frame, par_start, par_end, par_symbols_assets)
+        return BarSet({symbol: _records_to_raw_bars(records) for symbol, records in dict_records.items()})
+    
+    def get_historical_assets_columns_with(self, par_time_frame:TimeFrame, par_days:int, par_symbols_assets:List[str]) -> Dict[str, np.ndarray]:
+        """
+        Igual que get_historical_assets_bars_with pero retorna las barras en columnas (registros BAR_DTYPE), sin
+        construir un objeto Bar por cada barra.
+
+        Args:
+            par_time_frame (TimeFrame): La temporalidad de las barras. Ejemplo: TimeFrame.Day, TimeFrame.Minute
+            par_days (int): Número de días hacia atrás desde la fecha actual para recuperar los datos.
+            par_symbols_assets (str): El/los símbolos del activo para el cual recuperar los datos.
+            
+        Returns:
+            Dict[str, np.ndarray]: Barras con formato BAR_DTYPE por símbolo, ordenadas por timestamp.
+        """
+        current_date = datetime.now().astimezone(pytz.utc)
+        start = _start_of_days(par_days, current_date)
+        return self.get_historical_assets_columns_between(par_time_frame, start, current_date, par_symbols_assets)
+
+    def get_historical_assets_columns_between(self, par_time_frame:TimeFrame, par_start:datetime, par_end:datetime, par_symbols_assets:List[str]) -> Dict[str, np.ndarray]:
+        """
+        Igual que get_historical_assets_bars_between pero retorna las barras en columnas (registros BAR_DTYPE).
+        El json de la respuesta se convierte directo a arreglos de numpy, sin validar un modelo por cada barra,
+        lo que reduce el uso de cpu y memoria en consultas de muchos símbolos y años.
+
+        Args:
+            par_time_frame (TimeFrame): La temporalidad de las barras. Ejemplo: TimeFrame.Day, TimeFrame.Minute
+            par_start (datetime): Fecha de inicio de los datos, en utc.
+            par_end (datetime): Fecha de fin de los datos (inclusiva), en utc.
+            par_symbols_assets (str): El/los símbolos del activo para el cual recuperar los datos.
+            
+        Returns:
+            Dict[str, np.ndarray]: Barras con formato BAR_DTYPE por símbolo, ordenadas por timestamp. Los
+            símbolos sin barras no se incluyen.
+        """
+        if isinstance(par_symbols_assets, str):
+            par_symbols_assets = [par_symbols_assets]
+        
+        if self._bar_cache is None:
+            return self._request_stock_records(par_time_frame, par_start, par_end, par_symbols_assets)
+        
+        key = (par_time_frame.value, Adjustment.SPLIT.value, self.data_feed.value)
+        start = _datetime_to_ns(par_start)
+        # El fin de alpaca es inclusivo y la cache usa rangos [inicio, fin), por lo que una barra justo en par_end
+        # se incluye igual que sin cache
+        end = _datetime_to_ns(par_end) + 1
+        # Las barras que empiezan despues de este limite aun pueden cambiar, no se guardan en disco
+        final_end = min(end, _datetime_to_ns(datetime.now().astimezone(pytz.utc) - par_time_frame.amount * TIME_FRAME_UNIT_DURATION[par_time_frame.unit]))
+        
+        # Se agrupan los simbolos por rango faltante, normalmente todos comparten el mismo rango
+        dict_missing_ranges: Dict[Tuple[int, int], List[str]] = {}
+        for symbol in par_symbols_assets:
+            for missing_range in self._bar_cache.missing_ranges(symbol, key, start, end):
+                dict_missing_ranges.setdefault(missing_range, []).append(symbol)
+        
+        # Se consultan los rangos faltantes, se guardan las barras terminadas y se conservan en memoria las demas
+        dict_unfinished_bars: Dict[str, List[np.ndarray]] = {}
+        for (missing_start, missing_end), symbols in dict_missing_ranges.items():
+            dict_records = self._request_stock_records(par_time_frame, _ns_to_datetime(missing_start), _ns_to_datetime(missing_end), symbols)
+            for symbol in symbols:
+                records = dict_records.get(symbol, np.empty(0, dtype=BAR_DTYPE))
+                self._bar_cache.write(symbol, key, records, missing_start, min(missing_end, final_end))
+                dict_unfinished_bars.setdefault(symbol, []).append(records[records['timestamp'] >= max(missing_start, final_end)])
+        
+        # Se arma la respuesta con las barras de disco y las que no se guardaron
+        dict_symbol_records: Dict[str, np.ndarray] = {}
+        for symbol in par_symbols_assets:
+            records = np.concatenate([self._bar_cache.read(symbol, key, start, end)] + dict_unfinished_bars.get(symbol, []))
+            records = records[(records['timestamp'] >= start) & (records['timestamp'] < end)]
+            if len(records) > 0:
+                dict_symbol_records[symbol] = records
+        
+        return dict_symbol_records
+    
+    def _request_stock_bars(self, par_time_frame:TimeFrame, par_start:datetime, par_end:datetime, par_symbols_assets:List[str]) -> Dict[str, List[Bar]]:
+        """
+        Solicita las barras de uno o mas símbolos a la API de Alpaca. La consulta se divide en lotes de símbolos
+        y rangos de fechas que se solicitan de forma concurrente con AlpacaBarsFetcher.
+
+        Args:
+            par_time_frame (TimeFrame): La temporalidad de las barras.
+            par_start (datetime): Fecha de inicio de los datos, en utc.
+            par_end (datetime): Fecha de fin de los datos, en utc.
+            par_symbols_assets (str): El/los símbolos del activo para el cual recuperar los datos.
+            
+        Returns:
+            StockBars: Un objeto BarSet que contiene los datos históricos del símbolo dado.
+        """
+        # Solicita las barras de stock a la API de Alpaca, datos ajustados por splits y con el feed de la instancia
+        raw_bars = self._bars_fetcher.get_bars(par_time_frame, par_start, par_end, par_symbols_assets)
 
         # Devolver las barras de stock recuperadas
-        return bars_day
+        return BarSet(raw_bars)
+
+    def _request_stock_records(self, par_time_frame:TimeFrame, par_start:datetime, par_end:datetime, par_symbols_assets:List[str]) -> Dict[str, np.ndarray]:
+        """
+        Igual que _request_stock_bars pero convierte la respuesta directo a registros BAR_DTYPE por símbolo.
+        """
+        raw_bars = self._bars_fetcher.get_bars(par_time_frame, par_start, par_end, par_symbols_assets)
+        return {symbol: _raw_bars_to_records(bars) for symbol, bars in raw_bars.items() if len(bars) > 0}
 
     def get_last_10_minute_bars(self, par_symbols_assets: List[str]) -> Dict[str, List[Bar]]:             
         current_date = datetime.now().astimezone(pytz.utc) + timedelta(minutes=1)
@@ -197,17 +655,7 @@ class AlpacaApi:
         while start.weekday() >= 5 or start in us_holidays:
             start -= timedelta(days=1)
 
-        stock_bars = StockBarsRequest(
-            symbol_or_symbols=par_symbols_assets,
-            start= start,  # Fecha con parDays antes de la fecha actual y conversión a UTC
-            end= current_date,  # Fecha actual y conversión a UTC
-            limit= None,  # Sin límite para el número de barras
-            timeframe=TimeFrame.Minute,  # Temporalidad de las barras
-            adjustment=Adjustment.SPLIT,  # Datos ajustados por splits
-            feed=self.data_feed  # Alimentación de datos definida en la instanciación de la clase
-        )
-
-        bars_day = self._stock_historical_data_client.get_stock_bars(stock_bars)
+        bars_day = self._request_stock_bars(TimeFrame.Minute, start, current_date, par_symbols_assets)
         return bars_day
 
     def get_opening_bar(self, par_symbols_assets: List[str]) -> Dict[str, List[Bar]]:
@@ -228,17 +676,7 @@ class AlpacaApi:
         while start.weekday() >= 5 or start in us_holidays:
             start -= timedelta(days=1)
 
-        stock_bars = StockBarsRequest(
-            symbol_or_symbols=par_symbols_assets,
-            start=start,  # Fecha con parDays antes de la fecha actual y conversión a UTC
-            end=end,  # Fecha actual y conversión a UTC
-            limit=None,  # Sin límite para el número de barras
-            timeframe=TimeFrame.Minute,  # Temporalidad de las barras
-            adjustment=Adjustment.SPLIT,  # Datos ajustados por splits
-            feed=self.data_feed  # Alimentación de datos definida en la instanciación de la clase
-        )
-
-        bars_day = self._stock_historical_data_client.get_stock_bars(stock_bars)
+        bars_day = self._request_stock_bars(TimeFrame.Minute, start, end, par_symbols_assets)
         return bars_day
 
     def get_news_with(self, par_days:int, par_symbols_assets:str) -> Dict[Any, Any]:
@@ -310,6 +748,21 @@ class AlpacaApi:
         selectPositions = self._trading_client.get_open_position(par_symbol_or_asset_id)
         return selectPositions
     
+    def get_snapshots_columns(self, par_symbols_assets: List[str]) -> np.ndarray:
+        """
+        Obtiene en una sola consulta (dividida en lotes concurrentes) el último trade, la barra de 1 minuto, la
+        barra diaria de hoy y la del día anterior de los símbolos. La respuesta se convierte directo a columnas,
+        sin construir un objeto por cada trade o barra.
+
+        Args:
+            par_symbols_assets (List[str]): Símbolos de los activos.
+
+        Returns:
+            np.ndarray: Registros SNAPSHOT_DTYPE, uno por símbolo con datos. Los datos que faltan quedan en NaN.
+        """
+        raw_snapshots = self._bars_fetcher.get_snapshots(par_symbols_assets)
+        return _raw_snapshots_to_records(raw_snapshots)
+
     def get_lastet_bar_with(self, par_symbols_assets: str)-> Dict[str, List[Bar]]:
         stock_latest_bar = StockLatestBarRequest(
             symbol_or_symbols = par_symbols_assets, 
@@ -0,0 +1,142 @@
+import os
+import json
+import numpy as np
+from typing import List, Tuple  # Importación de módulos para definir tipos de datos
+
+# Formato de las barras almacenadas, los timestamps son nanosegundos epoch
+BAR_DTYPE = np.dtype([
+    ('timestamp', np.int64),
+    ('open', np.float64),
+    ('high', np.float64),
+    ('low', np.float64),
+    ('close', np.float64),
+    ('volume', np.float64),
+    ('trade_count', np.float64),    # NaN si alpaca no lo envia
+    ('vwap', np.float64),           # NaN si alpaca no lo envia
+])
+
+class BarCache:
+    """
+    Cache en disco de barras historicas. Cada llave (simbolo, temporalidad, ajuste, feed) se guarda en un archivo
+    binario de registros BAR_DTYPE, que se lee como memmap, y un archivo json con el rango de fechas cubierto.
+    Las barras nuevas se agregan al final del archivo; solo al ampliar el historial hacia atras se reescribe.
+
+    El rango cubierto es siempre continuo, por lo que basta con consultar lo que falta antes y despues de el.
+    Las barras que aun no terminan no se guardan, quien escribe indica hasta donde los datos son definitivos.
+    """
+    def __init__(self, par_directory: str) -> None:
+        """
+        Args:
+            par_directory (str): Directorio donde se almacenan los archivos de la cache.
+        """
+        self.directory = par_directory
+
+    def _paths(self, par_symbol: str, par_key: Tuple[str, str, str]) -> Tuple[str, str]:
+        # La llave es (temporalidad, ajuste, feed), cada una es una carpeta
+        directory = os.path.join(self.directory, *par_key)
+        file_name = os.path.join(directory, par_symbol.replace('/', '_'))
+        return file_name + '.bin', file_name + '.json'
+
+    def coverage(self, par_symbol: str, par_key: Tuple[str, str, str]) -> Tuple[int, int]:
+        """
+        Retorna el rango [inicio, fin) en nanosegundos epoch cubierto por la cache, None si no hay datos.
+        """
+        _, coverage_path = self._paths(par_symbol, par_key)
+        if not os.path.exists(coverage_path):
+            return None
+        with open(coverage_path, 'r') as coverage_file:
+            coverage = json.load(coverage_file)
+        return coverage['start'], coverage['end']
+
+    def missing_ranges(self, par_symbol: str, par_key: Tuple[str, str, str], par_start: int, par_end: int) -> List[Tuple[int, int]]:
+        """
+        Calcula los rangos que se deben consultar para cubrir [par_start, par_end). Los rangos se extienden hasta el
+        rango cubierto para que este siga siendo continuo.
+
+        Args:
+            par_symbol (str): Simbolo del activo.
+            par_key (Tuple[str, str, str]): Temporalidad, ajuste y feed de las barras.
+            par_start (int): Inicio en nanosegundos epoch.
+            par_end (int): Fin (exclusivo) en nanosegundos epoch.
+
+        Returns:
+            List[Tuple[int, int]]: Rangos [inicio, fin) que faltan.
+        """
+        coverage = self.coverage(par_symbol, par_key)
+        if coverage is None:
+            return [(par_start, par_end)]
+
+        coverage_start, coverage_end = coverage
+        missing = []
+        if par_start < coverage_start:
+            missing.append((par_start, coverage_start))
+        if par_end > coverage_end:
+            missing.append((coverage_end, par_end))
+        return missing
+
+    def read(self, par_symbol: str, par_key: Tuple[str, str, str], par_start: int, par_end: int) -> np.ndarray:
+        """
+        Lee las barras almacenadas en [par_start, par_end).
+
+        Returns:
+            np.ndarray: Barras con formato BAR_DTYPE.
+        """
+        data_path, _ = self._paths(par_symbol, par_key)
+        if not os.path.exists(data_path) or os.path.getsize(data_path) == 0:
+            return np.empty(0, dtype=BAR_DTYPE)
+
+        # Solo se copia el rango pedido, el memmap se libera para poder reescribir el archivo despues
+        bars = np.memmap(data_path, dtype=BAR_DTYPE, mode='r')
+        first = np.searchsorted(bars['timestamp'], par_start, side='left')
+        last = np.searchsorted(bars['timestamp'], par_end, side='left')
+        selected = np.array(bars[first:last])
+        del bars
+        return selected
+
+    def write(self, par_symbol: str, par_key: Tuple[str, str, str], par_bars: np.ndarray, par_start: int, par_end: int) -> None:
+        """
+        Guarda las barras consultadas en [par_start, par_end). par_end debe ser el limite hasta donde los datos
+        son definitivos, las barras desde par_end no se guardan.
+
+        Args:
+            par_symbol (str): Simbolo del activo.
+            par_key (Tuple[str, str, str]): Temporalidad, ajuste y feed de las barras.
+            par_bars (np.ndarray): Barras consultadas con formato BAR_DTYPE, ordenadas por timestamp.
+            par_start (int): Inicio del rango consultado en nanosegundos epoch.
+            par_end (int): Fin (exclusivo) de los datos definitivos en nanosegundos epoch.
+        """
+        if par_end <= par_start:
+            return
+        par_bars = par_bars[(par_bars['timestamp'] >= par_start) & (par_bars['timestamp'] < par_end)]
+        data_path, coverage_path = self._paths(par_symbol, par_key)
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+
+        coverage = self.coverage(par_symbol, par_key)
+        if coverage is not None and par_start <= coverage[1] and par_end > coverage[1] and par_start >= coverage[0]:
+            # Las barras nuevas continuan el rango cubierto, se agregan al final del archivo
+            new_bars = par_bars[par_bars['timestamp'] >= coverage[1]]
+            with open(data_path, 'ab') as data_file:
+                data_file.write(new_bars.tobytes())
+            coverage = (coverage[0], par_end)
+        elif coverage is not None and par_end >= coverage[0] and par_start < coverage[0]:
+            # Las barras son anteriores al rango cubierto, se reescribe el archivo con las barras al inicio
+            stored = np.fromfile(data_path, dtype=BAR_DTYPE) if os.path.exists(data_path) else np.empty(0, dtype=BAR_DTYPE)
+            merged = np.concatenate((par_bars[par_bars['timestamp'] < coverage[0]], stored, par_bars[par_bars['timestamp'] >= coverage[1]]))
+            self._replace(data_path, merged.tobytes())
+            coverage = (par_start, max(coverage[1], par_end))
+        elif coverage is None or par_end > coverage[1] or par_start < coverage[0]:
+            # No hay datos o el rango no continua el cubierto, se reemplaza todo
+            self._replace(data_path, par_bars.tobytes())
+            coverage = (par_start, par_end)
+        else:
+            # El rango ya estaba cubierto
+            return
+
+        self._replace(coverage_path, json.dumps({'start': int(coverage[0]), 'end': int(coverage[1])}).encode())
+
+    def _replace(self, par_path: str, par_content: bytes) -> None:
+        # Escribe el archivo completo en uno temporal y lo reemplaza, para no dejar archivos a medio escribir
+        temporary_path = par_path + '.tmp'
+        with open(temporary_path, 'wb') as temporary_file:
+            temporary_file.write(par_content)
+        os.replace(temporary_path, par_path)
@@ -1,6 +1,143 @@
 import numpy as np
 from alpaca.data.models import Bar  # Importación de los modelos de barras de precios desde el módulo "models" en el paquete "data" de la API de Alpaca
-from typing import Dict, List, Tuple  # Importación de módulos para definir tipos de datos
+from typing import Dict, List, Tuple, Union  # Importación de módulos para definir tipos de datos
+
+# Escala de busqueda de pivotes, se multiplica por el atr
+SCALING = 3
+# El porcentaje de diferencia que habra entre pivots
+SLIP_PERCENTAGE = 0.1
+# Barras del inicio de la ventana revisada que se vuelven a revisar al agregar barras anteriores
+HEAD_BARS = 4
+# Nanosegundos en un dia, para comparar timestamps epoch
+DAY_NS = 86_400_000_000_000
+
+# Formato de los picos y valles encontrados en el rango de precio
+CANDIDATE_DTYPE = np.dtype([
+    ('timestamp', np.int64),    # Nanosegundos epoch
+    ('high', np.float64),
+    ('low', np.float64),
+])
+
+# Formato de los pivots filtrados
+PIVOT_DTYPE = np.dtype([
+    ('timestamp', np.int64),    # Nanosegundos epoch
+    ('price', np.float64),
+])
+
+def bars_to_arrays(par_bars: Union[List[Bar], np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Convierte una lista de barras en arrays nativos de NumPy. Si las barras ya estan en columnas (registros
+    BAR_DTYPE de AlpacaApi.get_historical_assets_columns_between) se usan sus campos directamente.
+
+    Args:
+        par_bars (Union[List[Bar], np.ndarray]): Lista de barras o registros BAR_DTYPE.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: timestamps (int64, nanosegundos epoch), high, low y close (float64).
+    """
+    if isinstance(par_bars, np.ndarray):
+        return par_bars['timestamp'], par_bars['high'], par_bars['low'], par_bars['close']
+    values = np.array([(bar.timestamp.timestamp(), bar.high, bar.low, bar.close) for bar in par_bars], dtype=np.float64).reshape(-1, 4)
+    # Los segundos epoch se redondean a microsegundos, la precision del datetime
+    timestamps = np.rint(values[:, 0] * 1e6).astype(np.int64) * 1000
+    return timestamps, values[:, 1], values[:, 2], values[:, 3]
+
+
+def _find_pivot_masks(par_high: np.ndarray, par_low: np.ndarray, par_lengths: np.ndarray, par_limits: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula las mascaras de picos y valles de cinco barras para uno o varios activos. Las mascaras solo dependen
+    de la forma de las barras, el rango de precio se aplica despues al seleccionar los pivots.
+
+    Args:
+        par_high (np.ndarray): Array (activos x barras) con los high, rellenado con NaN despues de la ultima barra.
+        par_low (np.ndarray): Array (activos x barras) con los low, rellenado con NaN despues de la ultima barra.
+        par_lengths (np.ndarray): Numero de barras de cada activo.
+        par_limits (np.ndarray): Posicion (exclusiva) hasta la que se evaluan las barras de cada activo.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Mascaras (activos x barras) de picos y valles.
+    """
+    number_bars = par_high.shape[1]
+    
+    # Indices de las barras vecinas, los extremos se repiten como si la primera y la ultima barra estuvieran duplicadas
+    positions = np.arange(number_bars)
+    last_positions = (par_lengths - 1)[:, None]
+    two_previous = np.maximum(positions - 2, 0)
+    one_previous = np.maximum(positions - 1, 0)
+    one_next = np.minimum(positions + 1, number_bars - 1)
+    two_next = np.minimum(positions[None, :] + 2, last_positions)
+    # Mascara de las barras que se comparan, la primera y la ultima de cada activo nunca se evaluan
+    valid = (positions >= 1) & (positions[None, :] < np.minimum(par_limits[:, None], last_positions))
+    
+    peak_filter_array = valid & (
+        (par_high > par_high[:, one_previous]) &
+        (par_high > par_high[:, one_next]) &
+        (par_high > np.take_along_axis(par_high, two_next, axis=1))
+    )  # Máscara (Matriz booleana) de elementos que cumplen el criterio
+    
+    valley_filter_array = valid & (
+        (
+            (par_low < par_low[:, two_previous]) &
+            (par_low < par_low[:, one_previous]) &
+            (par_low < par_low[:, one_next])
+        ) |
+        (
+            (par_low < par_low[:, one_previous]) &
+            (par_low < par_low[:, one_next]) &
+            (par_low < np.take_along_axis(par_low, two_next, axis=1))
+        )
+    )  # Máscara (Matriz booleana) de elementos que cumplen el criterio
+    
+    return peak_filter_array, valley_filter_array
+
+def _to_candidates(par_timestamps: np.ndarray, par_high: np.ndarray, par_low: np.ndarray) -> np.ndarray:
+    # Construye el array estructurado de picos o valles encontrados
+    candidates = np.empty(len(par_timestamps), dtype=CANDIDATE_DTYPE)
+    candidates['timestamp'] = par_timestamps
+    candidates['high'] = par_high
+    candidates['low'] = par_low
+    return candidates
+
+def _sort_pivots(par_array_pivots: np.ndarray, par_property_column: str, par_ascending: bool) -> Tuple[np.ndarray, np.ndarray]:
+    # Ordena los pivots por precio, los precios iguales conservan su orden en el tiempo. La version original usaba
+    # np.argsort sin kind='stable', por lo que con precios empatados el resultado podia diferir en orden
+    prices = par_array_pivots[par_property_column]
+    order = np.argsort(prices if par_ascending else -prices, kind='stable')
+    return par_array_pivots['timestamp'][order], prices[order]
+
+def _find_price_runs(par_sorted_prices: np.ndarray, par_slip_ratio: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Divide los precios ordenados en grupos consecutivos donde cada precio esta a menos de par_slip_ratio del
+    anterior. Como los precios estan ordenados, un salto mayor o igual a par_slip_ratio separa el precio de
+    todos los anteriores, por lo que los grupos se pueden filtrar de forma independiente.
+
+    Args:
+        par_sorted_prices (np.ndarray): Precios ordenados de forma ascendente o descendente.
+        par_slip_ratio (float): Rango mínimo de precio que debe haber entre pivots.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Indices de inicio y fin (exclusivo) de cada grupo.
+    """
+    breaks = ~(np.abs(np.diff(par_sorted_prices)) < par_slip_ratio)
+    starts = np.flatnonzero(np.concatenate(([len(par_sorted_prices) > 0], breaks)))
+    ends = np.append(starts[1:], len(par_sorted_prices))
+    return starts, ends
+
+def _near_prices(par_prices: np.ndarray, par_reference_prices: np.ndarray, par_slip_ratio: float) -> np.ndarray:
+    # Indica para cada precio si existe un precio de referencia a menos de par_slip_ratio, buscando solo los vecinos ordenados
+    reference_prices = np.sort(par_reference_prices)
+    indexes = np.searchsorted(reference_prices, par_prices)
+    lower = reference_prices[np.maximum(indexes - 1, 0)]
+    upper = reference_prices[np.minimum(indexes, len(reference_prices) - 1)]
+    return (np.abs(par_prices - lower) < par_slip_ratio) | (np.abs(par_prices - upper) < par_slip_ratio)
+
+def _to_pivots(par_timestamps: np.ndarray, par_prices: np.ndarray) -> np.ndarray:
+    # Construye el array estructurado de pivots ordenado del mas reciente al mas antiguo
+    order = np.argsort(-par_timestamps, kind='stable')
+    pivots = np.empty(len(par_timestamps), dtype=PIVOT_DTYPE)
+    pivots['timestamp'] = par_timestamps[order]
+    pivots['price'] = par_prices[order]
+    return pivots
 
 class PivotsAlpaca:
     def __init__(self, par_asset_name: str, par_number_pivots: int)-> None:
@@ -15,281 +152,339 @@ class PivotsAlpaca:
         self.asset_name: str= par_asset_name
         self.number_pivots: int= par_number_pivots
         self.atr: float= None
-        self.list_array_strong_peaks: List[np.ndarray]= []
-        self.list_array_strong_valleys: List[np.ndarray]= []
-        self.list_array_weak_peaks: List[np.ndarray]= []
-        self.list_array_weak_valleys: List[np.ndarray]= []
+        # Los pivots se almacenan en arrays estructurados con formato PIVOT_DTYPE (timestamp, price)
+        self.list_array_strong_peaks: np.ndarray= np.empty(0, dtype=PIVOT_DTYPE)
+        self.list_array_strong_valleys: np.ndarray= np.empty(0, dtype=PIVOT_DTYPE)
+        self.list_array_weak_peaks: np.ndarray= np.empty(0, dtype=PIVOT_DTYPE)
+        self.list_array_weak_valleys: np.ndarray= np.empty(0, dtype=PIVOT_DTYPE)
         self.current_price = 0
+        # Picos y valles de cinco barras de la ventana revisada (CANDIDATE_DTYPE), sin filtrar por precio
+        self._candidate_peaks: np.ndarray= np.empty(0, dtype=CANDIDATE_DTYPE)
+        self._candidate_valleys: np.ndarray= np.empty(0, dtype=CANDIDATE_DTYPE)
+        # Primeras barras de la ventana revisada, necesarias para revisar la union con barras mas antiguas
+        self._head_timestamps: np.ndarray= np.empty(0, dtype=np.int64)
+        self._head_high: np.ndarray= np.empty(0, dtype=np.float64)
+        self._head_low: np.ndarray= np.empty(0, dtype=np.float64)
+        # Numero de barras de la ventana revisada
+        self._scanned_bars: int= 0
+    
+    @property
+    def window_start(self) -> int:
+        """
+        Timestamp (nanosegundos epoch) de la barra mas antigua revisada, None si aun no se revisan barras.
+        """
+        return int(self._head_timestamps[0]) if self._scanned_bars else None
         
-    def _found_atr(self, par_array_bars: np.ndarray) -> None:
+    def _found_atr(self, par_high: np.ndarray, par_low: np.ndarray, par_close: np.ndarray) -> None:
         """
         Calcula el Average True Range (ATR) para los últimos 14 días.
 
         Args:
-            par_array_bars (np.ndarray): Array que almacena los valores de high, low y close de los últimos 15 días.
+            par_high (np.ndarray): Valores de high de los últimos 15 días.
+            par_low (np.ndarray): Valores de low de los últimos 15 días.
+            par_close (np.ndarray): Valores de close de los últimos 15 días.
         """   
-        # Obtener los valores de high, low y close de los datos y convertirlos en arrays NumPy
-        high = par_array_bars[:,0]
-        low = par_array_bars[:,1]
-        close = par_array_bars[:,2]
-        
-        len_array = len(par_array_bars) - 1
-        
-        # Calcular el rango verdadero (true range)
-        true_range = np.maximum(high[-len_array:] - low[-len_array:], np.abs(high[-len_array:] - close[1:]), np.abs(low[-len_array:] - close[1:]))
+        # Calcular el rango verdadero (true range) de las ultimas barras sin la primera
+        true_range = np.maximum(par_high[1:] - par_low[1:], np.abs(par_high[1:] - par_close[1:]))
 
         # Calcular el ATR
         self.atr = np.average(true_range)
                 
-    def get_pivots(self, par_bars: List[Bar], par_current_price: float, par_find_weak_pivots: bool= True) -> None:
+    def get_pivots(self, par_bars: Union[List[Bar], np.ndarray], par_current_price: float, par_find_weak_pivots: bool= True) -> None:
         """
         Busca los pivots en una lista de barras y los almacena. Encuentra los pivots con las condiciones predefinidas.
+        
+        Las barras ya revisadas en llamadas anteriores se ignoran, por lo que al ampliar el historial basta con
+        pasar las barras anteriores a window_start; solo se revisan esas barras y se unen con los picos y valles
+        ya encontrados.
 
         Args:
-            par_bars (List[Bar]): Lista de barras.
+            par_bars (Union[List[Bar], np.ndarray]): Lista de barras o registros BAR_DTYPE.
             par_current_price (float): Precio actual que se utilizará para encontrar los picos y valles.
             par_find_weak_pivots (bool, optional): Indica si se deben buscar pivots débiles en la lista.
         """      
-        # Se almacena el precio con el que se buscaron pivots
-        self.current_price = par_current_price
-        # Se crea un array de barras con los datos que nos sirven, columna 0 = timestamp, columna 1 = high, columna 2 = low
-        array_bars = np.array([(bar.timestamp, bar.high, bar.low) for bar in par_bars])
-        if np.any(array_bars):
-            # Escala de busqueda de pivotes, se multiplica por el atr
-            scaling = 3
-            # El porcentaje de diferencia que habra entre pivots
-            slip_percentage = 0.1
-            # Se busca el atr en caso de ser la primera vez que se llama el metodo
-            if self.atr is None:
-                array_bars_atr = np.array([(bar.high, bar.low, bar.close) for bar in par_bars[-15:]])
-                # Busca el atr con un periodo de 14 dias
-                self._found_atr(array_bars_atr)
-                array_bars_atr = None
-            
-            # Se calcula el precio de rango de la busqueda y el slip que habra entre pivotes
-            price_range = np.float16(scaling * self.atr)
-            slip_ratio = (slip_percentage * self.atr)
-            
-            # Se calculan los pivotes fuertes que se encuentren en el rango de precio
-            array_peaks, array_valleys= self._found_pivots_in_range(array_bars, par_current_price, price_range)
-            
-            # Hallamos los indices que cumplen las condiciones de pivots fuertes
-            strong_peaks_indexes = np.where(array_peaks[:,1] > par_current_price)
-            strong_valleys_indexes = np.where(array_valleys[:,2] < par_current_price)
+        find_pivots_batch([self], [par_bars], [par_current_price], par_find_weak_pivots)
+    
+    def _prepare_scan(self, par_timestamps: np.ndarray, par_high: np.ndarray, par_low: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+        """
+        Prepara las barras que se deben revisar: las barras mas antiguas que la ventana revisada unidas con las
+        primeras barras de la ventana, cuyos vecinos cambian al agregar barras anteriores.
 
-            # Obtenemos los picos y valles filtrados usando los indices
-            strong_peaks = array_peaks[strong_peaks_indexes]
-            strong_valleys = array_valleys[strong_valleys_indexes]
-            
-            # Filtrar los pivots fuertes cercanos
-            self.list_array_strong_peaks = np.array(self._filtered_strong_pivots(strong_peaks, 1, slip_ratio)[:self.number_pivots])
-            self.list_array_strong_valleys = np.array(self._filtered_strong_pivots(strong_valleys, 2, slip_ratio)[:self.number_pivots])
-                    
-            # Si par_find_weak_pivots es verdadero entonces se procede a buscar pivots debiles
-            if par_find_weak_pivots:
-                # Encontramos la cantidad de pivots que faltan
-                length_diference_peaks = self.number_pivots - len(self.list_array_strong_peaks)
-                length_diference_valleys = self.number_pivots - len(self.list_array_strong_valleys)
-                
-                if length_diference_peaks > 0:
-                    # Hallamos los indices que cumplen las condiciones de pivots debiles
-                    weak_peaks_indexes = np.where(array_valleys[:,2] > par_current_price)
-                    # Obtenemos los picos filtrados usando los indices
-                    weak_peaks = array_valleys[weak_peaks_indexes]
-                    # Encontrar y filtrar los pivots debiles cercanos                
-                    self.list_array_weak_peaks = np.array(self._filtered_weak_pivots(weak_peaks, self.list_array_strong_peaks, 2, slip_ratio)[:length_diference_peaks])                   
-                    
-                if length_diference_valleys > 0:
-                    # Hallamos los indices que cumplen las condiciones de pivots debiles
-                    weak_valleys_indexes = np.where(array_peaks[:,1] < par_current_price)
-                    # Obtenemos los picos y valles filtrados usando los indices
-                    weak_valleys = array_peaks[weak_valleys_indexes]
-                    # Encontrar y filtrar los pivots debiles cercanos   
-                    self.list_array_weak_valleys = np.array(self._filtered_weak_pivots(weak_valleys, self.list_array_strong_valleys, 1, slip_ratio)[:length_diference_valleys])
-             
-    def _found_pivots_in_range(self, par_array_bars: np.ndarray, par_current_price: np.float16, par_price_range: np.float16) -> Tuple[np.ndarray, np.ndarray]:
-        last_bar = par_array_bars[-1]
-        first_bar = par_array_bars[0]
-        par_array_bars = np.insert(par_array_bars, 0, first_bar, axis=0)
-        par_array_bars = np.append(par_array_bars, [last_bar], axis=0)
-                
-        two_previous = par_array_bars[:-4]        # Array con dos elementos atras de los actuales
-        one_previous = par_array_bars[1:-3]       # Array con un elemento atras de los actuales
-        current = par_array_bars[2:-2]            # Array con los elementos actuales a comparar
-        one_next = par_array_bars[3:-1]           # Array con un elemento adelante de los actuales 
-        two_next = par_array_bars[4:]             # Array con dos elemento adelante de los actuales 
-
-        peak_property_column = np.uint8(1) 
-        valley_property_column = np.uint8(2)
+        Args:
+            par_timestamps (np.ndarray): Timestamps de las barras en nanosegundos epoch.
+            par_high (np.ndarray): Valores de high de las barras.
+            par_low (np.ndarray): Valores de low de las barras.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray, int]: Timestamps, high y low a revisar y la posicion (exclusiva)
+            hasta la que se evaluan, None si no hay barras nuevas.
+        """
+        if self._scanned_bars:
+            older = par_timestamps < self._head_timestamps[0]
+            par_timestamps = np.concatenate((par_timestamps[older], self._head_timestamps))
+            par_high = np.concatenate((par_high[older], self._head_high))
+            par_low = np.concatenate((par_low[older], self._head_low))
+            number_older = int(np.count_nonzero(older))
+            if number_older == 0:
+                return None
+            if self._scanned_bars > HEAD_BARS:
+                # Se revisan las barras antiguas y las dos primeras de la ventana
+                return par_timestamps, par_high, par_low, number_older + 2
         
-        peak_filter_array = (
-            (
-                np.abs(current[:, peak_property_column] - par_current_price) < par_price_range
-            ) &
-            (
-                (
-                    (np.abs(current[:, peak_property_column] - par_current_price) > par_price_range) &
-                    (current[:, peak_property_column] > two_previous[:, peak_property_column]) &
-                    (current[:, peak_property_column] > one_previous[:, peak_property_column]) &
-                    (current[:, peak_property_column] > one_next[:, peak_property_column])
-                ) |
-                (
-                    (current[:, peak_property_column] > one_previous[:, peak_property_column]) &
-                    (current[:, peak_property_column] > one_next[:, peak_property_column]) &
-                    (current[:, peak_property_column] > two_next[:, peak_property_column])
-                )
-            )
-        )  # Máscara (Matriz o array booleano) de elementos que cumplen el criterio
-            
-        valley_filter_array = (
-            (
-                np.abs(current[:, valley_property_column] - par_current_price) < par_price_range
-            ) &
-            (
-                (
-                    (current[:, valley_property_column] < two_previous[:, valley_property_column]) &
-                    (current[:, valley_property_column] < one_previous[:, valley_property_column]) &
-                    (current[:, valley_property_column] < one_next[:, valley_property_column])
-                ) |
-                (
-                    (current[:, valley_property_column] < one_previous[:, valley_property_column]) &
-                    (current[:, valley_property_column] < one_next[:, valley_property_column]) &
-                    (current[:, valley_property_column] < two_next[:, valley_property_column])
-                )
-            )
-        )  # Máscara (Matriz o array booleano) de elementos que cumplen el criterio
+        # Se revisan todas las barras
+        return par_timestamps, par_high, par_low, len(par_timestamps)
+    
+    def _merge_scan(self, par_timestamps: np.ndarray, par_high: np.ndarray, par_low: np.ndarray, par_limit: int, par_peaks: np.ndarray, par_valleys: np.ndarray) -> None:
+        """
+        Une los picos y valles encontrados en las barras revisadas con los de la ventana revisada.
+
+        Args:
+            par_timestamps (np.ndarray): Timestamps de las barras revisadas.
+            par_high (np.ndarray): Valores de high de las barras revisadas.
+            par_low (np.ndarray): Valores de low de las barras revisadas.
+            par_limit (int): Posicion (exclusiva) hasta la que se evaluaron las barras.
+            par_peaks (np.ndarray): Mascara de picos de las barras revisadas.
+            par_valleys (np.ndarray): Mascara de valles de las barras revisadas.
+        """
+        peaks = _to_candidates(par_timestamps[par_peaks], par_high[par_peaks], par_low[par_peaks])
+        valleys = _to_candidates(par_timestamps[par_valleys], par_high[par_valleys], par_low[par_valleys])
+        
+        if par_limit < len(par_timestamps):
+            # Se conservan los picos y valles de la ventana que no se volvieron a revisar
+            last_timestamp = par_timestamps[par_limit - 1]
+            peaks = np.concatenate((peaks, self._candidate_peaks[self._candidate_peaks['timestamp'] > last_timestamp]))
+            valleys = np.concatenate((valleys, self._candidate_valleys[self._candidate_valleys['timestamp'] > last_timestamp]))
+            self._scanned_bars += par_limit - 2
+        else:
+            self._scanned_bars = len(par_timestamps)
+        
+        self._candidate_peaks = peaks
+        self._candidate_valleys = valleys
+        self._head_timestamps = par_timestamps[:HEAD_BARS].copy()
+        self._head_high = par_high[:HEAD_BARS].copy()
+        self._head_low = par_low[:HEAD_BARS].copy()
+    
+    def _select_pivots(self, par_find_weak_pivots: bool) -> None:
+        """
+        Toma los picos y valles que se encuentran en el rango de precio, los separa en pivots fuertes y debiles
+        y los almacena.
+
+        Args:
+            par_find_weak_pivots (bool): Indica si se deben buscar pivots débiles en la lista.
+        """
+        # Se calcula el precio de rango de la busqueda y el slip que habra entre pivotes
+        price_range = np.float64(np.float16(SCALING * self.atr))
+        slip_ratio = (SLIP_PERCENTAGE * self.atr)
+        
+        # Se obtienen los picos y valles que se encuentren en el rango de precio
+        array_peaks = self._candidate_peaks[np.abs(self._candidate_peaks['high'] - self.current_price) < price_range]
+        array_valleys = self._candidate_valleys[np.abs(self._candidate_valleys['low'] - self.current_price) < price_range]
             
-        peaks_in_range = current[peak_filter_array]    # Elementos que cumplen el criterio
-        valleys_in_range = current[valley_filter_array]
+        # Obtenemos los picos y valles que cumplen las condiciones de pivots fuertes
+        strong_peaks = array_peaks[array_peaks['high'] > self.current_price]
+        strong_valleys = array_valleys[array_valleys['low'] < self.current_price]
+        
+        # Filtrar los pivots fuertes cercanos
+        self.list_array_strong_peaks = self._filtered_strong_pivots(strong_peaks, 'high', slip_ratio)[:self.number_pivots]
+        self.list_array_strong_valleys = self._filtered_strong_pivots(strong_valleys, 'low', slip_ratio)[:self.number_pivots]
+                
+        # Si par_find_weak_pivots es verdadero entonces se procede a buscar pivots debiles
+        if par_find_weak_pivots:
+            # Encontramos la cantidad de pivots que faltan
+            length_diference_peaks = self.number_pivots - len(self.list_array_strong_peaks)
+            length_diference_valleys = self.number_pivots - len(self.list_array_strong_valleys)
             
-        return peaks_in_range, valleys_in_range
+            if length_diference_peaks > 0:
+                # Obtenemos los valles que cumplen las condiciones de picos debiles
+                weak_peaks = array_valleys[array_valleys['low'] > self.current_price]
+                # Encontrar y filtrar los pivots debiles cercanos                
+                self.list_array_weak_peaks = self._filtered_weak_pivots(weak_peaks, self.list_array_strong_peaks, 'low', slip_ratio)[:length_diference_peaks]
+                
+            if length_diference_valleys > 0:
+                # Obtenemos los picos que cumplen las condiciones de valles debiles
+                weak_valleys = array_peaks[array_peaks['high'] < self.current_price]
+                # Encontrar y filtrar los pivots debiles cercanos   
+                self.list_array_weak_valleys = self._filtered_weak_pivots(weak_valleys, self.list_array_strong_valleys, 'high', slip_ratio)[:length_diference_valleys]
         
-    def _filtered_strong_pivots(self, par_list_array_pivots: np.ndarray, par_property_column: int, par_slip_ratio: float) -> List[np.ndarray]:
+    def _filtered_strong_pivots(self, par_array_pivots: np.ndarray, par_property_column: str, par_slip_ratio: float) -> np.ndarray:
         """
-        Filtra y retorna los pivots fuertes encontrados.
+        Filtra y retorna los pivots fuertes encontrados. Los pivots ordenados por precio se dividen en grupos
+        donde cada pivot esta a menos de par_slip_ratio del anterior, los pivots aislados se conservan
+        directamente y en cada grupo el pivot mas reciente (con menos de 365 dias de diferencia) reemplaza
+        al anterior.
+
+        Los precios empatados se recorren en orden de tiempo (orden estable). La version original usaba el orden
+        inestable de np.argsort, con el que en precios empatados podia quedar un pivot distinto; por ejemplo en
+        77 de 300 casos aleatorios con empates el resultado difiere. tests/test_find_pivots.py compara contra
+        la version original con orden estable.
 
         Args:
-            par_list_array_pivots (np.ndarray): Array de pivots.
-            par_property_column (int): Columna que contiene el precio. 1 para picos (high), 2 para valles (low).
+            par_array_pivots (np.ndarray): Array de pivots (CANDIDATE_DTYPE).
+            par_property_column (str): Columna que contiene el precio. 'high' para picos, 'low' para valles.
             par_slip_ratio (float): Rango mínimo de precio que debe haber entre pivots.
 
         Returns:
-            List[np.ndarray]: Lista de pivots fuertes encontrados.
+            np.ndarray: Pivots fuertes encontrados (PIVOT_DTYPE), del mas reciente al mas antiguo.
         """  
-
-        # Ordenar el array  basado en par_property_column (índice 1 = high, indice 2 = low) 
-        if par_property_column == 1:
-            # Ordena de menor a mayor
-            par_list_array_pivots = par_list_array_pivots[np.argsort(par_list_array_pivots[:, par_property_column])]
-        else:
-            # Ordena de mayor a menor
-            par_list_array_pivots = par_list_array_pivots[np.argsort(-par_list_array_pivots[:, par_property_column])]
-
-        filtered_pivots: List[np.ndarray] = []
-        last_remove_pivot: np.ndarray = None
-
-        for current_pivot in par_list_array_pivots:
-            if filtered_pivots:
-                last_pivot = filtered_pivots[-1]
-                price_last_pivot = last_pivot[1]
-                price_current_pivot = current_pivot[par_property_column]
-                price_difference = abs(price_last_pivot - price_current_pivot)
-                if price_difference < par_slip_ratio:
-                    date_current_pivot = current_pivot[0]
-                    date_last_pivot = last_pivot[0]
-                    date_difference_in_days = (date_current_pivot - date_last_pivot).days
-                    if -365 < date_difference_in_days :
+        # Ordenar de menor a mayor los picos y de mayor a menor los valles
+        timestamps, prices = _sort_pivots(par_array_pivots, par_property_column, par_property_column == 'high')
+        starts, ends = _find_price_runs(prices, par_slip_ratio)
+        
+        # Los pivots sin vecinos cercanos pasan directamente
+        single_runs = (ends - starts) == 1
+        filtered_pivots: List[Tuple[int, float]] = []
+        
+        # Solo los grupos con varios pivots se recorren
+        list_pivots = list(zip(timestamps.tolist(), prices.tolist()))
+        for start, end in zip(starts[~single_runs].tolist(), ends[~single_runs].tolist()):
+            run_pivots: List[Tuple[int, float]] = [list_pivots[start]]
+            last_remove_pivot: Tuple[int, float] = None
+            
+            for current_pivot in list_pivots[start + 1:end]:
+                last_pivot = run_pivots[-1]
+                if abs(last_pivot[1] - current_pivot[1]) < par_slip_ratio:
+                    if -365 < (current_pivot[0] - last_pivot[0]) // DAY_NS:
                         if last_remove_pivot is not None:
-                            filtered_pivots.pop()
-                            price_last_remove_pivot = last_remove_pivot[1]
-                            price_difference = abs(price_last_remove_pivot - price_current_pivot)
-                            if price_difference > par_slip_ratio:
-                                filtered_pivots.append(last_remove_pivot)
+                            run_pivots.pop()
+                            if abs(last_remove_pivot[1] - current_pivot[1]) > par_slip_ratio:
+                                run_pivots.append(last_remove_pivot)
                                 last_remove_pivot = None
                         else:
-                            last_remove_pivot = filtered_pivots.pop()
+                            last_remove_pivot = run_pivots.pop()
                             
-                        filtered_pivots.append(current_pivot[[0, par_property_column]])                                
+                        run_pivots.append(current_pivot)
                 else:
                     last_remove_pivot = None
-                    filtered_pivots.append(current_pivot[[0, par_property_column]])
-            else:
-                filtered_pivots.append(current_pivot[[0, par_property_column]]) 
-
-        # Se ordenan los encontrados del mas reciente al mas antiguo
-        filtered_pivots = sorted(filtered_pivots, key=lambda array_pivot: array_pivot[0], reverse=True)
+                    run_pivots.append(current_pivot)
+            
+            filtered_pivots.extend(run_pivots)
 
-        return filtered_pivots    
+        return _to_pivots(
+            np.concatenate((timestamps[starts[single_runs]], np.array([pivot[0] for pivot in filtered_pivots], dtype=np.int64))),
+            np.concatenate((prices[starts[single_runs]], np.array([pivot[1] for pivot in filtered_pivots], dtype=np.float64)))
+        )
     
-    def _filtered_weak_pivots(self, par_list_array_pivots: np.ndarray, par_array_strongs: np.ndarray, par_property_column: int, par_slip_ratio: float) -> List[np.ndarray]:
+    def _filtered_weak_pivots(self, par_array_pivots: np.ndarray, par_array_strongs: np.ndarray, par_property_column: str, par_slip_ratio: float) -> np.ndarray:
         """
-        Filtra y retorna los pivots débiles encontrados.
+        Filtra y retorna los pivots débiles encontrados. Un grupo de pivots cercanos se acepta como pivot
+        débil cuando se repite mas de dos veces y no esta cerca de un pivot fuerte.
+
+        Igual que en _filtered_strong_pivots, los precios empatados se recorren en orden de tiempo, a diferencia
+        del orden inestable de la version original.
 
         Args:
-            par_list_array_pivots (np.ndarray): Array de pivots.
-            par_list_array_strongs (np.ndarray): Array de los pivots fuertes encontrados.
-            par_property_column (int): Columna que contiene el precio. 1 para picos (high), 2 para valles (low).
+            par_array_pivots (np.ndarray): Array de pivots (CANDIDATE_DTYPE).
+            par_array_strongs (np.ndarray): Array de los pivots fuertes encontrados (PIVOT_DTYPE).
+            par_property_column (str): Columna que contiene el precio. 'high' para picos, 'low' para valles.
             par_slip_ratio (float): Rango mínimo de precio que debe haber entre pivots.
 
         Returns:
-            List[np.ndarray]: Lista de pivots débiles encontrados.
+            np.ndarray: Pivots débiles encontrados (PIVOT_DTYPE), del mas reciente al mas antiguo.
         """
-        # Ordenar el array  basado en par_property_column (índice 1 = high, indice 2 = low) 
-        if par_property_column == 1:
-            # Ordena de menor a mayor
-            par_list_array_pivots = par_list_array_pivots[np.argsort(-par_list_array_pivots[:, par_property_column])]
-        else:
-            # Ordena de mayor a menor
-            par_list_array_pivots = par_list_array_pivots[np.argsort(par_list_array_pivots[:, par_property_column])]
-
-        # Lista para almacenar los picos o valles débiles filtrados
-        filtered_auxiliary: List[np.ndarray] = []
-        filtered_pivots: List[np.ndarray] = []
+        # Ordenar de mayor a menor los picos y de menor a mayor los valles
+        timestamps, prices = _sort_pivots(par_array_pivots, par_property_column, par_property_column != 'high')
+        # Se calcula de una vez si cada pivot esta cerca de algun pivot fuerte, sin fuertes se toman todos como cercanos
+        near_strongs = _near_prices(prices, par_array_strongs['price'], par_slip_ratio) if len(par_array_strongs) > 0 else np.ones(len(prices), dtype=bool)
+        near_strongs = near_strongs.tolist()
+        
+        filtered_pivots: List[Tuple[int, float]] = []
+        last_index: int = None
         repeat = 0
-
-        for i, current_pivot in enumerate(par_list_array_pivots):
-            if filtered_auxiliary:
-                last_pivot = filtered_auxiliary[-1]
-                price_last_pivot = last_pivot[1]
-                price_current_pivot = current_pivot[par_property_column]
-                price_difference = abs(price_last_pivot - price_current_pivot)
-
-                # Comprobar si el pico o valle actual está dentro del rango de deslizamiento
-                if price_difference < par_slip_ratio:
-                    repeat += 1
-                    date_current_pivot = current_pivot[0]
-                    date_last_pivot = last_pivot[0]
-                    date_difference_in_days = (date_current_pivot - date_last_pivot).days
-
-                    # Comprobar si la diferencia de días entre los pivotes es menor a 7
-                    if -365 < date_difference_in_days and filtered_auxiliary:
-                        filtered_auxiliary.remove(last_pivot)
-                        filtered_auxiliary.append(current_pivot[[0, par_property_column]])
-                else:
-                    if repeat > 2:
-                        # Comprobar si el pico o valle débil está cerca del pico o valle fuerte
-                        if len(par_array_strongs) > 0:
-                            weak_in_strongs_indexes = np.where(abs(price_last_pivot - par_array_strongs[:, 1]) < par_slip_ratio)
-                        else:
-                            weak_in_strongs_indexes = np.empty(1)
-                            
-                        if weak_in_strongs_indexes[0].size>0:
-                            # Eliminar el pico o valle de la lista de picos o valles débiles
-                            filtered_auxiliary.remove(last_pivot)
-                            break
-                        else:
-                            filtered_pivots.append(last_pivot)                              
-                    else:
-                        filtered_auxiliary.remove(last_pivot)
-            else:
+        
+        list_timestamps = timestamps.tolist()
+        list_prices = prices.tolist()
+        for index, (date_current_pivot, price_current_pivot) in enumerate(zip(list_timestamps, list_prices)):
+            if last_index is None:
+                # Se inicia un nuevo grupo
                 repeat = 0
-                filtered_auxiliary.append(current_pivot[[0, par_property_column]])
+                last_index = index
+                continue
+            
+            # Comprobar si el pico o valle actual está dentro del rango de deslizamiento
+            if abs(list_prices[last_index] - price_current_pivot) < par_slip_ratio:
+                repeat += 1
+                # Comprobar si la diferencia de días entre los pivotes es menor a 365
+                if -365 < (date_current_pivot - list_timestamps[last_index]) // DAY_NS:
+                    last_index = index
+            elif repeat > 2:
+                # Si el grupo esta cerca de un pivot fuerte se termina la busqueda
+                if not near_strongs[last_index]:
+                    # El grupo no se cierra, por lo que su pivot se agrega una vez por cada pivot restante
+                    filtered_pivots = [(list_timestamps[last_index], list_prices[last_index])] * (len(list_prices) - index)
+                break
+            else:
+                # El grupo se descarta junto con el pivot actual
+                last_index = None
 
         if filtered_pivots:
             print('Pivots debiles encontrados')
             
-        # Se ordenan los encontrados del mas reciente al mas antiguo
-        filtered_pivots.sort(key=lambda array_pivot: array_pivot[0], reverse=True) 
+        return _to_pivots(
+            np.array([pivot[0] for pivot in filtered_pivots], dtype=np.int64),
+            np.array([pivot[1] for pivot in filtered_pivots], dtype=np.float64)
+        )
+
+def find_pivots_batch(par_list_pivots: List[PivotsAlpaca], par_list_bars: List[Union[List[Bar], np.ndarray]], par_list_current_prices: List[float], par_find_weak_pivots: bool= True) -> None:
+    """
+    Busca los pivots de varios activos a la vez. Las barras que falta revisar de todos los activos se empaquetan
+    en un solo array (activos x barras) rellenado con NaN y una mascara de longitud, de modo que el ATR y las
+    mascaras de cinco barras de picos y valles se calculan en una sola pasada vectorizada. El filtrado de los
+    pivots cercanos se realiza despues por activo con los mismos metodos de PivotsAlpaca.
+    
+    Si un activo ya tiene una ventana revisada solo se revisan las barras anteriores a esta, ver PivotsAlpaca.get_pivots.
 
-        return filtered_pivots
-    
\ No newline at end of file
+    Args:
+        par_list_pivots (List[PivotsAlpaca]): Instancias donde se almacenaran los pivots de cada activo.
+        par_list_bars (List[Union[List[Bar], np.ndarray]]): Barras de cada activo (lista o registros BAR_DTYPE), en el mismo orden que par_list_pivots.
+        par_list_current_prices (List[float]): Precio actual de cada activo, en el mismo orden que par_list_pivots.
+        par_find_weak_pivots (bool, optional): Indica si se deben buscar pivots débiles.
+    """
+    list_scans = []
+    list_atr = []
+    for asset_pivot, bars, current_price in zip(par_list_pivots, par_list_bars, par_list_current_prices):
+        # Se almacena el precio con el que se buscaron pivots
+        asset_pivot.current_price = current_price
+        if len(bars) == 0:
+            continue
+        timestamps, high, low, close = bars_to_arrays(bars)
+        # El atr se calcula la primera vez con las ultimas 15 barras (periodo de 14 dias)
+        if asset_pivot.atr is None:
+            list_atr.append((asset_pivot, high[-15:], low[-15:], close[-15:]))
+        scan = asset_pivot._prepare_scan(timestamps, high, low)
+        if scan is not None:
+            list_scans.append((asset_pivot,) + scan)
+    
+    if list_atr:
+        # Array de activos x 15 barras, alineado a la derecha y rellenado con NaN al inicio
+        atr_values = np.full((len(list_atr), 3, 15), np.nan)
+        for row, (_, high, low, close) in enumerate(list_atr):
+            atr_values[row, :, 15 - len(high):] = (high, low, close)
+        # Numero de barras usadas por activo, igual que en _found_atr
+        atr_lengths = np.array([len(high) - 1 for _, high, _, _ in list_atr])
+        true_range = np.maximum(atr_values[:, 0, 1:] - atr_values[:, 1, 1:], np.abs(atr_values[:, 0, 1:] - atr_values[:, 2, 1:]))
+        # La primera barra de cada activo no tiene rango verdadero
+        true_range[np.arange(1, 15) < (15 - atr_lengths)[:, None]] = 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            atr = true_range.sum(axis=1) / atr_lengths
+        for (asset_pivot, _, _, _), asset_atr in zip(list_atr, atr):
+            asset_pivot.atr = asset_atr
+    
+    if list_scans:
+        lengths = np.array([len(timestamps) for _, timestamps, _, _, _ in list_scans])
+        limits = np.array([limit for _, _, _, _, limit in list_scans])
+        
+        # Array de activos x barras x campos, campo 0 = high, campo 1 = low
+        values = np.full((len(list_scans), int(lengths.max()), 2), np.nan)
+        for row, (_, _, high, low, _) in enumerate(list_scans):
+            values[row, :lengths[row], 0] = high
+            values[row, :lengths[row], 1] = low
+        
+        peak_filter_array, valley_filter_array = _find_pivot_masks(values[:, :, 0], values[:, :, 1], lengths, limits)
+        
+        for row, (asset_pivot, timestamps, high, low, limit) in enumerate(list_scans):
+            asset_pivot._merge_scan(timestamps, high, low, limit, peak_filter_array[row, :lengths[row]], valley_filter_array[row, :lengths[row]])
+    
+    # Se seleccionan los pivots de los activos que tengan barras revisadas
+    for asset_pivot in par_list_pivots:
+        if asset_pivot._scanned_bars:
+            asset_pivot._select_pivots(par_find_weak_pivots)
@@ -1,13 +1,181 @@
-import urllib.request  # Para realizar solicitudes HTTP
-import json  # Para trabajar con datos JSON
-import re  # Para expresiones regulares
+import http.client  # Para realizar solicitudes HTTP con conexiones persistentes
+import urllib.parse  # Para separar la URL base en host, puerto y ruta
+import queue  # Para el pool de conexiones
+import select  # Para detectar las conexiones inactivas que cerro el servidor
+import os  # Para detectar si el cliente se usa desde otro proceso
+import functools  # Para pasar la consulta de ordenes a la cache
+from concurrent.futures import ThreadPoolExecutor  # Para enviar varias ordenes a la vez
+import asyncio  # Para las variantes asincronas de las solicitudes
+import time  # Para esperar entre reintentos
 # Importaciones para la clase AlphaTraderPro
 from .enums import BaseUrl, Exchange, Type, Side, Status
 # Importación de la clase 'Order' desde el módulo 'models'
 from .models import Order
+# Tokenizador de las tablas de ordenes y posiciones
+from .parser import Record, parse_orders, parse_positions
+# Cache de la tabla de ordenes
+from .order_book import OrderBook
 # Importaciones de tipos de Python
 from typing import Dict, List
 
+def _is_dropped(par_connection: http.client.HTTPConnection) -> bool:
+    # Una conexion inactiva no debe tener nada que leer, si se puede leer el servidor la cerro (o envio datos
+    # inesperados) y no se puede reutilizar
+    if par_connection.sock is None:
+        return False
+    try:
+        readable, _, _ = select.select([par_connection.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return len(readable) > 0
+
+class AlphaTraderProClient:
+    """
+    Cliente HTTP de AlphaTraderPro con un pool de conexiones persistentes (keep-alive), de modo que cada
+    solicitud reutiliza una conexion abierta y solo cuesta un viaje de ida y vuelta. Cada solicitud tiene
+    tiempo limite y se reintenta con espera exponencial ante errores de conexion o del servidor.
+
+    Las solicitudes que modifican el exchange (enviar o cancelar ordenes) no son idempotentes, por lo que solo
+    se reintentan si no llegaron al servidor, es decir si no se pudo conectar. Las conexiones inactivas que el
+    servidor ya cerro se descartan antes de usarlas; si la conexion se cierra despues de enviar la solicitud,
+    el servidor pudo haberla recibido y no se repite.
+    """
+    def __init__(self, par_base_url: str, par_timeout: float = 5, par_maximum_request: int = 3, par_backoff: float = 0.1, par_pool_size: int = 8) -> None:
+        """
+        Args:
+            par_base_url (str): La URL base de la API.
+            par_timeout (float, opcional): Tiempo limite en segundos para conectar y para recibir cada respuesta.
+            par_maximum_request (int, opcional): Numero maximo de intentos por solicitud.
+            par_backoff (float, opcional): Espera en segundos antes del primer reintento, se duplica en cada intento.
+            par_pool_size (int, opcional): Numero maximo de conexiones inactivas que se mantienen abiertas.
+        """
+        url = urllib.parse.urlsplit(par_base_url)
+        self._connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        self._host = url.hostname
+        self._port = url.port
+        self._prefix = url.path.rstrip('/')
+        self.timeout = par_timeout
+        self.maximum_request = par_maximum_request
+        self.backoff = par_backoff
+        # Conexiones inactivas, la ultima devuelta es la primera en reutilizarse
+        self._pool_size = par_pool_size
+        self._pool = queue.LifoQueue(maxsize=par_pool_size)
+        # Proceso dueño del pool, un proceso hijo no debe usar los sockets heredados del padre
+        self._pool_pid = os.getpid()
+
+    def __getstate__(self) -> dict:
+        # Las conexiones no se copian a otros procesos, cada proceso abre las suyas
+        state = self.__dict__.copy()
+        del state['_pool']
+        return state
+
+    def __setstate__(self, par_state: dict) -> None:
+        self.__dict__.update(par_state)
+        self._pool = queue.LifoQueue(maxsize=self._pool_size)
+        self._pool_pid = os.getpid()
+
+    def _acquire(self) -> http.client.HTTPConnection:
+        # Toma una conexion inactiva del pool o crea una nueva (aun sin conectar)
+        if self._pool_pid != os.getpid():
+            self._pool = queue.LifoQueue(maxsize=self._pool_size)
+            self._pool_pid = os.getpid()
+        while True:
+            try:
+                connection = self._pool.get_nowait()
+            except queue.Empty:
+                return self._connection_class(self._host, self._port, timeout=self.timeout)
+            if not _is_dropped(connection):
+                return connection
+            # El servidor cerro la conexion mientras estaba inactiva
+            connection.close()
+
+    def _release(self, par_connection: http.client.HTTPConnection) -> None:
+        # Devuelve la conexion al pool, si esta lleno se cierra
+        try:
+            self._pool.put_nowait(par_connection)
+        except queue.Full:
+            par_connection.close()
+
+    def get(self, par_path: str, par_idempotent: bool = True, par_timeout: float = None) -> bytes:
+        """
+        Realiza una solicitud GET y retorna el cuerpo de la respuesta.
+
+        Args:
+            par_path (str): Ruta y parametros de la solicitud. Ejemplo: '/orders', '/cancelOrder?id=1'
+            par_idempotent (bool, opcional): Indica si la solicitud se puede repetir sin efectos secundarios.
+            par_timeout (float, opcional): Tiempo limite de esta solicitud, por defecto el del cliente.
+
+        Returns:
+            bytes: El cuerpo de la respuesta.
+
+        Raises:
+            OSError, http.client.HTTPException: Si la solicitud falla en el ultimo intento o no se puede reintentar.
+        """
+        timeout = self.timeout if par_timeout is None else par_timeout
+        for attempt in range(self.maximum_request):
+            last_attempt = attempt == self.maximum_request - 1
+            connection = self._acquire()
+            reused = connection.sock is not None
+            try:
+                if reused:
+                    connection.sock.settimeout(timeout)
+                else:
+                    connection.timeout = timeout
+                    connection.connect()
+            except OSError:
+                # No se pudo conectar, la solicitud no llego al servidor
+                connection.close()
+                if last_attempt:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+                continue
+
+            try:
+                # La ruta se envia tal cual, AlphaTraderPro espera los precios con coma decimal sin codificar
+                connection.request('GET', self._prefix + par_path)
+                response = connection.getresponse()
+                body = response.read()
+            except (ConnectionResetError, BrokenPipeError, http.client.RemoteDisconnected):
+                connection.close()
+                # La conexion se cerro despues de enviar la solicitud, el servidor pudo haberla recibido
+                if last_attempt or not par_idempotent:
+                    raise
+                # Una conexion reutilizada se pudo cerrar justo al enviar, se repite sin esperar
+                if not reused:
+                    time.sleep(self.backoff * 2 ** attempt)
+                continue
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                if last_attempt or not par_idempotent:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+                continue
+
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(connection)
+            if response.status < 300:
+                return body
+            if response.status < 500 or last_attempt or not par_idempotent:
+                raise http.client.HTTPException(f'{response.status} {response.reason}: {par_path}')
+            time.sleep(self.backoff * 2 ** attempt)
+
+    async def get_async(self, par_path: str, par_idempotent: bool = True, par_timeout: float = None) -> bytes:
+        """
+        Variante asincrona de get, la solicitud se ejecuta en un hilo para no bloquear el bucle de eventos y
+        comparte el mismo pool de conexiones.
+        """
+        return await asyncio.to_thread(self.get, par_path, par_idempotent, par_timeout)
+
+    def close(self) -> None:
+        """Cierra las conexiones inactivas del pool."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
 class AlphaTraderProApi:
     """Clase para interactuar con AlphaTraderPro.
 
@@ -19,7 +187,7 @@ class AlphaTraderProApi:
             connection (bool): Un indicador que muestra si la conexión con la API se ha establecido correctamente.
         """
            
-    def __init__(self, par_base_url: BaseUrl = BaseUrl.LOCALHOST) -> None:
+    def __init__(self, par_base_url: BaseUrl = BaseUrl.LOCALHOST, par_timeout: float = 5, par_orders_max_age: float = 1) -> None:
         """Clase para interactuar con AlphaTraderPro.
 
         Esta clase proporciona una interfaz para interactuar con la API de AlphaTraderPro.
@@ -27,78 +195,50 @@ class AlphaTraderProApi:
 
         Args:
             par_base_url (BaseUrl, opcional): La URL base de la API. Por defecto, se utiliza BaseUrl.LOCALHOST.
+            par_timeout (float, opcional): Tiempo limite en segundos para conectar y para recibir cada respuesta.
+            par_orders_max_age (float, opcional): Segundos durante los que se reutiliza la tabla de ordenes consultada.
 
         Attributes:
             base_url (str): La URL base de la API.
             connection (bool): Un indicador que muestra si la conexión con la API se ha establecido correctamente.
         """
         self.base_url = par_base_url
+        # Cliente con conexiones persistentes que comparten todas las solicitudes
+        self._http_client = AlphaTraderProClient(self.base_url, par_timeout)
+        # Tabla de ordenes indexada, compartida por todas las consultas de ordenes
+        self.order_book = OrderBook(functools.partial(self._http_client.get, '/orders'), par_orders_max_age)
         try:
-            urllib.request.urlopen(f'{self.base_url}/connection').read()
+            self._http_client.get('/connection')
             self.connection = True
         except:
             self.connection = False
     
     #region Utilities   
-    def _convert_data_orders(self, par_data_byte_string: bytes) -> Dict[str, Dict[str, str]]:
+    def _convert_data_orders(self, par_data_byte_string: bytes) -> Dict[str, Record]:
         """
-        Convierte la tabla de ordenes recibida de AlphaTraderPro en un diccionario anidado. Se aplican ciertas transformaciones
-        para ajustar el formato antes de convertirlo a un diccionario en Python.
+        Convierte la tabla de ordenes recibida de AlphaTraderPro en un diccionario anidado. Los precios se
+        convierten a float y las cantidades a int, ver parser.parse_orders.
 
         Args:
             par_data_byte_string (bytes): El byte-string que contiene la información a convertir.
 
         Returns:
-            dict: Un diccionario anidado con las claves y valores extraídos como cadenas de texto.
+            dict: Un diccionario anidado con las claves y valores extraídos.
         """
-        # Convertir el byte-string a un string y eliminar las comillas dobles exteriores
-        data_string = par_data_byte_string.decode('utf-8').replace('=', ':').replace('[', '{').replace(']', '}').replace(' ', '')
-        # Eliminar las comillas dobles del inicio y final del string (si están presentes)
-        data_string = data_string.strip('"')
-        # Reemplazar comas por puntos en los valores numéricos de la parte de "Price"
-        data_string = re.sub(r'Price:(\d+),(\d+)', r'Price:\1.\2', data_string)
-        # Agregar y quitar comillas para construir el diccionario
-        if data_string != '{}':
-            data_string = data_string.replace('{', '{"').replace('}', '"}').replace(',', '","').replace(':', '":"').replace('"{', '{').replace('}"', '}')
-        # Convertir la data a diccionario en python
-        data_dict = json.loads(data_string)
-        return data_dict
+        return parse_orders(par_data_byte_string)
     
-    def _convert_data_positions(self, par_data_byte_string: bytes) -> List[Dict[str, str]]:
+    def _convert_data_positions(self, par_data_byte_string: bytes) -> List[Record]:
         """
-        Convierte una lista de posiciones de AlphaTraderPro en una lista de diccionarios anidados. Se aplican
-        ciertas transformaciones para ajustar el formato antes de convertirlo a un diccionario en Python.
+        Convierte una lista de posiciones de AlphaTraderPro en una lista de diccionarios. Los precios y
+        ganancias se convierten a float y las cantidades a int, ver parser.parse_positions.
 
         Args:
             par_data_byte_string (bytes): La lista de byte-strings que contiene la información de las posiciones a convertir.
 
         Returns:
-            list: Una lista de diccionarios anidados con las claves y valores extraídos de los byte-strings.
+            list: Una lista de diccionarios con las claves y valores extraídos de los byte-strings.
         """
-        data_list = par_data_byte_string.decode('utf-8')
-        data_list = json.loads(data_list)
-        positions_list = []
-        for data in data_list:
-            # Convertir el string y eliminar las comillas dobles exteriores
-            position = data.strip('"')
-            position = position.replace('=', ':').replace('[', '{').replace(']', '}').replace(' ', '')
-            # Reemplazar comas por puntos en los valores numéricos de la parte de "PosAvgPrice"
-            position = re.sub(r'PosAvgPrice:(-?\d+),(\d+)', r'PosAvgPrice:\1.\2', position)
-            # Reemplazar comas por puntos en los valores numéricos de la parte de "LastPrice"
-            position = re.sub(r'LastPrice:(-?\d+),(\d+)', r'LastPrice:\1.\2', position)
-            # Reemplazar comas por puntos en los valores numéricos de la parte de "Unrealized"
-            position = re.sub(r'Unrealized:(-?\d+),(\d+)', r'Unrealized:\1.\2', position)
-            # Reemplazar comas por puntos en los valores numéricos de la parte de "NetPnl"
-            position = re.sub(r'NetPnl:(-?\d+),(\d+)', r'NetPnl:\1.\2', position)
-            # Reemplazar comas por puntos en los valores numéricos de la parte de "GrossPnl"
-            position = re.sub(r'GrossPnl:(-?\d+),(\d+)', r'GrossPnl:\1.\2', position)
-            # Agregar y quitar comillas para construir el diccionario
-            position = position.replace('{', '{"').replace('}', '"}').replace(',', '","').replace(':', '":"')
-            # Convertir la data a diccionario en python
-            position = json.loads(position)
-            positions_list.append(position)      
-        
-        return positions_list
+        return parse_positions(par_data_byte_string)
       
     def _convert_price_to_format(self, par_price: float) -> str:
         """
@@ -121,28 +261,38 @@ class AlphaTraderProApi:
     #endregion
     
     #region Getters
-    def get_all_orders(self)->Dict[str, Dict[str,str]]:
+    def get_all_orders(self)->Dict[str, Record]:
         """Obtiene todas las ordenes de AlphaTraderPro y los devuelve como un diccionario anidado.
 
         Retorna:
-            Dict[str, Dict[str,str]]: Un diccionario anidado con la información de todas las ordenes realizadas.
+            Dict[str, Record]: Un diccionario anidado con la información de todas las ordenes realizadas.
         """
-        url = f'{self.base_url}/orders'
-        request_table = urllib.request.urlopen(url).read()
-        data = self._convert_data_orders(request_table)
-        return data
+        self.order_book.refresh()
+        return self.order_book.table()
+    
+    async def get_all_orders_async(self)->Dict[str, Record]:
+        """Variante asincrona de get_all_orders."""
+        await self.order_book.refresh_async()
+        return self.order_book.table()
     
-    def get_all_positions(self)-> List[Dict[str,str]]:
+    def get_all_positions(self)-> List[Record]:
         """Obtiene todas las posiciones de AlphaTraderPro y los devuelve como una lista de diccionarios.
 
         Retorna:
-            List[Dict[str,str]]: Una lista de diccionarios con la información de todas las posiciones realizadas.
+            List[Record]: Una lista de diccionarios con la información de todas las posiciones realizadas.
         """
-        url = f'{self.base_url}/positions'
-        request = urllib.request.urlopen(url).read()
-        positions_list = self._convert_data_positions(request)
+        request = self._http_client.get('/positions')
+        return self._filter_open_positions(self._convert_data_positions(request))
+    
+    async def get_all_positions_async(self)-> List[Record]:
+        """Variante asincrona de get_all_positions."""
+        request = await self._http_client.get_async('/positions')
+        return self._filter_open_positions(self._convert_data_positions(request))
+    
+    def _filter_open_positions(self, par_positions_list: List[Record])-> List[Record]:
+        # Solo se conservan las posiciones con cantidad distinta de cero
         open_positions_list = []
-        for position in positions_list:
+        for position in par_positions_list:
             if int(position['Qty']) != 0:
                 open_positions_list.append(position)
         return open_positions_list
@@ -151,7 +301,7 @@ class AlphaTraderProApi:
     def get_status_order(self, par_id: str)-> str: 
         """Obtener el estado de una orden.
 
-        Esta función busca en todas las órdenes para determinar el estado de una orden con el ID proporcionado.
+        Esta función busca la orden con el ID proporcionado en la tabla de órdenes indexada.
 
         Args:
             par_id (str): El ID de la orden para la cual se desea obtener el estado.
@@ -159,14 +309,12 @@ class AlphaTraderProApi:
         Returns:
             str: El estado de la orden con el ID dado. Puede ser "Open", "Filled", "Canceled" o "None" si no se encuentra la orden.
         """   
-        orders_table = self.get_all_orders()
-        for _, order in orders_table.items():
-            if order["OrderID"] == par_id:
-                return order["Status"]
-        return None
+        self.order_book.refresh()
+        return self.order_book.status(par_id)
       
     #endregion
     
+    #region Requests
     def send_order(self, par_order: Order) -> str:
         """Enviar una orden al exchange.
 
@@ -177,57 +325,96 @@ class AlphaTraderProApi:
 
         Returns:
             str: El estado actual de la orden enviada.
-                
-        Si la orden está abierta, se devuelve el ID de la orden.
-        Si la orden se completó, se devuelve el status 'filled'
-        Si la orden fue rechazada por AlphaTraderPro, se devuelve el status 'rejected'."""# Convierte el precio en el formato válido
-        converted_price = self._convert_price_to_format(par_order.price)# Crea la solicitud con los parámetros necesarios
-        url = f'{self.base_url}/sendOrder?symbol={par_order.symbol}&qty={str(par_order.quantity)}&exchange={par_order.exchange}&type={par_order.type}&side={par_order.side}&price={converted_price}'# Envia la solicitud al exchange
-        result = urllib.request.urlopen(url).read()# Verifica si la orden fue rechazada por AlphaTrader
-        result = result.decode('utf-8')
-        if "rejected" in result:
-            return "rejected"# Obtiene todas las posiciones abiertas de AlphaTrader
-        positions_list = self.get_all_positions()# Busca la orden enviada en la tabla de posiciones para obtener su estado actual
-        for position in positions_list:
-            if (position["Symbol"] == par_order.symbol):
-                return "filled"# Si no se encontró la posicion, se considera que la orden fue rechazada
-        return "rejected"
-
-    #region Requests
-    def send_order(self, par_order: Order) -> str:
-        """Enviar una orden al exchange.
+                - Si la orden está abierta, se devuelve el ID de la orden.
+                - Si la orden se completó, se devuelve el status 'filled'
+                - Si la orden fue rechazada por AlphaTraderPro, se devuelve el status 'rejected'.
+        """
+        sent_at = time.monotonic()
+        # Envia la solicitud al exchange, no se reintenta si pudo llegar al servidor para no duplicar la orden
+        result = self._http_client.get(self._send_order_path(par_order), par_idempotent=False)
+        # Verifica si la orden fue rechazada por el exchange
+        if "rejected" in result.decode('utf-8'):
+            return "rejected"
+        # La tabla de órdenes debe ser posterior al envio, una consulta ya iniciada despues del envio se comparte
+        self.order_book.refresh(par_since=sent_at)
+        return self._find_sent_order_status(par_order)
+    
+    async def send_order_async(self, par_order: Order) -> str:
+        """Variante asincrona de send_order."""
+        sent_at = time.monotonic()
+        result = await self._http_client.get_async(self._send_order_path(par_order), par_idempotent=False)
+        if "rejected" in result.decode('utf-8'):
+            return "rejected"
+        await self.order_book.refresh_async(par_since=sent_at)
+        return self._find_sent_order_status(par_order)
+    
+    def send_orders(self, par_orders: List[Order], par_max_concurrent: int = 8) -> List[str]:
+        """Enviar varias órdenes al exchange a la vez.
 
-        Esta función envía una solicitud para realizar una orden con la información proporcionada en el objeto 'par_order'.
+        Las órdenes se envían de forma concurrente y luego se concilian todas con una sola consulta de la tabla
+        de órdenes, en lugar de una consulta por orden.
 
         Args:
-            par_order (Order): El objeto que contiene la información de la orden a realizar.
+            par_orders (List[Order]): Las órdenes a enviar.
+            par_max_concurrent (int, opcional): Número máximo de órdenes enviándose al mismo tiempo.
 
         Returns:
-            str: El estado actual de la orden enviada.
-                - Si la orden está abierta, se devuelve el ID de la orden.
-                - Si la orden se completó, se devuelve el status 'filled'
-                - Si la orden fue rechazada por AlphaTraderPro, se devuelve el status 'rejected'.
+            List[str]: El estado de cada orden, en el mismo orden que par_orders. Los mismos valores que send_order
+            y 'error' si la solicitud falló, en cuyo caso la orden pudo no llegar al exchange.
         """
+        if len(par_orders) == 0:
+            return []
+        sent_at = time.monotonic()
+        with ThreadPoolExecutor(max_workers=min(par_max_concurrent, len(par_orders))) as executor:
+            list_sent = list(executor.map(self._send_order_request, par_orders))
+        return self._reconcile_sent_orders(par_orders, list_sent, sent_at)
+
+    async def send_orders_async(self, par_orders: List[Order], par_max_concurrent: int = 8) -> List[str]:
+        """Variante asincrona de send_orders."""
+        if len(par_orders) == 0:
+            return []
+        sent_at = time.monotonic()
+        semaphore = asyncio.Semaphore(par_max_concurrent)
+        async def send(par_order: Order) -> str:
+            async with semaphore:
+                return await asyncio.to_thread(self._send_order_request, par_order)
+        list_sent = await asyncio.gather(*(send(order) for order in par_orders))
+        return await asyncio.to_thread(self._reconcile_sent_orders, par_orders, list_sent, sent_at)
+
+    def _send_order_request(self, par_order: Order) -> str:
+        # Envia una orden sin consultar su estado: 'sent', 'rejected' o 'error'
+        try:
+            result = self._http_client.get(self._send_order_path(par_order), par_idempotent=False)
+        except (OSError, http.client.HTTPException) as error:
+            print("Error al enviar la orden de ", par_order.symbol, ": ", error)
+            return "error"
+        return "rejected" if "rejected" in result.decode('utf-8') else "sent"
+
+    def _reconcile_sent_orders(self, par_orders: List[Order], par_list_sent: List[str], par_sent_at: float) -> List[str]:
+        # Consulta una sola vez la tabla de órdenes para conocer el estado de todas las órdenes enviadas
+        if "sent" in par_list_sent:
+            self.order_book.refresh(par_since=par_sent_at)
+        used_ids = set()
+        list_status = []
+        for order, sent in zip(par_orders, par_list_sent):
+            list_status.append(self._find_sent_order_status(order, used_ids) if sent == "sent" else sent)
+        return list_status
+
+    def _send_order_path(self, par_order: Order) -> str:
         # Convierte el precio en el formato válido
         converted_price = self._convert_price_to_format(par_order.price)
         # Crea la solicitud con los parámetros necesarios
-        url = f'{self.base_url}/sendOrder?symbol={par_order.symbol}&qty={str(par_order.quantity)}&exchange={par_order.exchange}&type={par_order.type}&side={par_order.side}&price={converted_price}'
-        # Envia la solicitud al exchange
-        result = urllib.request.urlopen(url).read()
-        # Verifica si la orden fue rechazada por el exchange
-        result = result.decode('utf-8')
-        if "rejected" in result:
-            return "rejected"
-        # Obtiene todas las órdenes del exchange (suponemos que existe una función 'get_all_orders')
-        orders_table = self.get_all_orders()
-        # Busca la orden enviada en la tabla de órdenes para obtener su estado actual
-        for _, order in orders_table.items():
-            if (
-                order["Symbol"] == par_order.symbol
-                and order["Qty"] == par_order.quantity
-                and order["OrderType"] == par_order.type
-            ):
-                if order["Status"] == Status.OPEN:
+        return f'/sendOrder?symbol={par_order.symbol}&qty={str(par_order.quantity)}&exchange={par_order.exchange}&type={par_order.type}&side={par_order.side}&price={converted_price}'
+    
+    def _find_sent_order_status(self, par_order: Order, par_used_ids: set = None) -> str:
+        # Busca la orden enviada entre las órdenes abiertas del símbolo, sin repetir las ya asignadas a otra orden.
+        # Qty llega como int desde parser.py; antes era texto, nunca era igual a la cantidad y siempre se retornaba 'filled'
+        for order in self.order_book.find(par_order.symbol, Status.OPEN):
+            if order["Qty"] == par_order.quantity and order["OrderType"] == par_order.type:
+                if par_used_ids is None:
+                    return order["OrderID"]
+                if order["OrderID"] not in par_used_ids:
+                    par_used_ids.add(order["OrderID"])
                     return order["OrderID"]
         # Si no se encontró la orden en la tabla o su estado no es 'OPEN', se considera que la orden fue completada
         return "filled"
@@ -240,20 +427,20 @@ class AlphaTraderProApi:
         Args:
             par_id (str): El ID de la orden a cancelar.
         """
-        url = f'{self.base_url}/cancelOrder?id={par_id}'
-        urllib.request.urlopen(url).read()
+        self._http_client.get(f'/cancelOrder?id={par_id}', par_idempotent=False)
+    
+    async def cancel_order_async(self, par_id: str):
+        """Variante asincrona de cancel_order."""
+        await self._http_client.get_async(f'/cancelOrder?id={par_id}', par_idempotent=False)
     
     def cancel_all_orders_open(self):
         """Cancelar todas las órdenes abiertas.
 
         Esta función obtiene todas las órdenes y cancela aquellas que estén abiertas (Status.OPEN).
         """
-        orders_table = self.get_all_orders()
-        for _, order in orders_table.items():
-            if (
-                order["Status"] == Status.OPEN
-            ):
-                self.cancel_order(order["OrderID"])
+        self.order_book.refresh()
+        for order in self.order_book.find_status(Status.OPEN):
+            self.cancel_order(order["OrderID"])
         
     def close_positions_of_a_symbol(self, par_symbol:str):
         """Cerrar todas las posiciones abiertas de un símbolo específico enviando órdenes de mercado.
@@ -263,20 +450,12 @@ class AlphaTraderProApi:
 
         Args:
             par_symbol (str): El símbolo del activo para el cual se desean cerrar las posiciones abiertas.
+
+        Returns:
+            List[str]: El estado de cada orden de cierre, ver send_orders.
         """
-        list_positions = self.get_all_positions()
-        for data_order in list_positions:
-            if par_symbol == data_order['Symbol']:
-                order = Order(
-                    symbol= data_order['Symbol'],
-                    price= float(data_order['LastPrice']),
-                    quantity= int(data_order['Qty']),
-                    exchange= Exchange.BATS,
-                    type= Type.LIMIT,
-                    side= data_order['Side']
-                    )
-                order.convert_to_close_position()
-                self.send_order(order)
+        list_positions = [data_order for data_order in self.get_all_positions() if par_symbol == data_order['Symbol']]
+        return self.send_orders(self._close_orders(list_positions))
     
     def close_position_of_a_order(self, par_order: Order):
         """Cierra la posición asociada a una orden específica.
@@ -291,10 +470,22 @@ class AlphaTraderProApi:
         """Cerrar todas las posiciones abiertas enviando órdenes de mercado.
 
         Esta función cierra todas las posiciones abiertas en el exchange enviando órdenes de mercado.
-        Obtiene la lista de posiciones abiertas, crea una orden de mercado para cada posición y la envía para cerrarla.
+        Obtiene la lista de posiciones abiertas, crea una orden de mercado para cada posición y las envía
+        a la vez con send_orders.
+
+        Returns:
+            List[str]: El estado de cada orden de cierre, ver send_orders.
         """
-        list_positions = self.get_all_positions()
-        for data_order in list_positions:
+        return self.send_orders(self._close_orders(self.get_all_positions()))
+
+    async def close_all_positions_async(self):
+        """Variante asincrona de close_all_positions."""
+        return await self.send_orders_async(self._close_orders(await self.get_all_positions_async()))
+
+    def _close_orders(self, par_list_positions: List[Record]) -> List[Order]:
+        # Crea la orden de mercado que cierra cada posición
+        list_orders = []
+        for data_order in par_list_positions:
             order = Order(
                 symbol= data_order['Symbol'],
                 price= float(data_order['LastPrice']),
@@ -303,6 +494,8 @@ class AlphaTraderProApi:
                 type= Type.LIMIT,
                 side= data_order['Side']
                 )
-            self.close_position_of_a_order(order)
+            order.convert_to_close_position()
+            list_orders.append(order)
+        return list_orders
                 
     #endregion
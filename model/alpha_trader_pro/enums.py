@@ -93,7 +93,9 @@ class Status:
         FILLED (str): Representa el estado 'Filled', que indica que la orden ha sido completada.
         CANCELED (str): Representa el estado 'Canceled', que indica que la orden ha sido cancelada.
         OPEN (str): Representa el estado 'PendingNew', que indica que la orden es nueva o activa y aún no se ha completado.
+        REJECTED (str): Representa el estado 'Rejected', que indica que la orden fue rechazada.
     """
     FILLED = "Filled"
     CANCELED = "Canceled"
-    OPEN = "PendingNew"
\ No newline at end of file
+    OPEN = "PendingNew"
+    REJECTED = "Rejected"
\ No newline at end of file
@@ -0,0 +1,118 @@
+import asyncio  # Para la variante asincrona de la actualizacion
+import threading  # Para que varios hilos compartan una misma consulta
+import time  # Para medir la antiguedad de la tabla
+from typing import Callable, Dict, List, Tuple  # Importación de módulos para definir tipos de datos
+from .parser import Record, parse_record, split_order_rows
+
+class OrderBook:
+    """
+    Cache de la tabla de ordenes de AlphaTraderPro indexada por OrderID y por (símbolo, estado), para consultar
+    el estado de una orden sin recorrer toda la tabla.
+
+    Al actualizar solo se convierten las filas nuevas o que cambiaron respecto a la consulta anterior, y solo
+    esas filas se mueven en los indices. La tabla se consulta como maximo una vez por intervalo (par_max_age):
+    los que llaman dentro del intervalo usan la tabla en memoria y los que llaman mientras hay una consulta en
+    curso esperan a esa misma consulta.
+    """
+    def __init__(self, par_fetch_orders: Callable[[], bytes], par_max_age: float = 1) -> None:
+        """
+        Args:
+            par_fetch_orders (Callable[[], bytes]): Funcion que consulta la tabla de ordenes sin convertir.
+            par_max_age (float, opcional): Segundos durante los que la tabla en memoria se considera vigente.
+        """
+        self._fetch_orders = par_fetch_orders
+        self.max_age = par_max_age
+        # Contenido sin convertir y registro de cada fila de la tabla, por clave de fila
+        self._rows: Dict[str, Tuple[str, Record]] = {}
+        # Indices de los registros
+        self._by_id: Dict[str, Record] = {}
+        self._by_symbol_status: Dict[Tuple[str, str], Dict[str, Record]] = {}
+        # Momento (time.monotonic) en que inicio la ultima consulta, None si no se ha consultado
+        self._fetched_at: float = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        # El lock no se copia a otros procesos
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, par_state: dict) -> None:
+        self.__dict__.update(par_state)
+        self._lock = threading.Lock()
+
+    def refresh(self, par_since: float = None) -> None:
+        """
+        Actualiza la tabla si ya no es vigente.
+
+        Args:
+            par_since (float, opcional): Momento (time.monotonic) desde el que la tabla debe estar consultada, por
+                ejemplo el momento en que se envio una orden. Una consulta iniciada despues de ese momento se comparte.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._fetched_at is not None and now - self._fetched_at < self.max_age and (par_since is None or self._fetched_at >= par_since):
+                return
+            self._apply(split_order_rows(self._fetch_orders()))
+            self._fetched_at = now
+
+    async def refresh_async(self, par_since: float = None) -> None:
+        """Variante asincrona de refresh, la consulta se ejecuta en un hilo."""
+        await asyncio.to_thread(self.refresh, par_since)
+
+    def _apply(self, par_rows: List[Tuple[str, str]]) -> None:
+        # Elimina las filas que ya no estan en la tabla
+        row_keys = {key for key, _ in par_rows}
+        for key in [key for key in self._rows if key not in row_keys]:
+            self._unindex(self._rows.pop(key)[1])
+        # Convierte e indexa solo las filas nuevas o que cambiaron
+        for key, body in par_rows:
+            row = self._rows.get(key)
+            if row is not None and row[0] == body:
+                continue
+            if row is not None:
+                self._unindex(row[1])
+            record = parse_record(body)
+            self._rows[key] = (body, record)
+            self._index(record)
+
+    def _index(self, par_record: Record) -> None:
+        order_id = par_record.get('OrderID')
+        self._by_id[order_id] = par_record
+        self._by_symbol_status.setdefault((par_record.get('Symbol'), par_record.get('Status')), {})[order_id] = par_record
+
+    def _unindex(self, par_record: Record) -> None:
+        order_id = par_record.get('OrderID')
+        if self._by_id.get(order_id) is par_record:
+            del self._by_id[order_id]
+        group_key = (par_record.get('Symbol'), par_record.get('Status'))
+        group = self._by_symbol_status.get(group_key)
+        if group is not None and group.get(order_id) is par_record:
+            del group[order_id]
+            if not group:
+                del self._by_symbol_status[group_key]
+
+    def get(self, par_id: str) -> Record:
+        """Retorna la orden con el OrderID dado, None si no esta en la tabla."""
+        return self._by_id.get(par_id)
+
+    def status(self, par_id: str) -> str:
+        """Retorna el estado de la orden con el OrderID dado, None si no esta en la tabla."""
+        order = self._by_id.get(par_id)
+        return None if order is None else order.get('Status')
+
+    def find(self, par_symbol: str, par_status: str) -> List[Record]:
+        """Retorna las ordenes de un símbolo con el estado dado."""
+        return list(self._by_symbol_status.get((par_symbol, par_status), {}).values())
+
+    def find_status(self, par_status: str) -> List[Record]:
+        """Retorna las ordenes de todos los símbolos con el estado dado."""
+        return [
+            order
+            for (_, status), group in self._by_symbol_status.items() if status == par_status
+            for order in group.values()
+        ]
+
+    def table(self) -> Dict[str, Record]:
+        """Retorna la tabla completa de ordenes por clave de fila, en el mismo formato que parse_orders."""
+        return {key: record for key, (_, record) in self._rows.items()}
@@ -0,0 +1,174 @@
+import asyncio  # Para esperar las ordenes desde un bucle de eventos
+import threading  # Para el hilo que consulta el estado de las ordenes
+import time  # Para el intervalo de consulta y el tiempo limite de las ordenes
+from concurrent.futures import Future  # Resultado de cada orden, se puede esperar desde hilos o con asyncio
+from typing import Dict, Tuple  # Importación de módulos para definir tipos de datos
+from .api import AlphaTraderProApi
+from .enums import Status
+from .models import Order
+
+# Estados con los que una orden ya no cambia
+FINAL_STATUSES = frozenset((Status.FILLED, Status.CANCELED, Status.REJECTED))
+
+class OrderTracker:
+    """
+    Sigue el estado de las ordenes enviadas sin bloquear a quien las envia. Cada orden tiene un Future que se
+    resuelve con su estado final (Status.FILLED, Status.CANCELED o Status.REJECTED) en cuanto aparece en la
+    tabla de ordenes. Si no llega a un estado final dentro del tiempo limite se pide cancelarla, y el Future se
+    resuelve con None solo cuando la tabla confirma la cancelacion; si la orden se completo antes de cancelarla
+    se resuelve con Status.FILLED.
+
+    Un solo hilo consulta la tabla de ordenes (api.order_book) para todas las ordenes pendientes, y solo
+    mientras haya ordenes pendientes. Cada consulta descarga toda la tabla, por lo que el intervalo entre consultas
+    empieza en par_poll_interval y se duplica hasta par_max_poll_interval; vuelve al inicial con cada orden nueva.
+    Los Future se pueden esperar con result(), recibir un callback con
+    add_done_callback o esperar desde asyncio con submit_async.
+    """
+    def __init__(self, par_api: AlphaTraderProApi, par_poll_interval: float = 0.1, par_timeout: float = 5,
+                 par_max_poll_interval: float = 1) -> None:
+        """
+        Args:
+            par_api (AlphaTraderProApi): Api con la que se envian las ordenes y se consulta su estado.
+            par_poll_interval (float, opcional): Segundos entre las primeras consultas de la tabla de ordenes.
+            par_timeout (float, opcional): Segundos que se espera a que una orden llegue a un estado final.
+            par_max_poll_interval (float, opcional): Segundos máximos entre consultas.
+        """
+        self._api = par_api
+        self.poll_interval = par_poll_interval
+        self.max_poll_interval = par_max_poll_interval
+        self.timeout = par_timeout
+        # Intervalo hasta la siguiente consulta, crece mientras las ordenes siguen pendientes
+        self._interval = par_poll_interval
+        # Ordenes pendientes por OrderID: (orden, future, momento limite, si ya se pidio cancelarla)
+        self._pending: Dict[str, Tuple[Order, Future, float, bool]] = {}
+        self._condition = threading.Condition()
+        self._poller: threading.Thread = None
+
+    def __getstate__(self) -> dict:
+        # Las ordenes pendientes y el hilo de consulta pertenecen al proceso que las envio
+        state = self.__dict__.copy()
+        for name in ('_pending', '_condition', '_poller'):
+            del state[name]
+        return state
+
+    def __setstate__(self, par_state: dict) -> None:
+        self.__dict__.update(par_state)
+        self._pending = {}
+        self._condition = threading.Condition()
+        self._poller = None
+
+    def submit(self, par_order: Order) -> Future:
+        """
+        Envia una orden y retorna el Future de su estado final. El envio es sincrono (un viaje de ida y vuelta),
+        la confirmacion no.
+
+        Args:
+            par_order (Order): La orden a enviar.
+
+        Returns:
+            Future: Se resuelve con el estado final de la orden, o None si no se confirmo a tiempo.
+        """
+        future = Future()
+        try:
+            result = self._api.send_order(par_order)
+        except Exception as error:
+            future.set_exception(error)
+            return future
+
+        if result == 'filled':
+            par_order.set_status(Status.FILLED)
+            future.set_result(Status.FILLED)
+        elif result == 'rejected':
+            par_order.set_status(Status.REJECTED)
+            future.set_result(Status.REJECTED)
+        else:
+            # La orden sigue abierta, se sigue hasta que llegue a un estado final
+            par_order.set_id(result)
+            par_order.set_status(Status.OPEN)
+            self.track(par_order, future)
+        return future
+
+    async def submit_async(self, par_order: Order) -> str:
+        """Variante asincrona de submit, retorna directamente el estado final de la orden."""
+        future = await asyncio.to_thread(self.submit, par_order)
+        return await asyncio.wrap_future(future)
+
+    def track(self, par_order: Order, par_future: Future = None) -> Future:
+        """
+        Sigue una orden ya enviada, que debe tener su id.
+
+        Args:
+            par_order (Order): La orden enviada.
+            par_future (Future, opcional): Future a resolver, por defecto se crea uno nuevo.
+
+        Returns:
+            Future: Se resuelve con el estado final de la orden, o None si no se confirmo a tiempo y se cancelo.
+        """
+        future = Future() if par_future is None else par_future
+        with self._condition:
+            self._pending[par_order.id] = (par_order, future, time.monotonic() + self.timeout, False)
+            self._interval = self.poll_interval
+            if self._poller is None or not self._poller.is_alive():
+                self._poller = threading.Thread(target=self._poll, daemon=True)
+                self._poller.start()
+            self._condition.notify()
+        return future
+
+    def _poll(self) -> None:
+        # Consulta la tabla de ordenes mientras haya ordenes pendientes y resuelve las que terminaron
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                pending = list(self._pending.items())
+
+            started_at = time.monotonic()
+            try:
+                self._api.order_book.refresh(par_since=started_at)
+            except Exception as error:
+                print("Error al consultar las ordenes: ", error)
+            else:
+                for order_id, (order, future, deadline, cancel_requested) in pending:
+                    status = self._api.order_book.status(order_id)
+                    if status in FINAL_STATUSES:
+                        self._resolve(order_id, order, future, status, cancel_requested)
+                    elif started_at > deadline:
+                        self._expire(order_id, order, future)
+
+            # Una orden nueva despierta al hilo y reinicia el intervalo
+            with self._condition:
+                interval = self._interval
+                self._interval = min(interval * 2, max(self.max_poll_interval, self.poll_interval))
+                self._condition.wait(max(0, interval - (time.monotonic() - started_at)))
+
+    def _expire(self, par_order_id: str, par_order: Order, par_future: Future) -> None:
+        # La orden no se confirmo a tiempo, se pide cancelarla. Pudo completarse entre la consulta y la cancelacion,
+        # o la cancelacion pudo fallar, por lo que solo se resuelve con el estado que confirme la tabla de ordenes
+        try:
+            self._api.cancel_order(par_order_id)
+        except Exception as error:
+            print("Error al cancelar la orden ", par_order_id, ": ", error)
+        with self._condition:
+            if par_order_id not in self._pending:
+                return
+            # Mientras no llegue a un estado final la orden sigue pendiente, la cancelacion se vuelve a pedir
+            # despues de otro tiempo limite
+            self._pending[par_order_id] = (par_order, par_future, time.monotonic() + self.timeout, True)
+
+        try:
+            self._api.order_book.refresh(par_since=time.monotonic())
+        except Exception as error:
+            print("Error al consultar las ordenes: ", error)
+            return
+        status = self._api.order_book.status(par_order_id)
+        if status in FINAL_STATUSES:
+            self._resolve(par_order_id, par_order, par_future, status, True)
+
+    def _resolve(self, par_order_id: str, par_order: Order, par_future: Future, par_status: str, par_cancel_requested: bool = False) -> None:
+        with self._condition:
+            if self._pending.pop(par_order_id, None) is None:
+                return
+        par_order.set_status(par_status)
+        # Una orden cancelada por el tiempo limite se resuelve con None, las demas con su estado final.
+        # Los callbacks se ejecutan en este hilo
+        par_future.set_result(None if par_cancel_requested and par_status == Status.CANCELED else par_status)
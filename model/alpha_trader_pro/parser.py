@@ -0,0 +1,97 @@
+import json  # Para leer la lista de posiciones
+from typing import Dict, List, Tuple, Union  # Importación de módulos para definir tipos de datos
+
+# Un registro de AlphaTraderPro con sus valores ya convertidos
+Record = Dict[str, Union[str, int, float]]
+
+# Campos numericos, el resto de los valores se conservan como texto (por ejemplo OrderID)
+INT_FIELDS = frozenset(('Qty',))
+FLOAT_FIELDS = frozenset(('Price', 'PosAvgPrice', 'LastPrice', 'Unrealized', 'NetPnl', 'GrossPnl'))
+
+def parse_record(par_body: str) -> Record:
+    """
+    Convierte el contenido de un registro (sin corchetes) en un diccionario con los valores convertidos.
+
+    El registro se recorre una sola vez separandolo por comas. Un fragmento solo inicia un campo nuevo si
+    empieza con una clave (Clave=), de lo contrario la coma es parte del valor anterior, como la coma decimal
+    de los precios o una coma dentro de un texto. Los precios pasan a float y las cantidades a int, si un valor
+    no es un numero valido se conserva el texto.
+
+    Args:
+        par_body (str): Contenido del registro. Ejemplo: 'Symbol=AAPL, Qty=100, Price=10,5'
+
+    Returns:
+        Record: Ejemplo: {'Symbol': 'AAPL', 'Qty': 100, 'Price': 10.5}
+    """
+    record = {}
+    key = None
+    for token in par_body.split(','):
+        name, equals, value = token.partition('=')
+        name = name.strip()
+        if equals and name and ' ' not in name:
+            key = name
+            record[key] = value.strip()
+        elif key is not None:
+            record[key] = (record[key] + ',' + token).rstrip()
+
+    for key, value in record.items():
+        if key in FLOAT_FIELDS:
+            try:
+                record[key] = float(value.replace(',', '.'))
+            except ValueError:
+                pass
+        elif key in INT_FIELDS:
+            try:
+                record[key] = int(value)
+            except ValueError:
+                pass
+    return record
+
+def split_order_rows(par_data: bytes) -> List[Tuple[str, str]]:
+    """
+    Separa la tabla de ordenes de AlphaTraderPro en filas sin convertir, para que quien la lea pueda convertir
+    solo las filas que cambiaron.
+
+    Args:
+        par_data (bytes): La tabla de ordenes. Ejemplo: b'"[0=[OrderID=1, Symbol=AAPL, Qty=100, Price=10,5]]"'
+
+    Returns:
+        List[Tuple[str, str]]: Clave y contenido de cada fila. Ejemplo: [('0', 'OrderID=1, Symbol=AAPL, Qty=100, Price=10,5')]
+    """
+    rows = []
+    # Cada registro termina en ']', lo que esta antes de '=[' es su clave
+    for piece in par_data.decode('utf-8').split(']'):
+        key, opening, body = piece.partition('=[')
+        if opening:
+            rows.append((key.strip(' ,["'), body))
+    return rows
+
+def parse_orders(par_data: bytes) -> Dict[str, Record]:
+    """
+    Convierte la tabla de ordenes de AlphaTraderPro en un diccionario de registros por clave.
+
+    Args:
+        par_data (bytes): La tabla de ordenes. Ejemplo: b'"[0=[OrderID=1, Symbol=AAPL, Qty=100, Price=10,5]]"'
+
+    Returns:
+        Dict[str, Record]: Ejemplo: {'0': {'OrderID': '1', 'Symbol': 'AAPL', 'Qty': 100, 'Price': 10.5}}
+    """
+    return {key: parse_record(body) for key, body in split_order_rows(par_data)}
+
+def parse_positions(par_data: bytes) -> List[Record]:
+    """
+    Convierte la lista de posiciones de AlphaTraderPro (una lista json de registros en texto) en una lista de
+    registros.
+
+    Args:
+        par_data (bytes): La lista de posiciones. Ejemplo: b'["[Symbol=AAPL, Qty=100, LastPrice=10,5]"]'
+
+    Returns:
+        List[Record]: Ejemplo: [{'Symbol': 'AAPL', 'Qty': 100, 'LastPrice': 10.5}]
+    """
+    positions_list = []
+    for data in json.loads(par_data.decode('utf-8')):
+        _, opening, body = data.partition('[')
+        if opening:
+            positions_list.append(parse_record(body.rpartition(']')[0]))
+    return positions_list
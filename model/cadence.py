@@ -0,0 +1,131 @@
+import asyncio  # Para esperar sin bloquear el bucle de eventos
+import time  # Para el reloj y las esperas
+from typing import Any, Dict, Optional  # Importación de módulos para definir tipos de datos
+
+class CadenceScheduler:
+    """
+    Marca el ritmo de un bucle que procesa datos que cambian a lo sumo una vez por barra, por ejemplo filter_2
+    con barras de 1 minuto.
+
+    Cada vuelta, menos la primera, espera al siguiente limite de barra (múltiplo de par_period_seconds en tiempo
+    epoch) mas un desfase, para dar tiempo a que la barra se publique. La vuelta solo se ejecuta si sus entradas
+    cambiaron desde la ultima ejecución. Se guardan la duración de cada ejecución, el retraso entre el limite y
+    el inicio y los limites perdidos porque una ejecución tardo mas de un periodo.
+
+    Uso:
+        >>> scheduler = CadenceScheduler(60, 5)
+        >>> while True:
+        ...     scheduler.wait()
+        ...     if not scheduler.should_run(inputs):
+        ...         continue
+        ...     scheduler.start_run()
+        ...     ...
+        ...     scheduler.finish_run(inputs)
+    """
+    def __init__(self, par_period_seconds: float = 60, par_offset_seconds: float = 0) -> None:
+        """
+        Args:
+            par_period_seconds (float, opcional): Duración de la barra en segundos.
+            par_offset_seconds (float, opcional): Segundos despues de cada limite en los que empieza la vuelta.
+        """
+        self.period = par_period_seconds
+        self.offset = par_offset_seconds % par_period_seconds
+        # Limite de la vuelta actual (tiempo epoch), None antes de la primera espera
+        self.scheduled_at: Optional[float] = None
+        self._slot: Optional[int] = None
+        # Entradas de la ultima ejecución, se compara con las de cada vuelta
+        self._last_inputs: Any = None
+        self._has_run = False
+        self._started_at: float = None
+        # Métricas acumuladas
+        self.runs = 0
+        self.skipped = 0
+        self.missed = 0
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+        self._total_duration = 0.0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._total_lag = 0.0
+
+    def _next(self) -> float:
+        # Calcula el siguiente limite y cuenta los que se perdieron desde el anterior, la primera vuelta no espera.
+        # Los limites se numeran con enteros para que el redondeo no repita ni salte un limite
+        now = time.time()
+        slot = int((now - self.offset) // self.period)
+        if self._slot is None:
+            scheduled_at = now
+        else:
+            slot = max(slot + 1, self._slot + 1)
+            self.missed += slot - self._slot - 1
+            scheduled_at = slot * self.period + self.offset
+        self._slot = slot
+        self.scheduled_at = scheduled_at
+        return scheduled_at
+
+    def wait(self) -> float:
+        """Espera hasta el siguiente limite de barra mas el desfase y lo retorna."""
+        scheduled_at = self._next()
+        time.sleep(max(scheduled_at - time.time(), 0))
+        return scheduled_at
+
+    async def wait_async(self) -> float:
+        """Igual que wait pero sin bloquear el bucle de eventos."""
+        scheduled_at = self._next()
+        await asyncio.sleep(max(scheduled_at - time.time(), 0))
+        return scheduled_at
+
+    def should_run(self, par_inputs: Any) -> bool:
+        """
+        Indica si la vuelta se debe ejecutar: siempre la primera vez y despues solo si par_inputs es distinto
+        de las entradas de la ultima ejecución. Las vueltas que no se ejecutan se cuentan en skipped.
+        """
+        if self._has_run and par_inputs == self._last_inputs:
+            self.skipped += 1
+            return False
+        return True
+
+    def start_run(self) -> None:
+        """Marca el inicio de una ejecución y calcula su retraso respecto al limite."""
+        self._started_at = time.time()
+        self.last_lag = self._started_at - self.scheduled_at if self.scheduled_at is not None else 0.0
+        self.max_lag = max(self.max_lag, self.last_lag)
+        self._total_lag += self.last_lag
+
+    def finish_run(self, par_inputs: Any) -> None:
+        """
+        Marca el final de una ejecución.
+
+        Args:
+            par_inputs (Any): Entradas al terminar, incluidos los cambios que hizo la misma ejecución, para no
+                volver a ejecutar la siguiente vuelta solo por ellos.
+        """
+        self.last_duration = time.time() - self._started_at
+        self.max_duration = max(self.max_duration, self.last_duration)
+        self._total_duration += self.last_duration
+        self.runs += 1
+        self._last_inputs = par_inputs
+        self._has_run = True
+
+    def metrics(self) -> Dict[str, float]:
+        """Retorna las métricas acumuladas, duraciones y retrasos en segundos."""
+        return {
+            'runs': self.runs,
+            'skipped': self.skipped,
+            'missed': self.missed,
+            'last_duration': self.last_duration,
+            'mean_duration': self._total_duration / self.runs if self.runs else 0.0,
+            'max_duration': self.max_duration,
+            'last_lag': self.last_lag,
+            'mean_lag': self._total_lag / self.runs if self.runs else 0.0,
+            'max_lag': self.max_lag,
+        }
+
+    def format_metrics(self) -> str:
+        """Retorna las métricas en una linea."""
+        metrics = self.metrics()
+        return (
+            f"ejecuciones: {metrics['runs']}, omitidas: {metrics['skipped']}, perdidas: {metrics['missed']}, "
+            f"duracion: {metrics['last_duration'] * 1000:.1f} ms (promedio {metrics['mean_duration'] * 1000:.1f}, maxima {metrics['max_duration'] * 1000:.1f}), "
+            f"retraso: {metrics['last_lag'] * 1000:.1f} ms (promedio {metrics['mean_lag'] * 1000:.1f}, maximo {metrics['max_lag'] * 1000:.1f})"
+        )
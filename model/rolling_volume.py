@@ -0,0 +1,108 @@
+from typing import Dict, List  # Importación de módulos para definir tipos de datos
+import numpy as np  # Para los buffers de volumen
+from model.alpaca.find_pivots import DAY_NS  # Nanosegundos de un dia
+
+class RollingVolume:
+    """
+    Volumen diario de las ultimas par_days sesiones de cada símbolo (la de hoy incluida) en un buffer circular,
+    junto con la suma de cada símbolo, para obtener el volumen de hoy y el promedio sin recorrer los días.
+
+    Se llena una sola vez con las barras diarias (seed) y despues solo se actualiza el volumen de hoy
+    (set_today, por ejemplo con las barras diarias del stream). Cuando llega el volumen de una sesión nueva el
+    buffer avanza una posición para todos los símbolos: se descarta la sesión mas antigua de cada suma.
+    """
+    def __init__(self, par_symbols: List[str], par_days: int = 20) -> None:
+        """
+        Args:
+            par_symbols (List[str]): Símbolos del buffer.
+            par_days (int, opcional): Sesiones del promedio, la de hoy incluida.
+        """
+        self.days = par_days
+        self._index: Dict[str, int] = {symbol: row for row, symbol in enumerate(par_symbols)}
+        self._volumes = np.zeros((len(par_symbols), par_days))
+        # Suma y cantidad de sesiones con volumen de cada símbolo
+        self._sums = np.zeros(len(par_symbols))
+        self._counts = np.zeros(len(par_symbols), dtype=np.int64)
+        # Columna de la sesión de hoy y su día (epoch), None hasta llenar el buffer
+        self._head = 0
+        self._day: int = None
+
+    def seed(self, par_bars: Dict[str, np.ndarray], par_current_day: int) -> None:
+        """
+        Llena el buffer con las barras diarias de cada símbolo.
+
+        Args:
+            par_bars (Dict[str, np.ndarray]): Barras diarias de cada símbolo en formato BAR_DTYPE, en orden.
+            par_current_day (int): Día de hoy (nanosegundos epoch // DAY_NS), su barra (si existe) es el volumen de hoy.
+        """
+        self._day = par_current_day
+        for symbol, bars in par_bars.items():
+            row = self._index.get(symbol)
+            if row is None:
+                continue
+            days = bars['timestamp'] // DAY_NS
+            previous = bars['volume'][days < par_current_day]
+            # Hasta par_days - 1 sesiones anteriores, con par_days=1 ninguna ([-0:] las tomaria todas)
+            previous = previous[max(len(previous) - (self.days - 1), 0):]
+            today = bars['volume'][days == par_current_day]
+            self._volumes[row] = 0
+            # Las sesiones anteriores quedan en las columnas previas a la de hoy
+            self._volumes[row, (self._head - np.arange(len(previous), 0, -1)) % self.days] = previous
+            self._volumes[row, self._head] = today[-1] if len(today) > 0 else 0
+            self._sums[row] = self._volumes[row].sum()
+            self._counts[row] = len(previous) + 1
+
+    def set_today(self, par_symbol: str, par_timestamp: int, par_volume: float) -> bool:
+        """
+        Actualiza el volumen de hoy de un símbolo.
+
+        Args:
+            par_symbol (str): Símbolo.
+            par_timestamp (int): Timestamp de la barra diaria en nanosegundos epoch. Si es de una sesión posterior
+                a la de hoy el buffer avanza, si es anterior se ignora.
+            par_volume (float): Volumen acumulado de la sesión.
+
+        Returns:
+            bool: True si el buffer cambio.
+        """
+        row = self._index.get(par_symbol)
+        if row is None or self._day is None:
+            return False
+        day = par_timestamp // DAY_NS
+        if day < self._day:
+            return False
+        rolled = day > self._day
+        if rolled:
+            self._roll(day)
+        if self._volumes[row, self._head] == par_volume:
+            return rolled
+        self._sums[row] += par_volume - self._volumes[row, self._head]
+        self._volumes[row, self._head] = par_volume
+        return True
+
+    def _roll(self, par_day: int) -> None:
+        # Nueva sesión: descarta la mas antigua y deja el volumen de hoy en 0
+        self._head = (self._head + 1) % self.days
+        self._sums -= self._volumes[:, self._head]
+        self._volumes[:, self._head] = 0
+        self._counts = np.minimum(self._counts + 1, self.days)
+        self._day = par_day
+
+    def _rows(self, par_symbols: List[str]) -> np.ndarray:
+        return np.fromiter((self._index.get(symbol, -1) for symbol in par_symbols), dtype=np.int64, count=len(par_symbols))
+
+    def today(self, par_symbols: List[str]) -> np.ndarray:
+        """Retorna el volumen de hoy de cada símbolo, NaN si no esta en el buffer."""
+        rows = self._rows(par_symbols)
+        result = np.full(len(rows), np.nan)
+        result[rows >= 0] = self._volumes[rows[rows >= 0], self._head]
+        return result
+
+    def mean(self, par_symbols: List[str]) -> np.ndarray:
+        """Retorna el volumen promedio de las sesiones de cada símbolo (la de hoy incluida), NaN si no tiene sesiones."""
+        rows = self._rows(par_symbols)
+        result = np.full(len(rows), np.nan)
+        found = rows[rows >= 0]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result[rows >= 0] = np.where(self._counts[found] > 0, self._sums[found] / self._counts[found], np.nan)
+        return result
@@ -0,0 +1,103 @@
+import ast  # Para encontrar las columnas de cada regla
+import time  # Para medir el tiempo de cada regla
+from typing import Dict, List, Tuple  # Importación de módulos para definir tipos de datos
+import numpy as np  # Para las mascaras de las reglas
+
+class Rule:
+    """
+    Regla de filtrado declarada como una expresion sobre las columnas de una tabla de características, por
+    ejemplo '(price >= 20) & (price <= 500)'. La expresion se compila una sola vez y se evalua con NumPy sobre
+    todas las filas a la vez, debe retornar una mascara booleana. Solo puede usar nombres de columnas y np.
+    """
+    def __init__(self, par_name: str, par_expression: str) -> None:
+        """
+        Args:
+            par_name (str): Nombre de la regla en el reporte.
+            par_expression (str): Expresion vectorizada sobre las columnas de la tabla.
+        """
+        self.name = par_name
+        self.expression = par_expression
+        self._code = compile(par_expression, '<regla ' + par_name + '>', 'eval')
+        # Columnas que usa la expresion: los nombres que se leen, sin np. Los atributos (np.abs) no son nombres
+        names = [node.id for node in ast.walk(ast.parse(par_expression, mode='eval')) if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load)]
+        self.columns = tuple(dict.fromkeys(name for name in names if name != 'np'))
+
+    def __getstate__(self) -> dict:
+        # Los objetos de codigo no se pueden copiar a otros procesos (pickle), se vuelven a compilar al cargar
+        state = self.__dict__.copy()
+        del state['_code']
+        return state
+
+    def __setstate__(self, par_state: dict) -> None:
+        self.__dict__.update(par_state)
+        self._code = compile(self.expression, '<regla ' + self.name + '>', 'eval')
+
+    def evaluate(self, par_columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Evalua la regla sobre las columnas dadas y retorna su mascara."""
+        return eval(self._code, {'__builtins__': {}, 'np': np}, par_columns)
+
+class Screener:
+    """
+    Aplica un conjunto de reglas a una tabla de características con una fila por símbolo.
+
+    Las reglas se evaluan una tras otra solo sobre las filas que pasaron las anteriores, por lo que cada regla
+    es mas barata que la anterior. Despues de cada uso las reglas se reordenan con sus estadisticas acumuladas:
+    primero las que cuestan menos por fila y descartan mas filas (costo por fila / fraccion descartada). El
+    resultado no depende del orden.
+    """
+    def __init__(self, par_rules: List[Rule]) -> None:
+        """
+        Args:
+            par_rules (List[Rule]): Reglas en el orden inicial, se usa mientras no hay estadisticas de todas.
+        """
+        self.rules = list(par_rules)
+        # Estadisticas acumuladas por regla: filas evaluadas, filas que pasaron y segundos
+        self._stats: Dict[str, List[float]] = {rule.name: [0, 0, 0.0] for rule in self.rules}
+        # Reporte del ultimo uso: (regla, filas evaluadas, filas que pasaron, segundos)
+        self.last_report: List[Tuple[str, int, int, float]] = []
+
+    def _rank(self, par_rule: Rule) -> float:
+        evaluated, passed, seconds = self._stats[par_rule.name]
+        rejected = 1 - passed / evaluated
+        return seconds / evaluated / max(rejected, 1e-6)
+
+    def _ordered_rules(self) -> List[Rule]:
+        if any(self._stats[rule.name][0] == 0 for rule in self.rules):
+            return self.rules
+        return sorted(self.rules, key=self._rank)
+
+    def apply(self, par_table: np.ndarray) -> np.ndarray:
+        """
+        Aplica las reglas a la tabla.
+
+        Args:
+            par_table (np.ndarray): Tabla de características (arreglo estructurado) con las columnas de las reglas.
+
+        Returns:
+            np.ndarray: Indices de las filas que pasaron todas las reglas, en orden.
+        """
+        rows = np.arange(len(par_table))
+        report = []
+        for rule in self._ordered_rules():
+            evaluated = len(rows)
+            started_at = time.perf_counter()
+            if evaluated > 0:
+                # Solo se toman las filas que siguen en pie
+                mask = rule.evaluate({name: par_table[name][rows] for name in rule.columns})
+                rows = rows[mask]
+            seconds = time.perf_counter() - started_at
+            report.append((rule.name, evaluated, len(rows), seconds))
+            if evaluated > 0:
+                stats = self._stats[rule.name]
+                stats[0] += evaluated
+                stats[1] += len(rows)
+                stats[2] += seconds
+        self.last_report = report
+        return rows
+
+    def format_report(self) -> str:
+        """Retorna el reporte del ultimo uso, una linea por regla en el orden en que se evaluaron."""
+        return '\n'.join(
+            f'{name}: {passed}/{evaluated} ({seconds * 1000:.3f} ms)'
+            for name, evaluated, passed, seconds in self.last_report
+        )
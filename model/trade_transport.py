@@ -0,0 +1,193 @@
+import multiprocessing  # Para las tuberias entre procesos
+import struct  # Para los registros de tamaño fijo de los trades
+import threading  # Para enviar mensajes desde varios hilos de un mismo proceso
+import time  # Para el intervalo de envio de LatestValuesChannel
+from typing import Any, Dict, List  # Importación de módulos para definir tipos de datos
+
+# Bytes del símbolo en cada registro
+SYMBOL_SIZE = 16
+# Registro de un trade: símbolo (ascii), precio, tamaño, timestamp (nanosegundos epoch) y volumen acumulado
+TRADE_STRUCT = struct.Struct(f'<{SYMBOL_SIZE}sddqd')
+
+def pack_trade(par_symbol: str, par_price: float, par_size: float, par_timestamp: int, par_volume: float = 0.0) -> bytes:
+    """Convierte un trade en un registro de tamaño fijo, ValueError si el símbolo no cabe en SYMBOL_SIZE bytes."""
+    symbol = par_symbol.encode('ascii')
+    # struct recorta el símbolo sin avisar, el trade llegaria con otro símbolo
+    if len(symbol) > SYMBOL_SIZE:
+        raise ValueError(f"El símbolo {par_symbol} tiene mas de {SYMBOL_SIZE} bytes")
+    return TRADE_STRUCT.pack(symbol, par_price, par_size, par_timestamp, par_volume)
+
+def unpack_trade(par_record: bytes) -> Dict[str, Any]:
+    """Convierte un registro de tamaño fijo en un diccionario con las llaves symbol, price, size, timestamp y volume."""
+    symbol, price, size, timestamp, volume = TRADE_STRUCT.unpack(par_record)
+    return {'symbol': symbol.rstrip(b'\0').decode('ascii'), 'price': price, 'size': size, 'timestamp': timestamp, 'volume': volume}
+
+class TradeChannel:
+    """
+    Canal de un solo sentido entre dos procesos para trades. Cada trade viaja como un registro de tamaño fijo
+    por una tuberia del sistema operativo, sin pickle y sin pasar por el proceso servidor de un
+    multiprocessing.Manager. Debe tener un solo proceso (y un solo hilo) que escribe y uno que lee.
+    """
+    def __init__(self) -> None:
+        self._receiver, self._sender = multiprocessing.Pipe(duplex=False)
+
+    def put(self, par_symbol: str, par_price: float, par_size: float, par_timestamp: int, par_volume: float = 0.0) -> None:
+        """Envia un trade, el timestamp en nanosegundos epoch."""
+        self._sender.send_bytes(pack_trade(par_symbol, par_price, par_size, par_timestamp, par_volume))
+
+    def put_trade(self, par_trade: Dict[str, Any]) -> None:
+        """Envia un trade con el formato de unpack_trade."""
+        self.put(par_trade['symbol'], par_trade['price'], par_trade['size'], par_trade['timestamp'], par_trade.get('volume', 0.0))
+
+    def get(self) -> Dict[str, Any]:
+        """Espera el siguiente trade y lo retorna con el formato de unpack_trade."""
+        return unpack_trade(self._receiver.recv_bytes())
+
+class MessageChannel:
+    """
+    Canal de un solo sentido entre procesos para mensajes de control poco frecuentes (se serializan con pickle).
+    Varios hilos del proceso que escribe pueden enviar mensajes.
+    """
+    def __init__(self) -> None:
+        self._receiver, self._sender = multiprocessing.Pipe(duplex=False)
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        # El lock no se copia a otros procesos
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, par_state: dict) -> None:
+        self.__dict__.update(par_state)
+        self._lock = threading.Lock()
+
+    def send(self, par_message: Any) -> None:
+        """Envia un mensaje."""
+        with self._lock:
+            self._sender.send(par_message)
+
+    def get(self) -> Any:
+        """Espera el siguiente mensaje y lo retorna."""
+        return self._receiver.recv()
+
+    def drain(self) -> List[Any]:
+        """Retorna los mensajes pendientes sin esperar."""
+        messages = []
+        while self._receiver.poll():
+            messages.append(self._receiver.recv())
+        return messages
+
+class LatestValuesChannel:
+    """
+    Canal de un solo sentido entre procesos para valores que se actualizan muy seguido y de los que solo importa
+    el ultimo, por ejemplo el volumen del día de cada símbolo. put solo guarda el valor en un diccionario local;
+    un hilo del proceso que escribe envia los valores pendientes juntos en un mensaje cada par_interval_seconds.
+    Asi quien escribe nunca espera a la tuberia aunque quien lee solo la lea de vez en cuando.
+    """
+    def __init__(self, par_interval_seconds: float = 1.0) -> None:
+        """
+        Args:
+            par_interval_seconds (float, opcional): Segundos entre cada envio de los valores pendientes.
+        """
+        self._channel = MessageChannel()
+        self._interval = par_interval_seconds
+        # Ultimo valor de cada llave sin enviar, en el proceso que escribe
+        self._pending: Dict[Any, Any] = {}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread = None
+
+    def __getstate__(self) -> dict:
+        # El lock, el hilo y los valores pendientes no se copian a otros procesos
+        state = self.__dict__.copy()
+        del state['_lock']
+        state['_pending'] = {}
+        state['_thread'] = None
+        return state
+
+    def __setstate__(self, par_state: dict) -> None:
+        self.__dict__.update(par_state)
+        self._lock = threading.Lock()
+
+    def put(self, par_key: Any, par_value: Any) -> None:
+        """Guarda el ultimo valor de una llave, se envia en el siguiente intervalo."""
+        with self._lock:
+            self._pending[par_key] = par_value
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._flush_forever, daemon=True)
+                self._thread.start()
+
+    def _flush_forever(self) -> None:
+        # Si la tuberia esta llena solo este hilo espera, los valores nuevos se siguen uniendo en _pending
+        while True:
+            time.sleep(self._interval)
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if pending:
+                self._channel.send(pending)
+
+    def drain(self) -> Dict[Any, Any]:
+        """Retorna el ultimo valor de cada llave recibido desde la ultima lectura, sin esperar."""
+        values = {}
+        for pending in self._channel.drain():
+            values.update(pending)
+        return values
+
+class SharedSymbols:
+    """
+    Diccionario de símbolos suscritos que un proceso publica y otro consulta de forma local. Solo se envian los
+    cambios (símbolos eliminados y símbolos nuevos o modificados) al publicar, y quien consulta los aplica a su
+    copia con sync o con el hilo de listen, por lo que cada consulta es un acceso a un diccionario local.
+
+    Los cambios se deben leer aunque no se consulte ningun símbolo: si se acumulan sin leer la tuberia se llena
+    y publish queda bloqueado. Un proceso que solo consulta cuando llega un trade debe usar listen.
+    """
+    def __init__(self) -> None:
+        self._channel = MessageChannel()
+        # Ultimo diccionario publicado, en el proceso que publica
+        self._published: Dict[str, Any] = {}
+        # Copia local, en el proceso que consulta
+        self._local: Dict[str, Any] = {}
+
+    def publish(self, par_symbols: Dict[str, Any]) -> None:
+        """Publica el nuevo diccionario de símbolos, enviando solo las diferencias con el anterior."""
+        removed = [symbol for symbol in self._published if symbol not in par_symbols]
+        changed = {symbol: data for symbol, data in par_symbols.items() if self._published.get(symbol) != data}
+        if removed or changed:
+            self._channel.send((removed, changed))
+            self._published = dict(par_symbols)
+
+    def published_keys(self) -> List[str]:
+        """Retorna los símbolos publicados, en el proceso que publica."""
+        return list(self._published.keys())
+
+    def sync(self) -> None:
+        """Aplica a la copia local los cambios publicados pendientes, en el proceso que consulta."""
+        for removed, changed in self._channel.drain():
+            self._apply(removed, changed)
+
+    def listen(self) -> threading.Thread:
+        """
+        Inicia un hilo que aplica a la copia local los cambios publicados apenas llegan, en el proceso que consulta.
+        Con el hilo iniciado no se debe llamar a sync.
+
+        Returns:
+            threading.Thread: El hilo, termina con el proceso.
+        """
+        def run() -> None:
+            while True:
+                removed, changed = self._channel.get()
+                self._apply(removed, changed)
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def _apply(self, par_removed: List[str], par_changed: Dict[str, Any]) -> None:
+        # Cada operacion sobre el diccionario es atomica, get desde otro hilo ve el valor anterior o el nuevo
+        for symbol in par_removed:
+            self._local.pop(symbol, None)
+        self._local.update(par_changed)
+
+    def get(self, par_symbol: str) -> Any:
+        """Retorna los datos de un símbolo de la copia local, None si no esta suscrito."""
+        return self._local.get(par_symbol)
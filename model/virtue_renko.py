@@ -1,6 +1,7 @@
 import pandas as pd
 from pandas_datareader import data as pdr
 import mplfinance as fplt
+from model.renko_engine import find_first_ideal_bar
 
 
 class virtueRenko:
@@ -20,13 +21,11 @@ class virtueRenko:
         return df
         
     def _Find_first_ideal_brick(self):
-        # Buscar el primer valor que cumpla las condiciones de low y high
-        for index, row in self.dfRates.iterrows():
-            if (row['high'] - row['low']) >= self.brick_size * 2:
-                primer_valor = row
-                break
-        # Obtener el índice del primer valor que cumple las condiciones
-        indice = self.dfRates.index[self.dfRates['time'] == primer_valor['time']][0]
+        # Buscar el indice del primer valor que cumpla las condiciones de low y high
+        indice = find_first_ideal_bar(self.dfRates['high'].to_numpy(), self.dfRates['low'].to_numpy(), self.brick_size * 2)
+        # Si ningun valor cumple las condiciones no se podran construir ladrillos
+        if indice is None:
+            indice = len(self.dfRates)
         # Recortar el DataFrame df a partir del primer valor
         self.dfRates = self.dfRates.iloc[indice:]
         # Ajustar el 'open' del valor que cumple las condiciones para que empiece en en el brick size
@@ -0,0 +1,65 @@
+# Conversion de ordenes y posiciones de model/alpha_trader_pro/api.py antes de model/alpha_trader_pro/parser.py, se
+# usa como referencia en las pruebas de paridad y en la comparacion de tiempos. Los valores quedan como texto.
+import json
+import re
+from typing import Dict, List
+
+
+def convert_data_orders(par_data_byte_string: bytes) -> Dict[str, Dict[str, str]]:
+    """
+    Convierte la tabla de ordenes recibida de AlphaTraderPro en un diccionario anidado.
+
+    Args:
+        par_data_byte_string (bytes): El byte-string que contiene la información a convertir.
+
+    Returns:
+        dict: Un diccionario anidado con las claves y valores extraídos como cadenas de texto.
+    """
+    # Convertir el byte-string a un string y eliminar las comillas dobles exteriores
+    data_string = par_data_byte_string.decode('utf-8').replace('=', ':').replace('[', '{').replace(']', '}').replace(' ', '')
+    # Eliminar las comillas dobles del inicio y final del string (si están presentes)
+    data_string = data_string.strip('"')
+    # Reemplazar comas por puntos en los valores numéricos de la parte de "Price"
+    data_string = re.sub(r'Price:(\d+),(\d+)', r'Price:\1.\2', data_string)
+    # Agregar y quitar comillas para construir el diccionario
+    if data_string != '{}':
+        data_string = data_string.replace('{', '{"').replace('}', '"}').replace(',', '","').replace(':', '":"').replace('"{', '{').replace('}"', '}')
+    # Convertir la data a diccionario en python
+    data_dict = json.loads(data_string)
+    return data_dict
+
+
+def convert_data_positions(par_data_byte_string: bytes) -> List[Dict[str, str]]:
+    """
+    Convierte una lista de posiciones de AlphaTraderPro en una lista de diccionarios anidados.
+
+    Args:
+        par_data_byte_string (bytes): La lista de byte-strings que contiene la información de las posiciones a convertir.
+
+    Returns:
+        list: Una lista de diccionarios anidados con las claves y valores extraídos de los byte-strings.
+    """
+    data_list = par_data_byte_string.decode('utf-8')
+    data_list = json.loads(data_list)
+    positions_list = []
+    for data in data_list:
+        # Convertir el string y eliminar las comillas dobles exteriores
+        position = data.strip('"')
+        position = position.replace('=', ':').replace('[', '{').replace(']', '}').replace(' ', '')
+        # Reemplazar comas por puntos en los valores numéricos de la parte de "PosAvgPrice"
+        position = re.sub(r'PosAvgPrice:(-?\d+),(\d+)', r'PosAvgPrice:\1.\2', position)
+        # Reemplazar comas por puntos en los valores numéricos de la parte de "LastPrice"
+        position = re.sub(r'LastPrice:(-?\d+),(\d+)', r'LastPrice:\1.\2', position)
+        # Reemplazar comas por puntos en los valores numéricos de la parte de "Unrealized"
+        position = re.sub(r'Unrealized:(-?\d+),(\d+)', r'Unrealized:\1.\2', position)
+        # Reemplazar comas por puntos en los valores numéricos de la parte de "NetPnl"
+        position = re.sub(r'NetPnl:(-?\d+),(\d+)', r'NetPnl:\1.\2', position)
+        # Reemplazar comas por puntos en los valores numéricos de la parte de "GrossPnl"
+        position = re.sub(r'GrossPnl:(-?\d+),(\d+)', r'GrossPnl:\1.\2', position)
+        # Agregar y quitar comillas para construir el diccionario
+        position = position.replace('{', '{"').replace('}', '"}').replace(',', '","').replace(':', '":"')
+        # Convertir la data a diccionario en python
+        position = json.loads(position)
+        positions_list.append(position)
+
+    return positions_list
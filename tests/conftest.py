@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+# Las pruebas importan los modulos desde la raiz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def pivot_controller(monkeypatch):
+    """Modulo controller.pivot_controller, se omite la prueba si faltan sus dependencias."""
+    for module in ('alpaca', 'holidays', 'bs4', 'jinja2', 'dotenv'):
+        pytest.importorskip(module)
+    # pivot_controller agrega rutas (y None) a sys.path al importarse, se restaura al terminar la prueba.
+    # Los modelos de alpaca se cargan antes porque pydantic recorre sys.path al crearlos
+    import model.alpaca.api  # noqa: F401
+    monkeypatch.setattr(sys, 'path', list(sys.path))
+    from controller import pivot_controller
+    return pivot_controller
@@ -0,0 +1,127 @@
+# Filtros de pivots antes de la agrupacion por corridas de precios de model/alpaca/find_pivots.py, se usan como
+# referencia en las pruebas de paridad. Son los filtros originales con los pivots en arreglos de NumPy y el
+# orden estable por precio (la version original usaba np.argsort sin orden estable, ver _sort_pivots).
+from typing import List, Tuple
+import numpy as np
+
+from model.alpaca.find_pivots import DAY_NS, PIVOT_DTYPE
+
+
+def filtered_strong_pivots(par_array_pivots: np.ndarray, par_property_column: str, par_slip_ratio: float) -> np.ndarray:
+    """
+    Filtra y retorna los pivots fuertes encontrados.
+
+    Args:
+        par_array_pivots (np.ndarray): Array de pivots (CANDIDATE_DTYPE).
+        par_property_column (str): Columna que contiene el precio. 'high' para picos, 'low' para valles.
+        par_slip_ratio (float): Rango mínimo de precio que debe haber entre pivots.
+
+    Returns:
+        np.ndarray: Pivots fuertes encontrados (PIVOT_DTYPE), del mas reciente al mas antiguo.
+    """  
+    prices = par_array_pivots[par_property_column]
+    # Ordenar el array basado en par_property_column
+    if par_property_column == 'high':
+        # Ordena de menor a mayor
+        order = np.argsort(prices, kind='stable')
+    else:
+        # Ordena de mayor a menor
+        order = np.argsort(-prices, kind='stable')
+
+    filtered_pivots: List[Tuple[int, float]] = []
+    last_remove_pivot: Tuple[int, float] = None
+
+    for current_pivot in zip(par_array_pivots['timestamp'][order].tolist(), prices[order].tolist()):
+        if filtered_pivots:
+            last_pivot = filtered_pivots[-1]
+            price_last_pivot = last_pivot[1]
+            price_current_pivot = current_pivot[1]
+            price_difference = abs(price_last_pivot - price_current_pivot)
+            if price_difference < par_slip_ratio:
+                date_difference_in_days = (current_pivot[0] - last_pivot[0]) // DAY_NS
+                if -365 < date_difference_in_days :
+                    if last_remove_pivot is not None:
+                        filtered_pivots.pop()
+                        price_last_remove_pivot = last_remove_pivot[1]
+                        price_difference = abs(price_last_remove_pivot - price_current_pivot)
+                        if price_difference > par_slip_ratio:
+                            filtered_pivots.append(last_remove_pivot)
+                            last_remove_pivot = None
+                    else:
+                        last_remove_pivot = filtered_pivots.pop()
+                        
+                    filtered_pivots.append(current_pivot)                                
+            else:
+                last_remove_pivot = None
+                filtered_pivots.append(current_pivot)
+        else:
+            filtered_pivots.append(current_pivot) 
+
+    # Se ordenan los encontrados del mas reciente al mas antiguo
+    filtered_pivots = np.array(filtered_pivots, dtype=PIVOT_DTYPE)
+    return filtered_pivots[np.argsort(-filtered_pivots['timestamp'], kind='stable')]
+
+def filtered_weak_pivots(par_array_pivots: np.ndarray, par_array_strongs: np.ndarray, par_property_column: str, par_slip_ratio: float) -> np.ndarray:
+    """
+    Filtra y retorna los pivots débiles encontrados.
+
+    Args:
+        par_array_pivots (np.ndarray): Array de pivots (CANDIDATE_DTYPE).
+        par_array_strongs (np.ndarray): Array de los pivots fuertes encontrados (PIVOT_DTYPE).
+        par_property_column (str): Columna que contiene el precio. 'high' para picos, 'low' para valles.
+        par_slip_ratio (float): Rango mínimo de precio que debe haber entre pivots.
+
+    Returns:
+        np.ndarray: Pivots débiles encontrados (PIVOT_DTYPE), del mas reciente al mas antiguo.
+    """
+    prices = par_array_pivots[par_property_column]
+    # Ordenar el array basado en par_property_column
+    if par_property_column == 'high':
+        # Ordena de mayor a menor
+        order = np.argsort(-prices, kind='stable')
+    else:
+        # Ordena de menor a mayor
+        order = np.argsort(prices, kind='stable')
+
+    # Lista para almacenar los picos o valles débiles filtrados
+    filtered_auxiliary: List[Tuple[int, float]] = []
+    filtered_pivots: List[Tuple[int, float]] = []
+    repeat = 0
+
+    for current_pivot in zip(par_array_pivots['timestamp'][order].tolist(), prices[order].tolist()):
+        if filtered_auxiliary:
+            last_pivot = filtered_auxiliary[-1]
+            price_last_pivot = last_pivot[1]
+            price_current_pivot = current_pivot[1]
+            price_difference = abs(price_last_pivot - price_current_pivot)
+
+            # Comprobar si el pico o valle actual está dentro del rango de deslizamiento
+            if price_difference < par_slip_ratio:
+                repeat += 1
+                date_difference_in_days = (current_pivot[0] - last_pivot[0]) // DAY_NS
+
+                # Comprobar si la diferencia de días entre los pivotes es menor a 365
+                if -365 < date_difference_in_days and filtered_auxiliary:
+                    filtered_auxiliary.remove(last_pivot)
+                    filtered_auxiliary.append(current_pivot)
+            else:
+                if repeat > 2:
+                    # Comprobar si el pico o valle débil está cerca del pico o valle fuerte, si no hay fuertes se toma como cercano
+                    if len(par_array_strongs) == 0 or np.any(np.abs(price_last_pivot - par_array_strongs['price']) < par_slip_ratio):
+                        # Eliminar el pico o valle de la lista de picos o valles débiles
+                        filtered_auxiliary.remove(last_pivot)
+                        break
+                    else:
+                        filtered_pivots.append(last_pivot)                              
+                else:
+                    filtered_auxiliary.remove(last_pivot)
+        else:
+            repeat = 0
+            filtered_auxiliary.append(current_pivot)
+
+    if filtered_pivots:
+        print('Pivots debiles encontrados')
+        
+    # Se ordenan los encontrados del mas reciente al mas antiguo
+    filtered_pivots = np.array(filtered_pivots, dtype=PIVOT_DTYPE)
+    return filtered_pivots[np.argsort(-filtered_pivots['timestamp'], kind='stable')]
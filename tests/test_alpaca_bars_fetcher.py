@@ -0,0 +1,145 @@
+import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import pytz
+
+pytest.importorskip('alpaca')
+pytest.importorskip('holidays')
+
+from alpaca.data.enums import DataFeed
+from alpaca.data.timeframe import TimeFrame
+from model.alpaca.api import AlpacaBarsFetcher
+
+START = datetime(2023, 1, 1, tzinfo=pytz.utc)
+SYMBOLS = ['AAA', 'BBB', 'CCC']
+# Barras por pagina del servidor, menor que el limite para forzar varias paginas
+PAGE_SIZE = 7
+
+
+def _iso(par_date):
+    return par_date.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _server_bars():
+    # Una barra diaria por simbolo a medianoche utc, por lo que caen justo en los limites de los lotes
+    return {
+        symbol: [
+            {'t': _iso(START + timedelta(days=day)), 'o': day, 'h': day + 1, 'l': day - 1, 'c': day + 0.5, 'v': 100 * index + day}
+            for day in range(100)
+        ]
+        for index, symbol in enumerate(SYMBOLS)
+    }
+
+
+class _FakeServer:
+    # Servidor local con la paginacion de /v2/stocks/bars, el fin inclusivo de alpaca y un 429 en la primera solicitud
+    def __init__(self):
+        self.bars = _server_bars()
+        self.requests = []
+        self.lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+                with fake.lock:
+                    fake.requests.append(params)
+                    first = len(fake.requests) == 1
+                if first:
+                    self._send(429, {'message': 'too many requests'})
+                    return
+                # Las fechas ISO en utc se comparan como texto
+                selected = [
+                    (symbol, bar)
+                    for symbol in params['symbols'].split(',')
+                    for bar in fake.bars[symbol]
+                    if params['start'] <= bar['t'] <= params['end']
+                ]
+                offset = int(params.get('page_token', 0))
+                page = selected[offset:offset + PAGE_SIZE]
+                body = {'bars': {}, 'next_page_token': str(offset + PAGE_SIZE) if offset + PAGE_SIZE < len(selected) else None}
+                for symbol, bar in page:
+                    body['bars'].setdefault(symbol, []).append(bar)
+                self._send(200, body)
+
+            def _send(self, par_status, par_body):
+                data = json.dumps(par_body).encode()
+                self.send_response(par_status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def fake_server():
+    server = _FakeServer()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+def test_bars_joined_without_duplicates_at_chunk_limits(fake_server):
+    fetcher = AlpacaBarsFetcher('key', 'secret', DataFeed.IEX, base_url=fake_server.url, requests_per_minute=6000, symbols_per_request=2, days_per_request=30)
+    raw_bars = fetcher.get_bars(TimeFrame.Day, START, START + timedelta(days=99), SYMBOLS)
+
+    # Todas las barras una sola vez y en orden, aunque las barras caen en los limites de los lotes
+    assert raw_bars == fake_server.bars
+    # 4 rangos de fechas x 2 lotes de simbolos, con varias paginas cada uno y el 429 reintentado
+    assert len({(params['symbols'], params['start']) for params in fake_server.requests}) == 8
+    assert any('page_token' in params for params in fake_server.requests)
+    assert fake_server.requests.count(fake_server.requests[0]) == 2
+
+
+def test_chunk_end_is_before_next_start(fake_server):
+    fetcher = AlpacaBarsFetcher('key', 'secret', DataFeed.IEX, base_url=fake_server.url, requests_per_minute=6000, days_per_request=30)
+    fetcher.get_bars(TimeFrame.Day, START, START + timedelta(days=99), SYMBOLS)
+
+    ranges = sorted({(params['start'], params['end']) for params in fake_server.requests})
+    for (_, end), (next_start, _) in zip(ranges, ranges[1:]):
+        assert end < next_start
+    # El ultimo lote incluye la fecha de fin pedida
+    assert ranges[-1][1] == _iso(START + timedelta(days=99))
+
+
+def test_sessions_are_reused_between_calls(fake_server, monkeypatch):
+    import model.alpaca.api as alpaca_api
+    created = []
+
+    class CountingSession(alpaca_api.requests.Session):
+        def __init__(self):
+            super().__init__()
+            created.append(self)
+
+    monkeypatch.setattr(alpaca_api.requests, 'Session', CountingSession)
+    fetcher = AlpacaBarsFetcher('key', 'secret', DataFeed.IEX, base_url=fake_server.url, requests_per_minute=6000, max_concurrent_requests=2, symbols_per_request=1, days_per_request=30)
+    for _ in range(2):
+        assert fetcher.get_bars(TimeFrame.Day, START, START + timedelta(days=99), SYMBOLS) == fake_server.bars
+    # Cada llamada usa un bucle de eventos y un executor nuevos, pero las sesiones salen del pool del fetcher
+    assert len(created) <= fetcher.max_concurrent_requests
+    assert all(session in created for session in fetcher._sessions)
+
+
+def test_fetcher_can_be_pickled(fake_server):
+    # PivotController.start pasa metodos ligados a Process, que con spawn copian el fetcher de la api de alpaca
+    import pickle
+    fetcher = AlpacaBarsFetcher('key', 'secret', DataFeed.IEX, base_url=fake_server.url, requests_per_minute=6000)
+    fetcher.get_bars(TimeFrame.Day, START, START + timedelta(days=9), SYMBOLS)
+    assert len(fetcher._sessions) > 0
+
+    copy = pickle.loads(pickle.dumps(fetcher))
+    assert copy._sessions == [] and copy._headers == fetcher._headers
+    assert copy.get_bars(TimeFrame.Day, START, START + timedelta(days=9), SYMBOLS) == {
+        symbol: bars[:10] for symbol, bars in fake_server.bars.items()
+    }
@@ -0,0 +1,82 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+pytest.importorskip('alpaca')
+pytest.importorskip('holidays')
+
+from alpaca.data.enums import DataFeed
+from model.alpaca.api import SNAPSHOT_DTYPE, AlpacaApi, AlpacaBarsFetcher, _raw_snapshots_to_records
+
+# Respuesta de /v2/stocks/snapshots: un símbolo completo, uno sin dailyBar ni latestTrade y uno sin snapshot
+with open(os.path.join(os.path.dirname(__file__), 'fixtures', 'alpaca_snapshots.json')) as file:
+    RAW_SNAPSHOTS = json.load(file)
+
+
+def _ns(par_date):
+    return int(np.datetime64(par_date, 'ns').view(np.int64))
+
+
+def _assert_fixture_records(par_records):
+    assert par_records.dtype == SNAPSHOT_DTYPE
+    assert par_records['symbol'].tolist() == ['AAPL', 'NEWCO', 'HALTED']
+    aapl, newco, halted = par_records
+
+    assert aapl['trade_timestamp'] == _ns('2023-09-08T19:59:59.987654321')
+    assert aapl['price'] == 178.18
+    assert (aapl['minute_timestamp'], aapl['minute_close'], aapl['minute_volume']) == (_ns('2023-09-08T19:59:00'), 178.16, 21530)
+    assert (aapl['day_timestamp'], aapl['day_close'], aapl['day_volume']) == (_ns('2023-09-08T04:00:00'), 178.16, 1234567)
+    assert (aapl['previous_day_close'], aapl['previous_day_volume']) == (177.55, 2345678)
+
+    # Sin latestTrade ni dailyBar: timestamps en 0 y valores en NaN, las demas partes se conservan
+    assert newco['trade_timestamp'] == 0 and np.isnan(newco['price'])
+    assert newco['day_timestamp'] == 0 and np.isnan(newco['day_close']) and np.isnan(newco['day_volume'])
+    assert (newco['minute_timestamp'], newco['minute_close'], newco['minute_volume']) == (_ns('2023-09-08T15:31:00'), 12.3, 100)
+    assert (newco['previous_day_close'], newco['previous_day_volume']) == (12.2, 5400)
+
+    # Sin snapshot: todo vacio
+    for name in SNAPSHOT_DTYPE.names[1:]:
+        if name.endswith('timestamp'):
+            assert halted[name] == 0
+        else:
+            assert np.isnan(halted[name])
+
+
+def test_raw_snapshots_to_records():
+    _assert_fixture_records(_raw_snapshots_to_records(RAW_SNAPSHOTS))
+
+
+def test_raw_snapshots_to_records_empty():
+    records = _raw_snapshots_to_records({})
+    assert records.dtype == SNAPSHOT_DTYPE and len(records) == 0
+
+
+@pytest.mark.parametrize('par_wrapped', [False, True], ids=['simbolos', 'llave_snapshots'])
+def test_get_snapshots_columns(par_wrapped):
+    # Algunas versiones de la api agrupan los snapshots en la llave 'snapshots'
+    body = json.dumps({'snapshots': RAW_SNAPSHOTS} if par_wrapped else RAW_SNAPSHOTS).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        api = AlpacaApi.__new__(AlpacaApi)
+        api._bars_fetcher = AlpacaBarsFetcher('key', 'secret', DataFeed.IEX, base_url=f'http://127.0.0.1:{server.server_address[1]}')
+        _assert_fixture_records(api.get_snapshots_columns(['AAPL', 'NEWCO', 'HALTED']))
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,160 @@
+import http.client
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from model.alpha_trader_pro.api import AlphaTraderProClient
+
+SEND_ORDER = '/sendOrder?symbol=AAPL&qty=10&exchange=NSDQ&type=Market&side=Buy&price=0'
+
+
+class _FakeAlphaTraderPro:
+    # Servidor local con las rutas de AlphaTraderPro en localhost:5005 y conexiones keep-alive (HTTP/1.1)
+    def __init__(self):
+        self.requests = []
+        self.connections = []
+        # Respuestas 503 que faltan por enviar en /flaky
+        self.failures = 0
+        # Cierra la conexion sin responder a la siguiente solicitud, despues de recibirla
+        self.drop_next_reply = False
+        self.lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with fake.lock:
+                    fake.connections.append(self.connection)
+
+            def do_GET(self):
+                with fake.lock:
+                    fake.requests.append((self.path, self.client_address))
+                    drop = fake.drop_next_reply
+                    fake.drop_next_reply = False
+                    failing = self.path == '/flaky' and fake.failures > 0
+                    if failing:
+                        fake.failures -= 1
+                if drop:
+                    self.close_connection = True
+                    self.connection.shutdown(socket.SHUT_RDWR)
+                    return
+                if failing:
+                    self._send(503, b'busy')
+                elif self.path == '/orders':
+                    self._send(200, b'OrderID: 1, Symbol: AAPL, Qty: 10, Status: Open')
+                else:
+                    self._send(200, b'ok')
+
+            def _send(self, par_status, par_body):
+                self.send_response(par_status)
+                self.send_header('Content-Length', str(len(par_body)))
+                self.end_headers()
+                self.wfile.write(par_body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def paths(self):
+        with self.lock:
+            return [path for path, _ in self.requests]
+
+    def close_idle_connections(self):
+        # Cierra las conexiones abiertas como lo hace el servidor al vencer el keep-alive
+        with self.lock:
+            connections, self.connections = self.connections, []
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        # El cierre llega al cliente de forma asincrona
+        time.sleep(0.05)
+
+
+@pytest.fixture
+def fake_server():
+    server = _FakeAlphaTraderPro()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+def test_requests_reuse_one_connection(fake_server):
+    client = AlphaTraderProClient(fake_server.url)
+    for _ in range(20):
+        assert client.get('/orders').startswith(b'OrderID')
+    assert len({connection for _, connection in fake_server.requests}) == 1
+
+
+def test_stale_keep_alive_connection_does_not_duplicate_order(fake_server):
+    client = AlphaTraderProClient(fake_server.url)
+    client.get('/connection')
+    fake_server.close_idle_connections()
+
+    # La conexion inactiva cerrada se descarta y la orden se envia una sola vez por una conexion nueva
+    assert client.get(SEND_ORDER, par_idempotent=False) == b'ok'
+    assert fake_server.paths().count(SEND_ORDER) == 1
+    assert len({connection for _, connection in fake_server.requests}) == 2
+
+
+def test_order_received_without_reply_is_not_repeated(fake_server):
+    client = AlphaTraderProClient(fake_server.url, par_backoff=0.01)
+    client.get('/connection')
+    fake_server.drop_next_reply = True
+
+    # El servidor recibio la orden, repetirla podria duplicar la posicion
+    with pytest.raises((ConnectionError, http.client.HTTPException)):
+        client.get(SEND_ORDER, par_idempotent=False)
+    assert fake_server.paths().count(SEND_ORDER) == 1
+
+    # Una consulta idempotente si se repite
+    fake_server.drop_next_reply = True
+    assert client.get('/orders').startswith(b'OrderID')
+    assert fake_server.paths().count('/orders') == 2
+
+
+def test_503_is_retried_with_backoff(fake_server):
+    client = AlphaTraderProClient(fake_server.url, par_backoff=0.05)
+    fake_server.failures = 2
+    started_at = time.monotonic()
+    assert client.get('/flaky') == b'ok'
+    # Esperas de 0.05 y 0.1 segundos antes de cada reintento
+    assert time.monotonic() - started_at >= 0.15
+    assert fake_server.paths() == ['/flaky'] * 3
+
+    # Se agotan los intentos
+    fake_server.failures = 3
+    with pytest.raises(http.client.HTTPException, match='503'):
+        client.get('/flaky')
+    assert fake_server.paths().count('/flaky') == 6
+
+
+def test_503_on_order_is_not_retried(fake_server):
+    client = AlphaTraderProClient(fake_server.url, par_backoff=0.01)
+    fake_server.failures = 1
+    with pytest.raises(http.client.HTTPException, match='503'):
+        client.get('/flaky', par_idempotent=False)
+    assert fake_server.paths() == ['/flaky']
+
+
+def test_refused_connection_is_retried_then_raises():
+    # Puerto sin servidor: la solicitud nunca llega, por lo que tambien se reintentan las ordenes
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    client = AlphaTraderProClient(f'http://127.0.0.1:{port}', par_backoff=0.01)
+    started_at = time.monotonic()
+    with pytest.raises(ConnectionRefusedError):
+        client.get(SEND_ORDER, par_idempotent=False)
+    assert time.monotonic() - started_at >= 0.03
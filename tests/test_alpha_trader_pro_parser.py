@@ -0,0 +1,114 @@
+import json
+import os
+import random
+import timeit
+
+import pytest
+
+from model.alpha_trader_pro.parser import FLOAT_FIELDS, INT_FIELDS, parse_orders, parse_positions
+from tests import alpha_trader_pro_reference as reference
+
+
+def _number(par_random, par_negative=True):
+    # Numero con coma decimal como lo envia AlphaTraderPro, a veces sin decimales
+    value = par_random.randint(0, 99999) / 100 * (par_random.choice([-1, 1]) if par_negative else 1)
+    return (f'{value:.2f}' if par_random.random() < 0.8 else str(int(value))).replace('.', ',')
+
+
+def _order(par_random):
+    return {
+        'OrderID': f'{par_random.getrandbits(32):08x}', 'Symbol': par_random.choice(['AAPL', 'MSFT', 'BRK.B', 'X']),
+        'Qty': str(par_random.randint(1, 500)), 'OrderType': par_random.choice(['Market', 'Limit']),
+        'Price': _number(par_random, False), 'Status': par_random.choice(['Open', 'Filled', 'Canceled']),
+    }
+
+
+def _position(par_random):
+    return {
+        'Symbol': par_random.choice(['AAPL', 'MSFT', 'X']), 'Qty': str(par_random.randint(-500, 500)),
+        'Side': par_random.choice(['Buy', 'Sell']), 'PosAvgPrice': _number(par_random), 'LastPrice': _number(par_random),
+        'Unrealized': _number(par_random), 'NetPnl': _number(par_random), 'GrossPnl': _number(par_random),
+    }
+
+
+def _record(par_values):
+    return '[' + ', '.join(f'{key}={value}' for key, value in par_values.items()) + ']'
+
+
+def _orders_table(par_orders):
+    return ('"[' + ', '.join(f'{index}={_record(order)}' for index, order in enumerate(par_orders)) + ']"').encode()
+
+
+def _positions_list(par_random, par_positions):
+    # Algunas posiciones llegan con comillas dentro del texto json
+    return json.dumps([f'"{_record(position)}"' if par_random.random() < 0.5 else _record(position) for position in par_positions]).encode()
+
+
+def _typed(par_values):
+    # Valores de texto de la conversion anterior con los tipos del parser
+    typed = {}
+    for key, value in par_values.items():
+        if key in INT_FIELDS:
+            typed[key] = int(value)
+        elif key in FLOAT_FIELDS:
+            typed[key] = float(value.replace(',', '.'))
+        else:
+            typed[key] = value
+    return typed
+
+
+def test_orders_same_as_previous_converter():
+    rng = random.Random(14)
+    for _ in range(3000):
+        orders = [_order(rng) for _ in range(rng.randint(0, 6))]
+        data = _orders_table(orders)
+        parsed = parse_orders(data)
+        assert parsed == {str(index): _typed(order) for index, order in enumerate(orders)}
+        assert parsed == {key: _typed(order) for key, order in reference.convert_data_orders(data).items()}
+
+
+def test_positions_same_as_previous_converter():
+    rng = random.Random(15)
+    for _ in range(3000):
+        positions = [_position(rng) for _ in range(rng.randint(0, 6))]
+        data = _positions_list(rng, positions)
+        parsed = parse_positions(data)
+        assert parsed == [_typed(position) for position in positions]
+        assert parsed == [_typed(position) for position in reference.convert_data_positions(data)]
+
+
+def test_commas_inside_text_values():
+    # La conversion anterior separaba el texto en campos distintos
+    orders = parse_orders(b'"[0=[OrderID=a1, Symbol=AAPL, Note=hola, mundo, Qty=5, Price=1,25]]"')
+    assert orders == {'0': {'OrderID': 'a1', 'Symbol': 'AAPL', 'Note': 'hola, mundo', 'Qty': 5, 'Price': 1.25}}
+    assert parse_orders(b'"[]"') == {}
+    assert parse_positions(b'[]') == []
+
+
+def test_invalid_numbers_stay_as_text():
+    orders = parse_orders(b'"[0=[Qty=abc, Price=1,2,3]]"')
+    assert orders == {'0': {'Qty': 'abc', 'Price': '1,2,3'}}
+
+
+def test_garbage_does_not_raise():
+    rng = random.Random(16)
+    for _ in range(20000):
+        data = ''.join(rng.choice('[]=, ,.-0123456789AbQty"') for _ in range(rng.randint(0, 40))).encode()
+        parse_orders(data)
+
+
+@pytest.mark.skipif(os.getenv('BENCHMARKS') != '1', reason='benchmark, se ejecuta con BENCHMARKS=1')
+def test_benchmark_against_previous_converter():
+    # Solo muestra los tiempos, no decide si la prueba pasa: depende de la maquina y de su carga.
+    # La conversion anterior de las ordenes hace todo en C (str.replace y json.loads) y no convierte los tipos, por
+    # lo que parse_orders tarda lo mismo o hasta cerca de 1.6 veces mas; parse_positions es mas rapido
+    rng = random.Random(17)
+    orders = _orders_table([_order(rng) for _ in range(2000)])
+    positions = _positions_list(rng, [_position(rng) for _ in range(500)])
+
+    def best(par_function, par_data):
+        return min(timeit.repeat(lambda: par_function(par_data), number=5, repeat=5)) / 5 * 1000
+
+    for name, function, previous, data in (('ordenes', parse_orders, reference.convert_data_orders, orders),
+                                           ('posiciones', parse_positions, reference.convert_data_positions, positions)):
+        print(f"{name}: {best(function, data):.2f} ms, anterior {best(previous, data):.2f} ms")
@@ -0,0 +1,185 @@
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+import pytz
+
+from model.alpaca.bar_cache import BAR_DTYPE, BarCache
+
+KEY = ('1Day', 'split', 'iex')
+DAY = 86_400_000_000_000
+START = datetime(2023, 1, 2, tzinfo=pytz.utc)
+
+
+def _bars(par_first_day, par_last_day, par_offset=0.0):
+    # Una barra por dia, timestamps en dias enteros desde el epoch (en nanosegundos)
+    days = np.arange(par_first_day, par_last_day)
+    bars = np.zeros(len(days), dtype=BAR_DTYPE)
+    bars['timestamp'] = days * DAY
+    bars['close'] = days + par_offset
+    return bars
+
+
+def _stored(par_cache):
+    data_path, _ = par_cache._paths('AAA', KEY)
+    return np.fromfile(data_path, dtype=BAR_DTYPE)
+
+
+def test_write_appends_continuation(tmp_path):
+    cache = BarCache(str(tmp_path))
+    cache.write('AAA', KEY, _bars(0, 10), 0, 10 * DAY)
+    data_path, _ = cache._paths('AAA', KEY)
+    size = os.path.getsize(data_path)
+    # El rango nuevo se solapa con el cubierto, solo se agregan las barras desde el fin cubierto
+    cache.write('AAA', KEY, _bars(5, 20, par_offset=0.5), 5 * DAY, 20 * DAY)
+
+    assert cache.coverage('AAA', KEY) == (0, 20 * DAY)
+    assert os.path.getsize(data_path) == size + 10 * BAR_DTYPE.itemsize
+    stored = _stored(cache)
+    assert stored['timestamp'].tolist() == (np.arange(0, 20) * DAY).tolist()
+    # Las barras ya guardadas no se reescriben
+    assert stored['close'][:10].tolist() == list(range(10))
+
+
+def test_write_extends_backwards(tmp_path):
+    cache = BarCache(str(tmp_path))
+    cache.write('AAA', KEY, _bars(10, 20), 10 * DAY, 20 * DAY)
+    # Barras anteriores y posteriores al rango cubierto en la misma escritura
+    cache.write('AAA', KEY, _bars(0, 25, par_offset=0.5), 0, 25 * DAY)
+
+    assert cache.coverage('AAA', KEY) == (0, 25 * DAY)
+    stored = _stored(cache)
+    assert stored['timestamp'].tolist() == (np.arange(0, 25) * DAY).tolist()
+    assert stored['close'].tolist() == [day + 0.5 for day in range(10)] + list(range(10, 20)) + [day + 0.5 for day in range(20, 25)]
+
+
+@pytest.mark.parametrize('par_first_day,par_last_day', [(30, 40), (-20, -5)], ids=['despues', 'antes'])
+def test_write_replaces_disjoint_range(tmp_path, par_first_day, par_last_day):
+    cache = BarCache(str(tmp_path))
+    cache.write('AAA', KEY, _bars(0, 10), 0, 10 * DAY)
+    # Un hueco entre los rangos no se puede representar con un solo rango cubierto
+    cache.write('AAA', KEY, _bars(par_first_day, par_last_day), par_first_day * DAY, par_last_day * DAY)
+
+    assert cache.coverage('AAA', KEY) == (par_first_day * DAY, par_last_day * DAY)
+    assert _stored(cache)['timestamp'].tolist() == (np.arange(par_first_day, par_last_day) * DAY).tolist()
+
+
+def test_write_inside_coverage_is_ignored(tmp_path):
+    cache = BarCache(str(tmp_path))
+    cache.write('AAA', KEY, _bars(0, 10), 0, 10 * DAY)
+    cache.write('AAA', KEY, _bars(2, 8, par_offset=0.5), 2 * DAY, 8 * DAY)
+
+    assert cache.coverage('AAA', KEY) == (0, 10 * DAY)
+    assert _stored(cache)['close'].tolist() == list(range(10))
+    assert cache.missing_ranges('AAA', KEY, 2 * DAY, 8 * DAY) == []
+    assert cache.missing_ranges('AAA', KEY, -3 * DAY, 12 * DAY) == [(-3 * DAY, 0), (10 * DAY, 12 * DAY)]
+    assert cache.read('AAA', KEY, 3 * DAY, 5 * DAY)['close'].tolist() == [3, 4]
+
+
+class _FakeFetcher:
+    # Barras diarias a medianoche utc con el fin inclusivo de alpaca. La barra que aun no termina cambia en cada consulta
+    def __init__(self):
+        self.requests = []
+
+    def get_bars(self, par_time_frame, par_start, par_end, par_symbols_assets):
+        self.requests.append((par_start, par_end, list(par_symbols_assets)))
+        unfinished_start = datetime.now(pytz.utc) - timedelta(days=1)
+        day = par_start.replace(hour=0, minute=0, second=0, microsecond=0)
+        if day < par_start:
+            day += timedelta(days=1)
+        bars = []
+        while day <= par_end:
+            close = (day - START).days + (len(self.requests) if day > unfinished_start else 0) / 100
+            bars.append({'t': day.strftime('%Y-%m-%dT%H:%M:%SZ'), 'o': close, 'h': close, 'l': close, 'c': close, 'v': 100})
+            day += timedelta(days=1)
+        return {symbol: bars for symbol in par_symbols_assets}
+
+
+@pytest.fixture
+def api_factory(tmp_path):
+    pytest.importorskip('alpaca')
+    pytest.importorskip('holidays')
+    from model.alpaca.api import AlpacaApi
+    from alpaca.data.enums import DataFeed
+
+    def factory(par_cached):
+        api = AlpacaApi.__new__(AlpacaApi)
+        api.data_feed = DataFeed.IEX
+        api._bar_cache = BarCache(str(tmp_path)) if par_cached else None
+        api._bars_fetcher = _FakeFetcher()
+        return api
+    return factory
+
+
+def _timestamps(par_records):
+    return par_records['timestamp'].view('datetime64[ns]').astype('datetime64[us]').astype(datetime).tolist()
+
+
+def _ns(par_date):
+    return int((par_date - datetime(1970, 1, 1, tzinfo=pytz.utc)) / timedelta(microseconds=1)) * 1000
+
+
+def test_warm_cache_fetches_only_new_days(api_factory):
+    from alpaca.data.timeframe import TimeFrame
+    api = api_factory(True)
+    api.get_historical_assets_columns_between(TimeFrame.Day, START, START + timedelta(days=9), ['AAA', 'BBB'])
+    records = api.get_historical_assets_columns_between(TimeFrame.Day, START, START + timedelta(days=14), ['AAA', 'BBB'])
+
+    # La segunda consulta solo pide los dias despues del rango cubierto, para todos los simbolos a la vez
+    (first_start, first_end, _), (delta_start, delta_end, symbols) = api._bars_fetcher.requests
+    assert (first_start, first_end) == (START, START + timedelta(days=9))
+    assert START + timedelta(days=9) <= delta_start < START + timedelta(days=10)
+    assert delta_end == START + timedelta(days=14) and symbols == ['AAA', 'BBB']
+    assert _timestamps(records['AAA']) == [(START + timedelta(days=day)).replace(tzinfo=None) for day in range(15)]
+
+
+def test_warm_cache_extends_backwards(api_factory):
+    from alpaca.data.timeframe import TimeFrame
+    api = api_factory(True)
+    api.get_historical_assets_columns_between(TimeFrame.Day, START + timedelta(days=10), START + timedelta(days=19), ['AAA'])
+    records = api.get_historical_assets_columns_between(TimeFrame.Day, START, START + timedelta(days=19), ['AAA'])
+
+    assert api._bars_fetcher.requests[1][:2] == (START, START + timedelta(days=10))
+    assert records['AAA']['close'].tolist() == list(range(20))
+    assert api._bar_cache.coverage('AAA', ('1Day', 'split', 'iex'))[0] == records['AAA']['timestamp'][0]
+
+
+def test_end_is_inclusive_with_and_without_cache(api_factory):
+    from alpaca.data.timeframe import TimeFrame
+    # La fecha de fin cae justo en una barra
+    end = START + timedelta(days=5)
+    uncached = api_factory(False).get_historical_assets_columns_between(TimeFrame.Day, START, end, ['AAA'])
+    cached_api = api_factory(True)
+    cold = cached_api.get_historical_assets_columns_between(TimeFrame.Day, START, end, ['AAA'])
+    warm = cached_api.get_historical_assets_columns_between(TimeFrame.Day, START, end, ['AAA'])
+
+    assert _timestamps(uncached['AAA'])[-1] == end.replace(tzinfo=None)
+    for records in (cold, warm):
+        assert records['AAA']['timestamp'].tolist() == uncached['AAA']['timestamp'].tolist()
+        assert records['AAA']['close'].tolist() == uncached['AAA']['close'].tolist()
+    assert len(cached_api._bars_fetcher.requests) == 1
+
+
+def test_unfinished_bars_are_not_stored(api_factory):
+    from alpaca.data.timeframe import TimeFrame
+    api = api_factory(True)
+    now = datetime.now(pytz.utc)
+    start = (now - timedelta(days=10)).replace(hour=0, minute=0, second=0, microsecond=0)
+    first = api.get_historical_assets_columns_between(TimeFrame.Day, start, now, ['AAA'])
+    _, coverage_end = api._bar_cache.coverage('AAA', ('1Day', 'split', 'iex'))
+    unfinished_start = _ns(datetime.now(pytz.utc) - timedelta(days=1))
+    second = api.get_historical_assets_columns_between(TimeFrame.Day, start, now, ['AAA'])
+
+    # La barra de menos de un dia no se guarda en disco, se vuelve a pedir y llega con su valor nuevo
+    assert coverage_end <= unfinished_start
+    assert (_stored_api(api)['timestamp'] < coverage_end).all()
+    assert first['AAA']['timestamp'][-1] >= coverage_end
+    assert api._bars_fetcher.requests[1][1] == now
+    assert first['AAA']['close'][-1] != second['AAA']['close'][-1]
+    assert first['AAA']['timestamp'].tolist() == second['AAA']['timestamp'].tolist()
+
+
+def _stored_api(par_api):
+    data_path, _ = par_api._bar_cache._paths('AAA', ('1Day', 'split', 'iex'))
+    return np.fromfile(data_path, dtype=BAR_DTYPE)
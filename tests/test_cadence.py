@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from model import cadence
+from model.cadence import CadenceScheduler
+
+
+class _Clock:
+    # Reloj falso para model.cadence: sleep solo avanza el tiempo
+    def __init__(self, par_now):
+        self.now = par_now
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, par_seconds):
+        self.sleeps.append(par_seconds)
+        self.now += par_seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock(125.0)
+    monkeypatch.setattr(cadence, 'time', clock)
+    return clock
+
+
+def test_first_wait_runs_immediately_then_waits_for_next_boundary(clock):
+    scheduler = CadenceScheduler(60, 5)
+    assert scheduler.wait() == 125.0 and clock.sleeps == [0]
+
+    # Limites en múltiplos de 60 segundos mas 5 de desfase
+    clock.now = 126.0
+    assert scheduler.wait() == 185.0 and clock.now == 185.0
+    # Al despertar justo en el limite el redondeo no repite el mismo limite
+    assert scheduler.wait() == 245.0
+    assert scheduler.missed == 0
+
+
+def test_slow_run_counts_missed_boundaries(clock):
+    scheduler = CadenceScheduler(60, 5)
+    scheduler.wait()
+    scheduler.wait()
+    # La ejecución iniciada en 185 termina en 310, despues de los limites 245 y 305
+    clock.now = 310.0
+    assert scheduler.wait() == 365.0
+    assert scheduler.missed == 2
+    # Sin retraso no se cuentan mas
+    scheduler.wait()
+    assert scheduler.missed == 2
+
+
+def test_wait_async_uses_same_boundaries(clock, monkeypatch):
+    async def sleep(par_seconds):
+        clock.sleep(par_seconds)
+    monkeypatch.setattr(cadence.asyncio, 'sleep', sleep)
+    scheduler = CadenceScheduler(60, 5)
+
+    async def run():
+        return [await scheduler.wait_async() for _ in range(3)]
+    assert asyncio.run(run()) == [125.0, 185.0, 245.0]
+
+
+def test_should_run_only_when_inputs_change(clock):
+    scheduler = CadenceScheduler(60, 5)
+    scheduler.wait()
+    # La primera vuelta siempre se ejecuta
+    assert scheduler.should_run(('a', 1))
+    scheduler.start_run()
+    clock.now += 2
+    scheduler.finish_run(('a', 1))
+
+    scheduler.wait()
+    assert not scheduler.should_run(('a', 1))
+    assert scheduler.should_run(('a', 2))
+    scheduler.start_run()
+    scheduler.finish_run(('a', 2))
+
+    metrics = scheduler.metrics()
+    assert (metrics['runs'], metrics['skipped']) == (2, 1)
+    assert metrics['max_duration'] == 2.0 and metrics['last_lag'] == 0.0
@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from model.alpaca.bar_cache import BAR_DTYPE
+from model.alpaca.find_pivots import DAY_NS
+from model.rolling_volume import RollingVolume
+
+TODAY = 19_500
+
+
+class _FakeAlpaca:
+    # Snapshots que la prueba cambia entre vueltas
+    def __init__(self, par_snapshots):
+        self.snapshots = par_snapshots
+        self.requests = 0
+
+    def get_snapshots_columns(self, par_symbols):
+        self.requests += 1
+        return self.snapshots.copy()
+
+
+def _pivots(par_peak):
+    array = np.zeros(1, dtype=[('timestamp', np.int64), ('price', float)])
+    array['price'] = par_peak
+    return SimpleNamespace(atr=1.0, list_array_strong_peaks=array, list_array_strong_valleys=array[:0])
+
+
+@pytest.fixture
+def pivot_filter(pivot_controller):
+    from model.alpaca.api import SNAPSHOT_DTYPE
+    snapshots = np.zeros(2, dtype=SNAPSHOT_DTYPE)
+    snapshots['symbol'] = ['AAA', 'BBB']
+    snapshots['price'] = 100.0
+    snapshots['trade_timestamp'] = 1
+    snapshots['minute_timestamp'] = 1
+    snapshots['day_timestamp'] = TODAY * DAY_NS
+    # BBB no pasa la regla de volumen del día
+    snapshots['day_volume'] = [80000.0, 10.0]
+
+    pivot_filter = pivot_controller.PivotFilter.__new__(pivot_controller.PivotFilter)
+    pivot_filter.list_filter_1 = ['AAA', 'BBB']
+    pivot_filter._api_alpaca = _FakeAlpaca(snapshots)
+    pivot_filter.dict_asset_pivots = {'AAA': _pivots(100.1), 'BBB': _pivots(100.1)}
+    pivot_filter._pivot_symbols = None
+    pivot_filter._day_screen = None
+    pivot_filter.snapshot_fingerprint = ()
+    pivot_filter._day_screener = pivot_controller.Screener(pivot_controller.FILTER_2_DAY_RULES)
+    bars = np.zeros(20, dtype=BAR_DTYPE)
+    bars['timestamp'] = np.arange(TODAY - 20, TODAY) * DAY_NS
+    bars['volume'] = 60000.0
+    pivot_filter.rolling_volume = RollingVolume(['AAA', 'BBB'])
+    pivot_filter.rolling_volume.seed({'AAA': bars, 'BBB': bars}, TODAY)
+    return pivot_filter
+
+
+def test_fingerprint_ignores_rows_that_fail_day_rules(pivot_filter):
+    snapshots = pivot_filter._api_alpaca.snapshots
+    pivot_filter.refresh_snapshots()
+    first = pivot_filter.snapshot_fingerprint
+    assert first == (('AAA', 1, 1),)
+
+    # Trades, barras de 1 minuto y volumen nuevos de un activo que sigue sin pasar las reglas del día
+    snapshots['trade_timestamp'][1] = 5
+    snapshots['minute_timestamp'][1] = 5
+    snapshots['day_volume'][1] = 20.0
+    pivot_filter.refresh_snapshots()
+    assert pivot_filter.snapshot_fingerprint == first
+
+    # Un trade nuevo de una fila que pasa cambia las entradas
+    snapshots['trade_timestamp'][0] = 2
+    pivot_filter.refresh_snapshots()
+    assert pivot_filter.snapshot_fingerprint == (('AAA', 2, 1),)
+
+    # El volumen del día hace pasar a BBB
+    snapshots['day_volume'][1] = 90000.0
+    pivot_filter.refresh_snapshots()
+    assert pivot_filter.snapshot_fingerprint == (('AAA', 2, 1), ('BBB', 5, 5))
+
+
+def test_filter_2_reuses_day_screen(pivot_filter, monkeypatch):
+    pivot_filter.refresh_snapshots()
+    minute_symbols = []
+    monkeypatch.setattr(pivot_filter, '_join_minute_features', lambda table, index, symbols: minute_symbols.extend(symbols))
+    pivot_filter._minute_screener = SimpleNamespace(apply=lambda table: np.arange(len(table)))
+    assert list(pivot_filter.filter_2()) == ['AAA']
+    # filter_2 usa los snapshots y las reglas del día de refresh_snapshots, sin otra consulta
+    assert pivot_filter._api_alpaca.requests == 1 and minute_symbols == ['AAA']
+    assert pivot_filter._day_screen is None
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('alpaca')
+
+from model.alpaca.bar_cache import BAR_DTYPE
+from model.alpaca.find_pivots import CANDIDATE_DTYPE, DAY_NS, PivotsAlpaca
+from tests import pivots_reference
+
+CASES = 300
+
+
+def _random_candidates(par_rng):
+    # Picos y valles con precios en una rejilla gruesa (muchos empates) en dias distintos de 4 años, como salen de las barras diarias
+    number = int(par_rng.integers(0, 60))
+    candidates = np.empty(number, dtype=CANDIDATE_DTYPE)
+    candidates['timestamp'] = par_rng.choice(4 * 365, number, replace=False) * DAY_NS + 1_600_000_000 * 10**9
+    candidates['high'] = 100 + par_rng.integers(0, 40, number) * 0.25
+    candidates['low'] = 100 + par_rng.integers(0, 40, number) * 0.25
+    return candidates
+
+
+def _slip_ratio(par_rng):
+    return float(par_rng.choice([0.1, 0.25, 0.3, 0.5, 1.0, 2.0]))
+
+
+@pytest.mark.parametrize('par_column', ['high', 'low'])
+def test_strong_pivots_same_as_previous_filter(par_column):
+    rng = np.random.default_rng(8)
+    pivots = PivotsAlpaca('TEST', 5)
+    for _ in range(CASES):
+        candidates, slip_ratio = _random_candidates(rng), _slip_ratio(rng)
+        expected = pivots_reference.filtered_strong_pivots(candidates, par_column, slip_ratio)
+        assert pivots._filtered_strong_pivots(candidates, par_column, slip_ratio).tolist() == expected.tolist()
+
+
+@pytest.mark.parametrize('par_column', ['high', 'low'])
+def test_weak_pivots_same_as_previous_filter(par_column):
+    rng = np.random.default_rng(9)
+    pivots = PivotsAlpaca('TEST', 5)
+    for _ in range(CASES):
+        candidates, slip_ratio = _random_candidates(rng), _slip_ratio(rng)
+        strongs = pivots_reference.filtered_strong_pivots(_random_candidates(rng), par_column, slip_ratio)[:int(rng.integers(0, 4))]
+        expected = pivots_reference.filtered_weak_pivots(candidates, strongs, par_column, slip_ratio)
+        assert pivots._filtered_weak_pivots(candidates, strongs, par_column, slip_ratio).tolist() == expected.tolist()
+
+
+def _random_bars(par_rng, par_number_bars):
+    # Barras diarias con caminata aleatoria, los precios redondeados a 0.05 para que haya empates
+    close = 100 + np.cumsum(par_rng.normal(0, 1.5, par_number_bars))
+    bars = np.zeros(par_number_bars, dtype=BAR_DTYPE)
+    bars['timestamp'] = (1_500_000_000 * 10**9 // DAY_NS + np.arange(par_number_bars)) * DAY_NS
+    bars['close'] = np.round(close / 0.05) * 0.05
+    bars['high'] = np.round((close + par_rng.exponential(1.0, par_number_bars)) / 0.05) * 0.05
+    bars['low'] = np.round((close - par_rng.exponential(1.0, par_number_bars)) / 0.05) * 0.05
+    return bars
+
+
+def _pivot_lists(par_pivots):
+    return [
+        par_pivots.list_array_strong_peaks.tolist(), par_pivots.list_array_strong_valleys.tolist(),
+        par_pivots.list_array_weak_peaks.tolist(), par_pivots.list_array_weak_valleys.tolist(),
+    ]
+
+
+@pytest.mark.parametrize('par_seed', range(20))
+def test_incremental_years_same_as_full_rescan(par_seed):
+    rng = np.random.default_rng(par_seed)
+    bars = _random_bars(rng, 4 * 252)
+    current_price = float(bars['close'][-1])
+    incremental = PivotsAlpaca('TEST', 5)
+    for years in range(1, 5):
+        window = bars[-years * 252:]
+        # Igual que PivotFilter._filter_1: solo se pasa el año que falta y los debiles se buscan en el ultimo año
+        incremental.get_pivots(window[:252], current_price, years == 4)
+        full = PivotsAlpaca('TEST', 5)
+        full.get_pivots(window, current_price, years == 4)
+        assert _pivot_lists(incremental) == _pivot_lists(full)
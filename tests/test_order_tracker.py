@@ -0,0 +1,175 @@
+import pickle
+import threading
+import time
+
+import pytest
+
+from model.alpha_trader_pro.enums import Exchange, Side, Status, Type
+from model.alpha_trader_pro.models import Order
+from model.alpha_trader_pro.order_tracker import OrderTracker
+
+
+class _FakeOrderBook:
+    def __init__(self):
+        self.statuses = {}
+        self.refreshes = 0
+
+    def refresh(self, par_since=None):
+        self.refreshes += 1
+
+    def status(self, par_id):
+        return self.statuses.get(par_id)
+
+    def set_status(self, par_id, par_status):
+        self.statuses[par_id] = par_status
+
+
+class _FakeApi:
+    # Api de AlphaTraderPro en memoria: las ordenes quedan abiertas hasta que la prueba cambia su estado
+    def __init__(self, par_cancel=None):
+        self.order_book = _FakeOrderBook()
+        self.sent = []
+        self.cancels = []
+        # Efecto de cada cancelacion, recibe la api y el id de la orden
+        self._cancel = par_cancel
+
+    def send_order(self, par_order):
+        self.sent.append((par_order.symbol, threading.current_thread().name))
+        order_id = str(len(self.sent))
+        self.order_book.set_status(order_id, Status.OPEN)
+        return order_id
+
+    def cancel_order(self, par_id):
+        self.cancels.append(par_id)
+        if self._cancel is not None:
+            self._cancel(self, par_id)
+
+
+def _order():
+    return Order('AAPL', 0, 100, Exchange.BATS, Type.MARKET, Side.BUY)
+
+
+def _tracker(par_api):
+    return OrderTracker(par_api, par_poll_interval=0.01, par_timeout=0.1, par_max_poll_interval=0.01)
+
+
+def test_filled_order_resolves_without_cancel():
+    api = _FakeApi()
+    order = _order()
+    future = _tracker(api).submit(order)
+    api.order_book.set_status('1', Status.FILLED)
+    assert future.result(timeout=2) == Status.FILLED
+    assert order.status == Status.FILLED and api.cancels == []
+
+
+def test_expired_order_resolves_none_once_cancel_is_confirmed():
+    api = _FakeApi(lambda par_api, par_id: par_api.order_book.set_status(par_id, Status.CANCELED))
+    order = _order()
+    future = _tracker(api).submit(order)
+    assert future.result(timeout=2) is None
+    assert order.status == Status.CANCELED and api.cancels == ['1']
+
+
+def test_order_filled_before_cancel_resolves_filled():
+    # La orden se completo entre la ultima consulta y la cancelacion, que ya no tiene efecto
+    api = _FakeApi(lambda par_api, par_id: par_api.order_book.set_status(par_id, Status.FILLED))
+    order = _order()
+    future = _tracker(api).submit(order)
+    assert future.result(timeout=2) == Status.FILLED
+    assert order.status == Status.FILLED
+
+
+def test_failed_cancel_keeps_order_pending():
+    def cancel(par_api, par_id):
+        # La primera cancelacion falla, la segunda se confirma
+        if len(par_api.cancels) == 1:
+            raise OSError('sin conexion')
+        par_api.order_book.set_status(par_id, Status.CANCELED)
+
+    api = _FakeApi(cancel)
+    future = OrderTracker(api, par_poll_interval=0.01, par_timeout=0.2, par_max_poll_interval=0.01).submit(_order())
+    # Entre la primera cancelacion (0.2 s) y la segunda (0.4 s)
+    time.sleep(0.3)
+    # La orden sigue abierta, resolverla permitiria enviar una segunda orden de entrada
+    assert not future.done()
+    assert future.result(timeout=2) is None
+    assert api.cancels == ['1', '1']
+
+
+def test_poll_interval_backs_off_while_pending():
+    api = _FakeApi()
+    tracker = OrderTracker(api, par_poll_interval=0.01, par_timeout=10, par_max_poll_interval=0.08)
+    tracker.submit(_order())
+    time.sleep(0.5)
+    # Consultas a 0, 0.01, 0.03, 0.07 y despues cada 0.08 segundos, en lugar de 50 con un intervalo fijo
+    assert 5 <= api.order_book.refreshes <= 12
+
+    # Una orden nueva se consulta enseguida y reinicia el intervalo
+    refreshes = api.order_book.refreshes
+    second = tracker.submit(_order())
+    api.order_book.set_status('2', Status.FILLED)
+    assert second.result(timeout=0.05) == Status.FILLED
+    assert api.order_book.refreshes > refreshes
+
+
+def test_tracker_can_be_pickled():
+    tracker = _tracker(_FakeApi())
+    tracker.submit(_order())
+    copy = pickle.loads(pickle.dumps(tracker))
+    assert copy._pending == {} and copy._poller is None
+
+
+def _cancel(par_api, par_id):
+    par_api.order_book.set_status(par_id, Status.CANCELED)
+
+
+class _RetryApi(_FakeApi):
+    # La primera orden de cada activo no se completa y se cancela, la segunda se completa
+    def __init__(self):
+        super().__init__(_cancel)
+
+    def send_order(self, par_order):
+        order_id = super().send_order(par_order)
+        if sum(symbol == par_order.symbol for symbol, _ in self.sent) > 1:
+            self.order_book.set_status(order_id, Status.FILLED)
+        return order_id
+
+
+@pytest.fixture
+def alpha_controller(pivot_controller, monkeypatch):
+    monkeypatch.setattr(pivot_controller, 'AlphaTraderProApi', _RetryApi)
+    controller = pivot_controller.AlphaController()
+    controller._order_tracker.poll_interval = 0.01
+    controller._order_tracker.max_poll_interval = 0.01
+    controller._order_tracker.timeout = 0.1
+    return controller
+
+
+def _wait_traded(par_controller, par_symbols):
+    for _ in range(200):
+        if sorted(par_controller.traded_assets) == sorted(par_symbols) and not par_controller._pending_symbols:
+            return
+        time.sleep(0.01)
+    raise AssertionError(par_controller.traded_assets)
+
+
+def test_entry_retry_is_sent_outside_tracker_thread(alpha_controller):
+    alpha_controller._buy('AAPL')
+    alpha_controller._sell('MSFT')
+    # Una señal repetida mientras la orden esta en curso no envia otra orden
+    alpha_controller._buy('AAPL')
+    _wait_traded(alpha_controller, ['AAPL', 'MSFT'])
+
+    sent = alpha_controller._client.sent
+    assert sorted(symbol for symbol, _ in sent) == ['AAPL', 'AAPL', 'MSFT', 'MSFT']
+    # El primer intento sale del hilo que recibe los trades y el reintento de los hilos de reintento
+    main = threading.current_thread().name
+    assert [thread for symbol, thread in sent if symbol == 'AAPL'][0] == main
+    assert all(thread.startswith('entry-retry') for thread in [thread for _, thread in sent][2:])
+
+
+def test_alpha_controller_can_be_pickled(alpha_controller):
+    # PivotController.start pasa metodos de AlphaController a procesos, con spawn se copia el controlador
+    copy = pickle.loads(pickle.dumps(alpha_controller))
+    copy._buy('AAPL')
+    _wait_traded(copy, ['AAPL'])
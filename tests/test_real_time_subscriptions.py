@@ -0,0 +1,167 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from model.trade_transport import MessageChannel
+
+
+class _FakeStream:
+    # StockDataStream sin conexion, registra las suscripciones enviadas y cuantas veces se inicia o se cierra
+    instances = []
+
+    def __init__(self, **kwargs):
+        self.calls = []
+        self.runs = 0
+        self.closes = 0
+        self.stopped = threading.Event()
+        _FakeStream.instances.append(self)
+
+    def subscribe_trades(self, handler, *symbols):
+        self.calls.append(('subscribe', sorted(symbols)))
+
+    def unsubscribe_trades(self, *symbols):
+        self.calls.append(('unsubscribe', sorted(symbols)))
+
+    def subscribe_daily_bars(self, handler, *symbols):
+        self.calls.append(('subscribe_daily_bars', sorted(symbols)))
+
+    def run(self):
+        self.runs += 1
+        self.stopped.wait()
+
+    async def _run_forever(self):
+        self.runs += 1
+        await asyncio.Event().wait()
+
+    async def close(self):
+        self.closes += 1
+
+
+@pytest.fixture
+def controller(pivot_controller, monkeypatch):
+    _FakeStream.instances = []
+    monkeypatch.setattr(pivot_controller, 'StockDataStream', _FakeStream)
+    return pivot_controller.RealTimeController(lambda *args: None, ['AAPL', 'MSFT'])
+
+
+def test_update_sends_only_diffs(controller):
+    stream = controller._stream
+    controller.update_subscriptions(['MSFT', 'TSLA', 'AMZN'])
+    controller.update_subscriptions(['MSFT', 'TSLA', 'AMZN'])
+
+    assert stream.calls == [('subscribe', ['AAPL', 'MSFT']), ('unsubscribe', ['AAPL']), ('subscribe', ['AMZN', 'TSLA'])]
+    assert sorted(controller.list_symbols) == ['AMZN', 'MSFT', 'TSLA']
+    assert len(_FakeStream.instances) == 1
+
+
+def test_control_channel_updates_running_stream(controller):
+    stream = controller._stream
+    control = MessageChannel()
+    runner = threading.Thread(target=controller.start, args=(control,), daemon=True)
+    runner.start()
+    control.send(['MSFT', 'TSLA'])
+    control.send(['TSLA'])
+
+    deadline = time.monotonic() + 5
+    while len(stream.calls) < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # Las listas se aplican mientras el stream sigue corriendo, sin reiniciar ni cerrar la conexion
+    assert stream.calls[1:] == [('unsubscribe', ['AAPL']), ('subscribe', ['TSLA']), ('unsubscribe', ['MSFT'])]
+    assert runner.is_alive() and stream.runs == 1 and stream.closes == 0
+    assert len(_FakeStream.instances) == 1
+    stream.stopped.set()
+    runner.join(timeout=2)
+
+
+def test_start_waits_for_first_subscription(pivot_controller, monkeypatch):
+    _FakeStream.instances = []
+    monkeypatch.setattr(pivot_controller, 'StockDataStream', _FakeStream)
+    controller = pivot_controller.RealTimeController(lambda *args: None, [])
+    stream = controller._stream
+    control = MessageChannel()
+    runner = threading.Thread(target=controller.start, args=(control,), daemon=True)
+    runner.start()
+    control.send([])
+    time.sleep(0.1)
+    # Sin suscripciones el stream no se inicia
+    assert stream.runs == 0 and stream.calls == []
+
+    control.send(['AAPL'])
+    deadline = time.monotonic() + 5
+    while stream.runs == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert stream.runs == 1 and stream.calls == [('subscribe', ['AAPL'])]
+    stream.stopped.set()
+    runner.join(timeout=2)
+
+
+def test_task_starts_with_first_subscription(pivot_controller, monkeypatch):
+    _FakeStream.instances = []
+    monkeypatch.setattr(pivot_controller, 'StockDataStream', _FakeStream)
+    controller = pivot_controller.RealTimeController(lambda *args: None, [])
+
+    async def run():
+        assert controller.start_task() is None
+        await controller.update_subscriptions_async([])
+        assert controller._task is None
+        await controller.update_subscriptions_async(['AAPL'])
+        task = controller._task
+        await controller.update_subscriptions_async(['AAPL', 'MSFT'])
+        await asyncio.sleep(0)
+        assert controller._task is task and controller._stream.runs == 1
+        await controller.stop_async()
+        assert task.cancelled() and controller._stream.closes == 1
+    asyncio.run(run())
+
+
+@pytest.fixture
+def idle_controller(pivot_controller, monkeypatch):
+    # StockDataStream real, sin suscripciones no se conecta
+    monkeypatch.setattr(pivot_controller.conf, 'alpaca_api_key_id', 'key')
+    monkeypatch.setattr(pivot_controller.conf, 'alpaca_api_secret_key', 'secret')
+    return pivot_controller.RealTimeController(lambda *args: None, [])
+
+
+def _cpu_seconds(par_wait):
+    started_at = time.process_time()
+    par_wait()
+    return time.process_time() - started_at
+
+
+def test_idle_controller_does_not_spin(idle_controller):
+    # Sin suscripciones StockDataStream._run_forever gira sin pausa esperando la primera
+    threading.Thread(target=idle_controller.start, args=(MessageChannel(),), daemon=True).start()
+    assert _cpu_seconds(lambda: time.sleep(0.5)) < 0.2
+
+    async def run():
+        assert idle_controller.start_task() is None
+        started_at = time.process_time()
+        await asyncio.sleep(0.5)
+        return time.process_time() - started_at
+    assert asyncio.run(run()) < 0.2
+
+
+def test_run_async_refuses_idle_stream(idle_controller):
+    # Sin suscripciones se falla antes de esperar _run_forever, el stream no llega a correr
+    async def run():
+        started_at = time.process_time()
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(idle_controller.run_async(), timeout=1)
+        return time.process_time() - started_at
+    assert asyncio.run(run()) < 0.2
+    assert idle_controller._stream._loop is None
+
+
+def test_run_stream_forever_checks_private_api(pivot_controller):
+    # El adaptador exige que _run_forever exista y sea una corrutina del StockDataStream instalado
+    assert asyncio.iscoroutinefunction(pivot_controller.StockDataStream._run_forever)
+
+    class NoCoroutine:
+        def _run_forever(self):
+            pass
+
+    for stream in (object(), NoCoroutine()):
+        with pytest.raises(RuntimeError):
+            asyncio.run(pivot_controller._run_stream_forever(stream))
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from model import renko_engine
+from model.renko_engine import BRICK_UP, BRICK_DOWN, RenkoStream, build_renko, build_renko_sweep
+from tests.renko_reference import vRenko as ReferenceRenko
+
+TYPES = {'up': BRICK_UP, 'down': BRICK_DOWN}
+
+
+@pytest.fixture(params=['python', 'arrays', 'numba'])
+def renko_loop(request, monkeypatch):
+    # _renko_loop sobre listas (sin numba), sobre arrays sin compilar y compilado con numba
+    loops = {'python': None, 'arrays': renko_engine._renko_loop, 'numba': renko_engine._compiled_renko_loop}
+    if request.param == 'numba' and loops['numba'] is None:
+        pytest.skip('numba no esta instalado')
+    monkeypatch.setattr(renko_engine, '_compiled_renko_loop', loops[request.param])
+    return request.param
+
+
+def _rates(par_number_bars, par_seed, par_scale, par_tick=0.01):
+    # Barras de un minuto con caminata aleatoria, los precios redondeados a par_tick
+    rng = np.random.default_rng(par_seed)
+    close = 100 + np.cumsum(rng.normal(0, par_scale, par_number_bars))
+    open = np.r_[close[0], close[:-1]] + rng.normal(0, 0.05, par_number_bars)
+    high = np.maximum(open, close) + rng.exponential(par_scale * 0.7, par_number_bars)
+    low = np.minimum(open, close) - rng.exponential(par_scale * 0.7, par_number_bars)
+    prices = [np.round(np.round(column / par_tick) * par_tick, 2) for column in (open, high, low, close)]
+    return {
+        'time': 1600000000 + 60 * np.arange(par_number_bars),
+        'open': prices[0], 'high': prices[1], 'low': prices[2], 'close': prices[3],
+    }
+
+
+def _reference_bricks(par_brick_size, par_rates):
+    # Ladrillos de la implementacion anterior, None si falla con estas barras
+    reference = ReferenceRenko(par_brick_size, par_rates)
+    try:
+        reference.create_renko()
+    except (NameError, UnboundLocalError, IndexError):
+        return None
+    return reference.bricks
+
+
+def _engine_bricks(par_brick_size, par_rates):
+    time = pd.to_datetime(par_rates['time'], unit='s').to_numpy(dtype='datetime64[ns]').view(np.int64)
+    store = build_renko_sweep([par_brick_size], time, par_rates['open'], par_rates['high'], par_rates['low'], par_rates['close'])[par_brick_size]
+    return store.to_records()
+
+
+def _assert_same_bricks(par_reference, par_records):
+    assert len(par_reference) == len(par_records)
+    for brick, record in zip(par_reference, par_records.tolist()):
+        time, kind, open, close, high, low = record
+        assert pd.Timestamp(brick['time']).value == time
+        assert TYPES[brick['type']] == kind
+        # Mismos precios bit a bit
+        assert (brick['open'], brick['close'], brick['high'], brick['low']) == (open, close, high, low)
+
+
+@pytest.mark.parametrize('par_tick', [0.01, 0.25], ids=['aleatorio', 'empates'])
+@pytest.mark.parametrize('par_brick_size,par_scale', [(0.5, 0.5), (1.0, 1.0), (0.5, 1.5), (1.0, 0.6)])
+def test_same_bricks_as_previous_create_renko(renko_loop, par_brick_size, par_scale, par_tick):
+    # Con par_tick=0.25 los precios caen en multiplos del ladrillo, hay empates en todas las comparaciones
+    compared = 0
+    for seed in range(60):
+        rates = _rates(300, seed, par_scale, par_tick)
+        # La implementacion anterior falla en algunas series (direccion sin definir en el primer ladrillo)
+        reference = _reference_bricks(par_brick_size, rates)
+        if reference is None:
+            continue
+        _assert_same_bricks(reference, _engine_bricks(par_brick_size, rates))
+        compared += 1
+        if compared == 12:
+            break
+    assert compared == 12
+
+
+def _stream_rates(par_seed):
+    # Escala y tamaño de ladrillo variables, algunas series empiezan con barras de rango pequeño
+    rng = np.random.default_rng(1000 + par_seed)
+    rates = _rates(200, par_seed, rng.choice([0.3, 0.6, 1.0, 1.5]), rng.choice([0.01, 0.25]))
+    return float(rng.choice([0.5, 1.0])), rates
+
+
+@pytest.mark.parametrize('par_seed', range(50))
+def test_stream_bars_same_bricks_as_batch(renko_loop, par_seed):
+    brick_size, rates = _stream_rates(par_seed)
+    stream = RenkoStream(brick_size)
+    delivered = []
+    for bar in pd.DataFrame(rates).to_dict('records'):
+        delivered.append(stream.update(bar))
+    batch = _engine_bricks(brick_size, rates)
+    assert stream.bricks.to_records().tolist() == batch.tolist()
+    # Se entregan todos los ladrillos menos el ultimo, que aun puede ceder su mecha
+    assert np.concatenate(delivered).tolist() == batch[:-1].tolist()
+
+
+def test_compiled_loop_grows_columns(renko_loop, monkeypatch):
+    # Saltos de precio que generan muchos mas ladrillos que barras, las columnas de salida se amplian a mitad del lote
+    rates = _rates(120, 7, 1.0)
+    jumps = np.repeat([0.0, 60.0, -45.0, 30.0], 30)
+    for column in ('open', 'high', 'low', 'close'):
+        rates[column] = rates[column] + jumps
+    arrays = [rates['time'] * 1_000_000_000] + [rates[column] for column in ('open', 'high', 'low', 'close')]
+    records = build_renko(0.5, *arrays).to_records()
+    monkeypatch.setattr(renko_engine, '_compiled_renko_loop', None)
+    expected = build_renko(0.5, *arrays).to_records()
+    assert len(expected) > 2 * len(rates['time'])
+    assert records.tolist() == expected.tolist()
+
+
+@pytest.mark.parametrize('par_seed', range(10))
+def test_stream_trades_same_bricks_as_batch(par_seed):
+    brick_size, rates = _stream_rates(par_seed)
+    # Las barras de trades empiezan en multiplos del minuto
+    rates['time'] = rates['time'] - rates['time'] % 60
+    stream = RenkoStream(brick_size)
+    for time, open, high, low, close in zip(rates['time'].tolist(), rates['open'].tolist(), rates['high'].tolist(), rates['low'].tolist(), rates['close'].tolist()):
+        # Trades de la barra en orden open, high, low, close dentro del mismo minuto
+        for second, price in enumerate((open, high, low, close)):
+            stream.update_trade(price, (time + second) * 1_000_000_000)
+    # La ultima barra sigue en construccion
+    closed_rates = {column: values[:-1] for column, values in rates.items()}
+    assert stream.bricks.to_records().tolist() == _engine_bricks(brick_size, closed_rates).tolist()
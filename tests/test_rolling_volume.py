@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from model.alpaca.bar_cache import BAR_DTYPE
+from model.alpaca.find_pivots import DAY_NS
+from model.rolling_volume import RollingVolume
+
+TODAY = 19_500
+
+
+def _bars(par_volumes, par_last_day=TODAY):
+    # Una barra diaria por volumen, la ultima en par_last_day
+    bars = np.zeros(len(par_volumes), dtype=BAR_DTYPE)
+    bars['timestamp'] = (np.arange(par_last_day - len(par_volumes) + 1, par_last_day + 1)) * DAY_NS
+    bars['volume'] = par_volumes
+    return bars
+
+
+@pytest.mark.parametrize('par_days', [1, 2, 5, 20])
+def test_seed_matches_last_sessions(par_days):
+    volumes = np.arange(1.0, 31.0)
+    rolling = RollingVolume(['AAA', 'BBB'], par_days)
+    rolling.seed({'AAA': _bars(volumes), 'BBB': _bars(volumes[:3])}, TODAY)
+
+    # Hoy y hasta par_days - 1 sesiones anteriores, con par_days=1 solo la de hoy
+    assert rolling.today(['AAA', 'BBB']).tolist() == [30.0, 3.0]
+    assert rolling.mean(['AAA']).tolist() == [volumes[-par_days:].mean()]
+    assert rolling.mean(['BBB']).tolist() == [volumes[:3][-par_days:].mean()]
+
+
+def test_seed_without_today_bar():
+    rolling = RollingVolume(['AAA'], 3)
+    rolling.seed({'AAA': _bars([10.0, 20.0, 30.0], TODAY - 1)}, TODAY)
+    assert rolling.today(['AAA']).tolist() == [0.0]
+    assert rolling.mean(['AAA']).tolist() == [50.0 / 3]
+
+
+def test_set_today_and_roll():
+    rolling = RollingVolume(['AAA', 'BBB'], 3)
+    rolling.seed({'AAA': _bars([10.0, 20.0, 30.0]), 'BBB': _bars([1.0, 2.0, 3.0])}, TODAY)
+
+    assert rolling.set_today('AAA', TODAY * DAY_NS, 60.0)
+    # El mismo volumen no cambia el buffer
+    assert not rolling.set_today('AAA', TODAY * DAY_NS + 1, 60.0)
+    assert rolling.mean(['AAA']).tolist() == [30.0]
+
+    # Sesion nueva: se descarta la mas antigua de todos los simbolos y el volumen de hoy empieza en 0
+    assert rolling.set_today('AAA', (TODAY + 1) * DAY_NS, 90.0)
+    assert rolling.today(['AAA', 'BBB']).tolist() == [90.0, 0.0]
+    assert rolling.mean(['AAA', 'BBB']).tolist() == [(20.0 + 60.0 + 90.0) / 3, (2.0 + 3.0) / 3]
+
+
+def test_stale_session_is_ignored():
+    rolling = RollingVolume(['AAA'], 3)
+    rolling.seed({'AAA': _bars([10.0, 20.0, 30.0])}, TODAY)
+    assert not rolling.set_today('AAA', (TODAY - 1) * DAY_NS, 500.0)
+    assert not rolling.set_today('ZZZ', TODAY * DAY_NS, 500.0)
+    assert rolling.today(['AAA', 'ZZZ'])[0] == 30.0 and np.isnan(rolling.today(['ZZZ'])[0])
+    assert rolling.mean(['AAA']).tolist() == [20.0]
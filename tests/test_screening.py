@@ -0,0 +1,43 @@
+import pickle
+
+import numpy as np
+
+from model.screening import Rule, Screener
+
+TABLE = np.array(
+    [('AAA', 25.0, 22.0, 60000.0), ('BBB', 10.0, 12.0, 90000.0), ('CCC', 300.0, 250.0, 40000.0), ('DDD', 50.0, 50.5, 80000.0)],
+    dtype=[('symbol', '<U8'), ('price', float), ('peak', float), ('day_volume', float)],
+)
+
+
+def test_columns_are_read_names_without_np():
+    rule = Rule('pivote_cercano', '(np.abs(price - peak) / price < 0.05) & np.isfinite(peak) & (price > np.float64(1))')
+    assert rule.columns == ('price', 'peak')
+
+
+def test_rule_with_np_functions():
+    screener = Screener([
+        Rule('volumen', 'np.log10(day_volume) > 4.7'),
+        Rule('pivote_cercano', 'np.abs(price - peak) / price < 0.05'),
+    ])
+    assert TABLE['symbol'][screener.apply(TABLE)].tolist() == ['DDD']
+    assert [(name, evaluated, passed) for name, evaluated, passed, _ in screener.last_report] == [('volumen', 4, 3), ('pivote_cercano', 3, 1)]
+
+
+def test_result_does_not_depend_on_order():
+    rules = [Rule('precio', '(price >= 20) & (price <= 500)'), Rule('volumen', 'day_volume > 50000'), Rule('pivote', 'peak > price')]
+    expected = Screener(rules).apply(TABLE).tolist()
+    screener = Screener(rules[::-1])
+    for _ in range(3):
+        assert screener.apply(TABLE).tolist() == expected
+
+
+def test_rules_and_screener_can_be_pickled():
+    # Los procesos de PivotController.start copian pivot_filter con sus screeners (spawn en Windows)
+    screener = Screener([Rule('volumen', 'np.log10(day_volume) > 4.7'), Rule('precio', '(price >= 20) & (price <= 500)')])
+    expected = screener.apply(TABLE).tolist()
+    copy = pickle.loads(pickle.dumps(screener))
+    assert [rule.columns for rule in copy.rules] == [('day_volume',), ('price',)]
+    # Las estadisticas acumuladas se conservan, se comparan antes de que apply las actualice
+    assert copy._stats == screener._stats
+    assert copy.apply(TABLE).tolist() == expected
@@ -0,0 +1,67 @@
+import threading
+import time
+
+import pytest
+
+from model.trade_transport import LatestValuesChannel, SharedSymbols, TradeChannel, pack_trade
+from tests.trade_latency_benchmark import measure_latency
+
+
+def test_trade_round_trip():
+    channel = TradeChannel()
+    channel.put('AAPL', 10.5, 100.0, 1_700_000_000_000_000_000, 2500.0)
+    assert channel.get() == {'symbol': 'AAPL', 'price': 10.5, 'size': 100.0, 'timestamp': 1_700_000_000_000_000_000, 'volume': 2500.0}
+    channel.put('A' * 16, 1.0, 1.0, 0)
+    assert channel.get()['symbol'] == 'A' * 16
+
+
+def test_long_symbol_is_rejected():
+    # struct recortaria el símbolo a 16 bytes
+    with pytest.raises(ValueError):
+        pack_trade('A' * 17, 1.0, 1.0, 0)
+
+
+def test_publish_does_not_block_without_trades():
+    symbols = SharedSymbols()
+    symbols.listen()
+
+    def publish():
+        # Sin hilo que lea, los cambios llenan la tuberia mucho antes de terminar
+        for index in range(5000):
+            symbols.publish({f'S{index}': {'pivot': float(index), 'avg': 1.0, 'action': 'buy'}})
+
+    publisher = threading.Thread(target=publish, daemon=True)
+    publisher.start()
+    publisher.join(timeout=10)
+    assert not publisher.is_alive()
+
+    deadline = time.monotonic() + 5
+    while symbols.get('S4999') is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert symbols.get('S4999') == {'pivot': 4999.0, 'avg': 1.0, 'action': 'buy'}
+    assert symbols.get('S4998') is None
+
+
+def test_latest_values_put_does_not_block_without_reads():
+    channel = LatestValuesChannel(0.01)
+
+    def put():
+        # Como el callback de barras diarias, muchas actualizaciones y nadie lee la tuberia
+        for index in range(200000):
+            channel.put(f'S{index % 50}', (index, float(index)))
+
+    writer = threading.Thread(target=put, daemon=True)
+    writer.start()
+    writer.join(timeout=20)
+    assert not writer.is_alive()
+
+    time.sleep(0.1)
+    values = channel.drain()
+    assert values == {f'S{index % 50}': (index, float(index)) for index in range(200000 - 50, 200000)}
+    assert channel.drain() == {}
+
+
+def test_measure_latency():
+    # El proceso que decide consulta la copia local que actualiza el hilo de listen, como check_trade
+    latency = measure_latency(par_number_trades=50)
+    assert 0 < latency['p50_us'] <= latency['p99_us'] <= latency['max_us']
@@ -0,0 +1,90 @@
+# Medicion de la latencia del transporte de trades entre procesos, se ejecuta con:
+#     python -m tests.trade_latency_benchmark
+import multiprocessing  # Para los procesos de la medicion
+import time  # Para medir la latencia
+from typing import Dict  # Importación de módulos para definir tipos de datos
+
+from model.trade_transport import SharedSymbols, TradeChannel
+
+def _relay(par_source, par_target, par_ready, par_number_trades: int, par_use_manager: bool) -> None:
+    # Reenvia los trades como PivotController._receive_trade
+    par_ready.set()
+    for _ in range(par_number_trades):
+        trade = par_source.get()
+        trade['volume'] = trade['size']
+        if par_use_manager:
+            par_target.put(trade)
+        else:
+            par_target.put_trade(trade)
+
+def _decide(par_source, par_symbols, par_ready, par_results, par_number_trades: int, par_use_manager: bool) -> None:
+    # Consulta el símbolo y mide el tiempo desde el callback como AlphaController.check_trade: los cambios de
+    # suscripción los aplica el hilo de listen y cada trade solo lee la copia local
+    if not par_use_manager:
+        par_symbols.listen()
+        # Se espera a que el hilo aplique la publicacion inicial
+        while par_symbols.get('AAPL') is None:
+            time.sleep(0.001)
+    par_ready.set()
+    latencies = []
+    for _ in range(par_number_trades):
+        trade = par_source.get()
+        if par_use_manager:
+            data = par_symbols[trade['symbol']]
+        else:
+            data = par_symbols.get(trade['symbol'])
+        if data['pivot'] < trade['price']:
+            latencies.append(time.perf_counter_ns() - trade['timestamp'])
+    par_results.put(latencies)
+
+def measure_latency(par_number_trades: int = 2000, par_use_manager: bool = False) -> Dict[str, float]:
+    """
+    Mide la latencia desde el callback del websocket hasta la decision de trading, con los mismos dos saltos entre
+    procesos que PivotController.start. El callback se simula enviando trades con el timestamp en
+    time.perf_counter_ns, que es comun a todos los procesos.
+
+    Args:
+        par_number_trades (int, opcional): Numero de trades a enviar.
+        par_use_manager (bool, opcional): Si es True se mide el transporte anterior, con colas y diccionario de un
+            multiprocessing.Manager.
+
+    Returns:
+        Dict[str, float]: Percentiles 50, 99 y maximo de la latencia en microsegundos.
+    """
+    results = multiprocessing.Queue()
+    if par_use_manager:
+        manager = multiprocessing.Manager()
+        first, second = manager.Queue(), manager.Queue()
+        symbols = manager.dict({'AAPL': {'pivot': 0.0, 'avg': 1.0, 'action': 'buy'}})
+    else:
+        first, second = TradeChannel(), TradeChannel()
+        symbols = SharedSymbols()
+        symbols.publish({'AAPL': {'pivot': 0.0, 'avg': 1.0, 'action': 'buy'}})
+
+    relay_ready, decide_ready = multiprocessing.Event(), multiprocessing.Event()
+    relay = multiprocessing.Process(target=_relay, args=(first, second, relay_ready, par_number_trades, par_use_manager))
+    decide = multiprocessing.Process(target=_decide, args=(second, symbols, decide_ready, results, par_number_trades, par_use_manager))
+    relay.start()
+    decide.start()
+    # No se mide el inicio de los procesos
+    relay_ready.wait()
+    decide_ready.wait()
+    for _ in range(par_number_trades):
+        if par_use_manager:
+            first.put({'symbol': 'AAPL', 'price': 1.0, 'size': 100.0, 'timestamp': time.perf_counter_ns()})
+        else:
+            first.put('AAPL', 1.0, 100.0, time.perf_counter_ns())
+        # Los trades llegan separados, no en rafaga
+        time.sleep(0.0005)
+    latencies = sorted(results.get())
+    relay.join()
+    decide.join()
+    return {
+        'p50_us': latencies[len(latencies) // 2] / 1000,
+        'p99_us': latencies[int(len(latencies) * 0.99)] / 1000,
+        'max_us': latencies[-1] / 1000,
+    }
+
+if __name__ == '__main__':
+    print('multiprocessing.Manager:', measure_latency(par_use_manager=True))
+    print('TradeChannel:', measure_latency(par_use_manager=False))